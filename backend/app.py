@@ -1,15 +1,22 @@
-from flask import Flask, render_template, send_from_directory, jsonify
+from flask import Flask, g, render_template, send_from_directory, jsonify
 from flask_login import LoginManager
 from flask_cors import CORS
 from flask_wtf.csrf import CSRFProtect
 from backend.config import Config
-from backend.models.user import db, User
+from backend.models.user import db
 from backend.routes.auth import auth_bp, bcrypt
 from backend.routes.cases import cases_bp
 from backend.routes.batch_import import batch_import_bp
 from backend.routes.roles import roles_bp
 from backend.routes.settings import settings_bp
+from backend.routes.analytics import analytics_bp
+from backend.routes.metrics import metrics_bp
 from backend.utils.secrets_checker import secrets_checker
+from backend.utils.json_provider import FastJSONProvider
+from backend.utils.database import engine_options, engine_binds, register_replica_routing
+from backend.utils.request_metrics import init_request_metrics
+from backend.services.principal_service import principal_cache
+from backend.cli import register_cli
 
 secrets_checker.check_and_exit_if_missing_critical()
 
@@ -17,6 +24,11 @@ app = Flask(__name__,
             template_folder='../frontend/templates',
             static_folder='../frontend/static')
 app.config.from_object(Config)
+# Pool de connexions et délai des requêtes configurables (variables DB_*)
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(Config)
+# Réplica en lecture seule optionnel (DATABASE_REPLICA_URL)
+app.config['SQLALCHEMY_BINDS'] = engine_binds(Config)
+app.json = FastJSONProvider(app)
 
 CORS(app, supports_credentials=True, origins=['http://localhost:5000', 'http://127.0.0.1:5000'])
 
@@ -26,9 +38,15 @@ csrf.exempt(cases_bp)
 csrf.exempt(batch_import_bp)
 csrf.exempt(roles_bp)
 csrf.exempt(settings_bp)
+csrf.exempt(analytics_bp)
 
 db.init_app(app)
 bcrypt.init_app(app)
+register_replica_routing(app, Config)
+# Server-Timing et journal JSON par requête (SQL, déchiffrement, IA)
+init_request_metrics(app)
+# Schéma et données initiales : `flask --app main init` (backend/cli.py), pas à l'import
+register_cli(app)
 
 login_manager = LoginManager()
 login_manager.init_app(app)
@@ -39,19 +57,25 @@ def unauthorized():
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    # Identité en cache (voir principal_service) : pas de requête SQL par appel
+    return principal_cache.get(int(user_id))
 
 app.register_blueprint(auth_bp, url_prefix='/api/auth')
 app.register_blueprint(cases_bp, url_prefix='/api')
 app.register_blueprint(batch_import_bp, url_prefix='/api')
 app.register_blueprint(roles_bp, url_prefix='/api')
 app.register_blueprint(settings_bp, url_prefix='/api')
+app.register_blueprint(analytics_bp, url_prefix='/api')
+app.register_blueprint(metrics_bp)
 
 @app.after_request
 def add_header(response):
-    response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, max-age=0'
-    response.headers['Pragma'] = 'no-cache'
-    response.headers['Expires'] = '0'
+    # Pas de cache, fichiers statiques compris ; une route peut garder sa propre
+    # politique en posant g.own_cache_control (ex. /api/settings)
+    if not g.get('own_cache_control'):
+        response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, max-age=0'
+        response.headers['Pragma'] = 'no-cache'
+        response.headers['Expires'] = '0'
     return response
 
 @app.route('/')
@@ -94,45 +118,3 @@ def case_detail_page(case_id):
 def get_csrf_token():
     from flask_wtf.csrf import generate_csrf
     return jsonify({'csrf_token': generate_csrf()})
-
-with app.app_context():
-    try:
-        db.create_all()
-    except Exception as e:
-        print(f"⚠️  Tables already exist or error creating tables: {e}")
-    
-    from backend.init_roles import initialize_roles_and_permissions
-    try:
-        initialize_roles_and_permissions(app)
-    except Exception as e:
-        print(f"⚠️  Error initializing roles and permissions: {e}")
-    
-    try:
-        from backend.models.settings import Settings
-        Settings.initialize_defaults()
-        print("✓ Paramètres initialisés")
-    except Exception as e:
-        print(f"⚠️  Error initializing settings: {e}")
-    
-    try:
-        from backend.models.role import Role
-        admin = User.query.filter_by(email='admin@jurisprudence.com').first()
-        admin_role = Role.query.filter_by(name='Administrateur').first()
-        
-        if not admin:
-            from flask_bcrypt import generate_password_hash
-            admin_user = User(
-                email='admin@jurisprudence.com',
-                password_hash=generate_password_hash('Admin123!').decode('utf-8'),
-                first_name='Admin',
-                last_name='System',
-                is_approved=True,
-                is_admin=True,
-                role_id=admin_role.id if admin_role else None
-            )
-            db.session.add(admin_user)
-            db.session.commit()
-            print("✓ Administrateur créé: admin@jurisprudence.com / Admin123!")
-    except Exception as e:
-        print(f"⚠️  Error checking/creating admin user: {e}")
-
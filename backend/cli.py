@@ -0,0 +1,131 @@
+"""
+Commandes d'administration (flask --app main <commande>)
+
+    flask --app main init        crée les tables manquantes, les permissions,
+                                 rôles et paramètres par défaut, et le compte
+                                 administrateur initial
+    flask --app main importtime  temps d'import de l'application au démarrage
+                                 d'un worker, module par module (-X importtime)
+
+L'initialisation ne s'exécute plus à l'import de l'application : les workers
+gunicorn démarrent sans toucher au schéma. À lancer au déploiement et après
+chaque mise à jour qui ajoute des tables.
+"""
+import os
+import subprocess
+import sys
+import time
+import click
+
+# Dépendances lourdes chargées à la demande (extraction PDF, IA, imports de
+# tableurs) : elles ne doivent pas apparaître au démarrage d'un worker
+LAZY_MODULES = ('PyPDF2', 'requests', 'pandas', 'docx', 'openpyxl')
+
+def _step(label, action):
+    """Exécute une étape et affiche sa durée"""
+    started = time.perf_counter()
+    result = action()
+    click.echo(f"   {label} ({(time.perf_counter() - started) * 1000:.0f} ms)")
+    return result
+
+def create_admin(email, password):
+    """Crée le compte administrateur s'il n'existe pas ; retourne True s'il a été créé"""
+    from flask_bcrypt import generate_password_hash
+    from backend.models.user import db, User
+    from backend.models.role import Role
+
+    if db.session.query(User.id).filter_by(email=email).first():
+        return False
+    admin_role_id = db.session.query(Role.id).filter_by(name='Administrateur').scalar()
+    db.session.add(User(
+        email=email,
+        password_hash=generate_password_hash(password).decode('utf-8'),
+        first_name='Admin',
+        last_name='System',
+        is_approved=True,
+        is_admin=True,
+        role_id=admin_role_id
+    ))
+    db.session.commit()
+    return True
+
+def parse_importtime(output):
+    """
+    Lit la sortie de `python -X importtime` : liste de (module, temps propre,
+    temps cumulé, profondeur), temps en microsecondes
+    """
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        entries.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return entries
+
+def register_cli(app):
+    @app.cli.command('init')
+    @click.option('--admin-email', default='admin@jurisprudence.com', show_default=True,
+                  help="Email du compte administrateur initial")
+    @click.option('--admin-password', default='Admin123!', show_default=True,
+                  help="Mot de passe du compte administrateur initial (à changer ensuite)")
+    @click.option('--skip-admin', is_flag=True, help="Ne crée pas le compte administrateur")
+    def init_command(admin_email, admin_password, skip_admin):
+        """Initialise la base : tables, rôles, permissions, paramètres, administrateur"""
+        from backend.models.user import db
+        from backend.models.settings import Settings
+        from backend.init_roles import initialize_roles_and_permissions
+
+        click.echo("=== Initialisation de la plateforme ===\n")
+        started = time.perf_counter()
+
+        _step("✓ Tables créées (create_all)", db.create_all)
+        permissions, roles = _step("✓ Rôles et permissions", initialize_roles_and_permissions)
+        click.echo(f"     {permissions} permission(s), {roles} rôle(s) ajouté(s)")
+        settings = _step("✓ Paramètres par défaut", Settings.initialize_defaults)
+        click.echo(f"     {settings} paramètre(s) ajouté(s)")
+
+        if not skip_admin:
+            created = _step("✓ Compte administrateur", lambda: create_admin(admin_email, admin_password))
+            if created:
+                click.echo(f"     Administrateur créé: {admin_email} (changez le mot de passe)")
+
+        click.echo(f"\n✅ Initialisation terminée ({(time.perf_counter() - started) * 1000:.0f} ms)")
+
+    @app.cli.command('importtime')
+    @click.option('--module', default='backend.app', show_default=True, help="Module à importer")
+    @click.option('--top', default=25, show_default=True, help="Nombre de modules affichés")
+    def importtime_command(module, top):
+        """Profile l'import de l'application dans un interpréteur neuf (python -X importtime)"""
+        # Un nouvel interpréteur : dans ce processus, l'application est déjà importée
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            capture_output=True, text=True, env=os.environ.copy()
+        )
+        entries = parse_importtime(result.stderr)
+        if result.returncode != 0 or not entries:
+            click.echo(f"❌ Import de {module} impossible:\n{result.stderr[-2000:]}")
+            sys.exit(1)
+        
+        total = next((cumulative for name, _, cumulative, depth in entries if name == module and depth == 0), None)
+        total = total if total is not None else sum(cumulative for _, _, cumulative, depth in entries if depth == 0)
+        click.echo(f"=== Import de {module}: {total / 1000:.0f} ms, {len(entries)} modules ===\n")
+        
+        # Paquets de premier niveau : somme des temps propres de leurs modules
+        packages = {}
+        for name, self_us, _, _ in entries:
+            root = name.split('.')[0]
+            packages[root] = packages.get(root, 0) + self_us
+        click.echo(f"{'Paquet':<40} {'ms':>8} {'%':>6}")
+        for name, self_us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]:
+            click.echo(f"{name:<40} {self_us / 1000:>8.1f} {self_us * 100 / total:>5.1f}%")
+        
+        click.echo(f"\n{'Module (temps cumulé)':<60} {'ms':>8}")
+        for name, _, cumulative, _ in sorted(entries, key=lambda e: e[2], reverse=True)[:top]:
+            click.echo(f"{name:<60} {cumulative / 1000:>8.1f}")
+        
+        loaded = [name for name in LAZY_MODULES if name in packages]
+        if loaded:
+            click.echo(f"\n❌ Dépendances à charger à la demande importées au démarrage: {', '.join(loaded)}")
+            sys.exit(1)
+        click.echo(f"\n✅ Aucune dépendance lourde au démarrage ({', '.join(LAZY_MODULES)})")
@@ -11,17 +11,103 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Pool de connexions, par worker (voir backend/utils/database.py) : au plus
+    # DB_POOL_SIZE + DB_MAX_OVERFLOW connexions, DB_POOL_TIMEOUT secondes
+    # d'attente d'une connexion libre, recyclage après DB_POOL_RECYCLE secondes
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 30))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
+    
+    # Durée maximale d'une requête SQL (ms, PostgreSQL, 0 : aucune), et limites
+    # propres à la recherche sur tout le corpus et aux listes / facettes
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 30000))
+    DB_SEARCH_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_SEARCH_STATEMENT_TIMEOUT_MS', 60000))
+    DB_LISTING_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_LISTING_STATEMENT_TIMEOUT_MS', 10000))
+    
+    # Réplica en lecture seule (optionnel) pour les routes de consultation et
+    # de recherche. Après une écriture, l'utilisateur lit la base principale
+    # pendant REPLICA_READ_YOUR_WRITES_SECONDS (retard de réplication)
+    DATABASE_REPLICA_URL = os.environ.get('DATABASE_REPLICA_URL')
+    REPLICA_READ_YOUR_WRITES_SECONDS = float(os.environ.get('REPLICA_READ_YOUR_WRITES_SECONDS', 10))
+    
     ENCRYPTION_KEY = os.environ.get('ENCRYPTION_KEY')
     if not ENCRYPTION_KEY:
         print("❌ ERREUR CRITIQUE: ENCRYPTION_KEY doit être définie comme variable d'environnement")
         print("   Générez une clé avec: python -c 'from cryptography.fernet import Fernet; print(Fernet.generate_key().decode())'")
         print("   Puis ajoutez-la aux secrets Replit")
-        ENCRYPTION_KEY = Fernet.generate_key().decode()
-        print(f"⚠️  Clé temporaire générée pour cette session: {ENCRYPTION_KEY}")
-        print("⚠️  ATTENTION: Les données seront perdues au prochain redémarrage!")
+        # Une clé éphémère rend les données illisibles au redémarrage : uniquement sur demande explicite
+        if os.environ.get('ALLOW_TEMPORARY_ENCRYPTION_KEY', '').lower() in ('1', 'true', 'yes'):
+            ENCRYPTION_KEY = Fernet.generate_key().decode()
+            print(f"⚠️  Clé temporaire générée pour cette session: {ENCRYPTION_KEY}")
+            print("⚠️  ATTENTION: Les données seront perdues au prochain redémarrage!")
+    
+    # Anciennes clés, séparées par des virgules : encore acceptées en lecture
+    # pendant une rotation (voir rotate_encryption_key.py), jamais pour chiffrer
+    ENCRYPTION_KEYS_PREVIOUS = [
+        k.strip() for k in os.environ.get('ENCRYPTION_KEYS_PREVIOUS', '').split(',') if k.strip()
+    ]
+    ENCRYPTION_KEYS = ([ENCRYPTION_KEY] if ENCRYPTION_KEY else []) + ENCRYPTION_KEYS_PREVIOUS
+    
+    # Texte intégral chiffré par blocs AES-GCM en binaire (lecture partielle possible)
+    CHUNKED_TEXT_ENCRYPTION = os.environ.get('CHUNKED_TEXT_ENCRYPTION', 'true').lower() in ('1', 'true', 'yes')
+    
+    # Compression avant chiffrement : none, zlib, lzma ou zstd (si installé)
+    ENCRYPTION_COMPRESSION = os.environ.get('ENCRYPTION_COMPRESSION', 'none').lower()
+    ENCRYPTION_COMPRESSION_MIN_SIZE = int(os.environ.get('ENCRYPTION_COMPRESSION_MIN_SIZE', 512))
+    
+    # Clé HMAC de l'index de recherche plein texte et des signatures MinHash
+    # (quasi-doublons). Obligatoire et indépendante de ENCRYPTION_KEY, qui peut
+    # tourner : la changer impose de reconstruire les index
+    # (rebuild_search_index.py, puis backfill_near_duplicates.py)
+    BLIND_INDEX_KEY = os.environ.get('BLIND_INDEX_KEY')
+    if not BLIND_INDEX_KEY:
+        print("❌ ERREUR CRITIQUE: BLIND_INDEX_KEY doit être définie comme variable d'environnement")
+        print("   Installation existante : reprenez la valeur actuelle de ENCRYPTION_KEY (les index restent valides)")
+        print("   Nouvelle installation : générez une clé comme pour ENCRYPTION_KEY")
+        if os.environ.get('ALLOW_TEMPORARY_ENCRYPTION_KEY', '').lower() in ('1', 'true', 'yes'):
+            BLIND_INDEX_KEY = ENCRYPTION_KEY
+            print("⚠️  Index dérivés de ENCRYPTION_KEY pour cette session")
+    FULLTEXT_MAX_QUERY_TOKENS = int(os.environ.get('FULLTEXT_MAX_QUERY_TOKENS', 20))
     
+    # Quasi-doublons à l'import : similarité minimale (Jaccard estimée) et
+    # traitement par défaut, 'flag' (importé et signalé) ou 'skip' (non importé)
+    NEAR_DUPLICATE_THRESHOLD = float(os.environ.get('NEAR_DUPLICATE_THRESHOLD', 0.8))
+    NEAR_DUPLICATE_MODE = os.environ.get('NEAR_DUPLICATE_MODE', 'flag').lower()
+
+    # Facettes (/api/cases/facets) : valeurs renvoyées par facette et nombre
+    # de combinaisons de filtres gardées en cache par processus
+    FACETS_LIMIT = int(os.environ.get('FACETS_LIMIT', 50))
+    FACETS_CACHE_SIZE = int(os.environ.get('FACETS_CACHE_SIZE', 256))
+
+    # Durée de vie (secondes) de l'identité mise en cache par processus : délai
+    # maximal avant qu'un autre worker voie un changement de rôle ou de droits
+    PRINCIPAL_CACHE_TTL = float(os.environ.get('PRINCIPAL_CACHE_TTL', 30))
+
+    # Paramètres de la plateforme : intervalle (secondes) entre deux relectures
+    # de leur version par un worker, et durée de cache navigateur de /api/settings
+    SETTINGS_CACHE_CHECK_INTERVAL = float(os.environ.get('SETTINGS_CACHE_CHECK_INTERVAL', 5))
+    SETTINGS_HTTP_MAX_AGE = int(os.environ.get('SETTINGS_HTTP_MAX_AGE', 60))
+
+    # Mesures par requête (backend/utils/request_metrics.py) : en-tête
+    # Server-Timing et journal JSON, limité aux requêtes plus lentes que
+    # REQUEST_LOG_SLOW_MS (0 : toutes)
+    SERVER_TIMING_ENABLED = os.environ.get('SERVER_TIMING_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    REQUEST_LOG_ENABLED = os.environ.get('REQUEST_LOG_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    REQUEST_LOG_SLOW_MS = float(os.environ.get('REQUEST_LOG_SLOW_MS', 0))
+
+    # Jeton exigé par /metrics (Authorization: Bearer …) ; sans valeur, l'accès
+    # doit être restreint par le proxy (nginx)
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
     OPENROUTER_API_KEY = os.environ.get('OPENROUTER_API_KEY')
-    OPENROUTER_API_URL = 'https://openrouter.ai/api/v1/chat/completions'
+    # Surchargeable pour les mesures (benchmarks/openrouter_stub.py)
+    OPENROUTER_API_URL = os.environ.get('OPENROUTER_API_URL', 'https://openrouter.ai/api/v1/chat/completions')
+    
+    # Budget de tokens du prompt de recherche (instructions + requête + jurisprudence)
+    AI_PROMPT_TOKEN_BUDGET = int(os.environ.get('AI_PROMPT_TOKEN_BUDGET', 24000))
+    AI_PROMPT_MAX_CASES = int(os.environ.get('AI_PROMPT_MAX_CASES', 200))
     
     WTF_CSRF_ENABLED = True
     WTF_CSRF_TIME_LIMIT = None
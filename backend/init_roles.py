@@ -1,94 +1,73 @@
 """
 Script d'initialisation des rôles et permissions par défaut
+Exécuté par `flask init` (backend/cli.py) : insertions ensemblistes, quelques
+requêtes au total quel que soit le nombre de permissions
 """
-from backend.models.role import db, Role, Permission
+from backend.models.role import db, Role, Permission, role_permissions
+from backend.utils.upsert import insert_ignore
 
-def initialize_roles_and_permissions(app):
-    """Initialise les rôles et permissions par défaut"""
-    with app.app_context():
-        # Créer les permissions si elles n'existent pas
-        permissions_data = [
-            # Permissions pour la recherche et l'analyse
-            {'name': 'search_cases', 'description': 'Effectuer des recherches de jurisprudence', 'category': 'Recherche'},
-            {'name': 'view_case_analysis', 'description': 'Voir l\'analyse des cas', 'category': 'Recherche'},
-            
-            # Permissions pour la gestion des cas
-            {'name': 'view_cases', 'description': 'Voir la liste des cas', 'category': 'Cas'},
-            {'name': 'view_case_details', 'description': 'Voir les détails d\'un cas', 'category': 'Cas'},
-            {'name': 'create_case', 'description': 'Créer un nouveau cas', 'category': 'Cas'},
-            {'name': 'edit_case', 'description': 'Modifier un cas', 'category': 'Cas'},
-            {'name': 'delete_case', 'description': 'Supprimer un cas', 'category': 'Cas'},
-            {'name': 'import_cases', 'description': 'Importer des cas en batch', 'category': 'Cas'},
-            
-            # Permissions d'administration
-            {'name': 'manage_users', 'description': 'Gérer les utilisateurs', 'category': 'Administration'},
-            {'name': 'manage_roles', 'description': 'Gérer les rôles et permissions', 'category': 'Administration'},
-            {'name': 'view_statistics', 'description': 'Voir les statistiques', 'category': 'Administration'},
-            {'name': 'access_admin_panel', 'description': 'Accéder au panneau d\'administration', 'category': 'Administration'},
-        ]
-        
-        created_permissions = {}
-        for perm_data in permissions_data:
-            perm = Permission.query.filter_by(name=perm_data['name']).first()
-            if not perm:
-                perm = Permission(**perm_data)
-                db.session.add(perm)
-                print(f"✓ Permission créée: {perm_data['name']}")
-            created_permissions[perm_data['name']] = perm
-        
-        db.session.commit()
-        
-        # Créer le rôle "Juriste" (rôle par défaut)
-        juriste_role = Role.query.filter_by(name='Juriste').first()
-        if not juriste_role:
-            juriste_role = Role(
-                name='Juriste',
-                description='Juriste avec accès à la recherche et à l\'analyse uniquement',
-                is_system=True
-            )
-            # Le juriste ne peut que rechercher et voir l'analyse
-            juriste_role.permissions = [
-                created_permissions['search_cases'],
-                created_permissions['view_case_analysis']
-            ]
-            db.session.add(juriste_role)
-            print("✓ Rôle 'Juriste' créé")
-        
-        # Créer le rôle "Administrateur"
-        admin_role = Role.query.filter_by(name='Administrateur').first()
-        if not admin_role:
-            admin_role = Role(
-                name='Administrateur',
-                description='Administrateur avec tous les droits',
-                is_system=True
-            )
-            # L'admin a toutes les permissions
-            admin_role.permissions = list(created_permissions.values())
-            db.session.add(admin_role)
-            print("✓ Rôle 'Administrateur' créé")
-        
-        # Créer le rôle "Gestionnaire"
-        manager_role = Role.query.filter_by(name='Gestionnaire').first()
-        if not manager_role:
-            manager_role = Role(
-                name='Gestionnaire',
-                description='Gestionnaire de cas avec droits de lecture/écriture sur les cas',
-                is_system=False
-            )
-            # Le gestionnaire peut tout faire sauf l'administration
-            manager_role.permissions = [
-                created_permissions['search_cases'],
-                created_permissions['view_case_analysis'],
-                created_permissions['view_cases'],
-                created_permissions['view_case_details'],
-                created_permissions['create_case'],
-                created_permissions['edit_case'],
-                created_permissions['delete_case'],
-                created_permissions['import_cases'],
-                created_permissions['view_statistics']
-            ]
-            db.session.add(manager_role)
-            print("✓ Rôle 'Gestionnaire' créé")
-        
-        db.session.commit()
-        print("\n✅ Initialisation des rôles et permissions terminée!")
+PERMISSIONS = [
+    # Permissions pour la recherche et l'analyse
+    {'name': 'search_cases', 'description': 'Effectuer des recherches de jurisprudence', 'category': 'Recherche'},
+    {'name': 'view_case_analysis', 'description': 'Voir l\'analyse des cas', 'category': 'Recherche'},
+
+    # Permissions pour la gestion des cas
+    {'name': 'view_cases', 'description': 'Voir la liste des cas', 'category': 'Cas'},
+    {'name': 'view_case_details', 'description': 'Voir les détails d\'un cas', 'category': 'Cas'},
+    {'name': 'create_case', 'description': 'Créer un nouveau cas', 'category': 'Cas'},
+    {'name': 'edit_case', 'description': 'Modifier un cas', 'category': 'Cas'},
+    {'name': 'delete_case', 'description': 'Supprimer un cas', 'category': 'Cas'},
+    {'name': 'import_cases', 'description': 'Importer des cas en batch', 'category': 'Cas'},
+
+    # Permissions d'administration
+    {'name': 'manage_users', 'description': 'Gérer les utilisateurs', 'category': 'Administration'},
+    {'name': 'manage_roles', 'description': 'Gérer les rôles et permissions', 'category': 'Administration'},
+    {'name': 'view_statistics', 'description': 'Voir les statistiques', 'category': 'Administration'},
+    {'name': 'access_admin_panel', 'description': 'Accéder au panneau d\'administration', 'category': 'Administration'},
+]
+
+# Rôles par défaut et leurs permissions (None : toutes). Les permissions ne
+# sont attribuées qu'à la création du rôle : les modifications faites ensuite
+# depuis l'administration sont conservées.
+ROLES = [
+    # Rôle par défaut : le juriste ne peut que rechercher et voir l'analyse
+    {'name': 'Juriste', 'description': 'Juriste avec accès à la recherche et à l\'analyse uniquement',
+     'is_system': True, 'permissions': ['search_cases', 'view_case_analysis']},
+    # L'admin a toutes les permissions
+    {'name': 'Administrateur', 'description': 'Administrateur avec tous les droits',
+     'is_system': True, 'permissions': None},
+    # Le gestionnaire peut tout faire sauf l'administration
+    {'name': 'Gestionnaire', 'description': 'Gestionnaire de cas avec droits de lecture/écriture sur les cas',
+     'is_system': False, 'permissions': ['search_cases', 'view_case_analysis', 'view_cases', 'view_case_details',
+                                         'create_case', 'edit_case', 'delete_case', 'import_cases', 'view_statistics']},
+]
+
+def initialize_roles_and_permissions(app=None):
+    """
+    Crée les permissions et rôles par défaut manquants. À appeler dans un
+    contexte d'application (`app` n'est gardé que pour les anciens scripts).
+    """
+    created = insert_ignore(Permission, PERMISSIONS, ['name'])
+    if created:
+        print(f"✓ {created} permission(s) créée(s)")
+    permission_ids = dict(db.session.query(Permission.name, Permission.id).all())
+
+    existing_roles = {name for (name,) in db.session.query(Role.name)}
+    new_roles = [role for role in ROLES if role['name'] not in existing_roles]
+    if new_roles:
+        insert_ignore(Role, [
+            {'name': r['name'], 'description': r['description'], 'is_system': r['is_system']} for r in new_roles
+        ], ['name'])
+        role_ids = dict(db.session.query(Role.name, Role.id).filter(
+            Role.name.in_([r['name'] for r in new_roles])
+        ).all())
+        links = []
+        for role in new_roles:
+            names = role['permissions'] if role['permissions'] is not None else permission_ids.keys()
+            links.extend({'role_id': role_ids[role['name']], 'permission_id': permission_ids[name]} for name in names)
+        insert_ignore(role_permissions, links, ['role_id', 'permission_id'])
+        for role in new_roles:
+            print(f"✓ Rôle '{role['name']}' créé")
+
+    db.session.commit()
+    return created, len(new_roles)
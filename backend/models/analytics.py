@@ -0,0 +1,30 @@
+from backend.models.user import db
+from datetime import datetime
+
+class SearchUsageDaily(db.Model):
+    """
+    Agrégat quotidien par utilisateur des recherches effectuées.
+    Maintenu de manière incrémentale à chaque recherche pour que les tableaux
+    de bord admin n'aient jamais à parcourir ni déchiffrer search_history.
+    """
+    __tablename__ = 'search_usage_daily'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'day', name='uq_search_usage_daily_user_day'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+    day = db.Column(db.Date, nullable=False, index=True)
+
+    search_count = db.Column(db.Integer, default=0, nullable=False)
+    error_count = db.Column(db.Integer, default=0, nullable=False)
+    total_latency_ms = db.Column(db.BigInteger, default=0, nullable=False)
+    max_latency_ms = db.Column(db.Integer, default=0, nullable=False)
+    hits_returned = db.Column(db.Integer, default=0, nullable=False)
+    prompt_tokens = db.Column(db.BigInteger, default=0, nullable=False)
+    completion_tokens = db.Column(db.BigInteger, default=0, nullable=False)
+
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<SearchUsageDaily user={self.user_id} day={self.day}>'
@@ -9,13 +9,13 @@ class JurisprudenceCase(db.Model):
     ref = db.Column(db.String(50), unique=True, nullable=False, index=True)
     titre = db.Column(db.Text, nullable=False)
     
-    juridiction = db.Column(db.String(200))
+    juridiction = db.Column(db.String(200), index=True)
     pays_ville = db.Column(db.String(200))
     numero_decision = db.Column(db.String(100))
-    date_decision = db.Column(db.Date)
+    date_decision = db.Column(db.Date, index=True)
     numero_dossier = db.Column(db.String(100))
-    type_decision = db.Column(db.String(100))
-    chambre = db.Column(db.String(100))
+    type_decision = db.Column(db.String(100), index=True)
+    chambre = db.Column(db.String(100), index=True)
     
     theme = db.Column(db.Text)
     mots_cles = db.Column(db.Text)
@@ -25,18 +25,52 @@ class JurisprudenceCase(db.Model):
     
     resume_francais_encrypted = db.Column(db.Text)
     resume_arabe_encrypted = db.Column(db.Text)
-    texte_integral_encrypted = db.Column(db.Text)
+    # Colonnes volumineuses chargées à la demande seulement (listes et recherche n'en ont pas besoin)
+    texte_integral_encrypted = db.deferred(db.Column(db.Text))
+    # Nouveau format : blocs AES-GCM en binaire. Les anciennes lignes gardent
+    # leur jeton Fernet dans texte_integral_encrypted jusqu'à leur migration.
+    texte_integral_blob = db.deferred(db.Column(db.LargeBinary))
     
     pdf_file_path = db.Column(db.String(500))
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Indexée : max(updated_at) sert de version du corpus (cache des facettes)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     
     def __repr__(self):
         return f'<JurisprudenceCase {self.ref}>'
     
-    def to_dict(self, decrypt=False):
+    @property
+    def has_texte_integral(self):
+        return bool(self.texte_integral_blob or self.texte_integral_encrypted)
+    
+    def set_texte_integral(self, text):
+        """Chiffre et stocke le texte intégral dans le format configuré"""
+        from backend.config import Config
+        from backend.utils.encryption import encryption_service
+        
+        if not text:
+            self.texte_integral_blob = None
+            self.texte_integral_encrypted = None
+        elif Config.CHUNKED_TEXT_ENCRYPTION:
+            self.texte_integral_blob = encryption_service.encrypt_large(text)
+            self.texte_integral_encrypted = None
+        else:
+            self.texte_integral_encrypted = encryption_service.encrypt(text)
+            self.texte_integral_blob = None
+    
+    def get_texte_integral(self):
+        """Déchiffre le texte intégral, quel que soit son format de stockage"""
+        from backend.utils.encryption import encryption_service
+        
+        if self.texte_integral_blob:
+            return encryption_service.decrypt_large(self.texte_integral_blob)
+        if self.texte_integral_encrypted:
+            return encryption_service.decrypt(self.texte_integral_encrypted)
+        return ''
+    
+    def to_dict(self, decrypt=False, include_full_text=True):
         from backend.utils.encryption import encryption_service
         from backend.utils.text_cleaner import clean_case_data
         
@@ -74,8 +108,8 @@ class JurisprudenceCase(db.Model):
                 data['resume_arabe'] = "[خطأ في فك التشفير - مفتاح تشفير غير صالح]"
             
             try:
-                if self.texte_integral_encrypted:
-                    data['texte_integral'] = encryption_service.decrypt(self.texte_integral_encrypted)
+                if include_full_text and self.has_texte_integral:
+                    data['texte_integral'] = self.get_texte_integral()
             except Exception as e:
                 data['texte_integral'] = "[Erreur de déchiffrement - clé de chiffrement invalide]"
         
@@ -83,6 +117,73 @@ class JurisprudenceCase(db.Model):
         data = clean_case_data(data)
         
         return data
+    
+    def read_texte_integral(self, offset=0, limit=20000):
+        """
+        Lit une portion du texte intégral. Les positions sont exprimées en
+        caractères du texte stocké ; la fin de la portion est ramenée sur un
+        espace pour ne pas couper un mot entre deux requêtes.
+        """
+        from backend.utils.encryption import encryption_service
+        from backend.utils.text_cleaner import clean_private_use_characters
+        
+        offset = max(0, offset)
+        if self.texte_integral_blob:
+            # Seuls les blocs couvrant la portion demandée sont déchiffrés
+            window, total_length = encryption_service.decrypt_large_range(
+                self.texte_integral_blob, offset, offset + limit
+            )
+        else:
+            full_text = encryption_service.decrypt(self.texte_integral_encrypted) if self.texte_integral_encrypted else ''
+            total_length = len(full_text)
+            window = full_text[offset:offset + limit]
+        offset = min(offset, total_length)
+        end = offset + len(window)
+        
+        if end < total_length:
+            boundary = max(window.rfind(c) for c in (' ', '\n', '\t'))
+            if boundary > limit * 0.9:
+                window = window[:boundary + 1]
+                end = offset + len(window)
+        
+        return {
+            'text': clean_private_use_characters(window),
+            'offset': offset,
+            'next_offset': end if end < total_length else None,
+            'total_length': total_length
+        }
+    
+    def to_search_dict(self, snippet_length=300):
+        """
+        Représentation compacte pour les résultats de recherche : métadonnées et
+        extraits des résumés uniquement. Le texte complet se récupère via /api/cases/<id>.
+        """
+        from backend.utils.encryption import encryption_service
+        from backend.utils.text_cleaner import clean_case_data, make_snippet
+        
+        data = {
+            'id': self.id,
+            'ref': self.ref,
+            'titre': self.titre,
+            'juridiction': self.juridiction,
+            'date_decision': self.date_decision.isoformat() if self.date_decision else None,
+            'type_decision': self.type_decision,
+            'chambre': self.chambre,
+            'theme': self.theme
+        }
+        
+        for field, error_message in (
+            ('resume_francais', "[Erreur de déchiffrement - clé de chiffrement invalide]"),
+            ('resume_arabe', "[خطأ في فك التشفير - مفتاح تشفير غير صالح]"),
+        ):
+            encrypted = getattr(self, f'{field}_encrypted')
+            try:
+                text = encryption_service.decrypt(encrypted) if encrypted else ''
+            except Exception:
+                text = error_message
+            data[f'{field}_snippet'] = make_snippet(text, snippet_length)
+        
+        return clean_case_data(data)
 
 class SearchHistory(db.Model):
     __tablename__ = 'search_history'
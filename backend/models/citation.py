@@ -0,0 +1,25 @@
+from backend.models.user import db
+
+class CaseCitation(db.Model):
+    """
+    Référence légale citée par un cas (voir backend/utils/citation_extractor.py) :
+    une ligne par (code, article, cas, champ). La clé primaire commence par
+    (code, article) et sert la recherche filtrée sur un code ; l'index
+    (article, case_id) sert la recherche par article seul, tous codes
+    confondus (cas par défaut de /api/cases/citing) ; l'index sur case_id sert
+    la réindexation d'un cas.
+    """
+    __tablename__ = 'case_citations'
+    __table_args__ = (
+        db.Index('ix_case_citations_article_case', 'article', 'case_id'),
+    )
+    
+    code = db.Column(db.String(30), primary_key=True)
+    article = db.Column(db.String(20), primary_key=True)
+    case_id = db.Column(db.Integer, db.ForeignKey('jurisprudence_cases.id', ondelete='CASCADE'),
+                        primary_key=True, index=True)
+    field = db.Column(db.String(30), primary_key=True)
+    occurrences = db.Column(db.SmallInteger, default=1, nullable=False)
+    
+    def __repr__(self):
+        return f'<CaseCitation {self.code} art. {self.article} → {self.case_id}>'
@@ -0,0 +1,25 @@
+from backend.models.user import db
+from datetime import datetime
+
+class KeyRotationCheckpoint(db.Model):
+    """
+    Avancement d'une rotation de clé de chiffrement, par table.
+    Mis à jour dans la même transaction que chaque lot re-chiffré, ce qui
+    permet de reprendre une rotation interrompue là où elle s'était arrêtée.
+    """
+    __tablename__ = 'key_rotation_checkpoints'
+    __table_args__ = (
+        db.UniqueConstraint('run_id', 'table_name', name='uq_key_rotation_run_table'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    run_id = db.Column(db.String(100), nullable=False)
+    table_name = db.Column(db.String(100), nullable=False)
+    last_id = db.Column(db.Integer, default=0, nullable=False)
+    rows_done = db.Column(db.Integer, default=0, nullable=False)
+    started_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    completed_at = db.Column(db.DateTime)
+    
+    def __repr__(self):
+        return f'<KeyRotationCheckpoint {self.run_id}/{self.table_name} @{self.last_id}>'
@@ -0,0 +1,22 @@
+from backend.models.user import db
+from datetime import datetime
+
+class CaseRelation(db.Model):
+    """
+    Voisins précalculés d'un cas (compute_related_cases.py). La clé primaire
+    (case_id, rank) sert directement la lecture des cas liés dans l'ordre.
+    """
+    __tablename__ = 'case_relations'
+    
+    case_id = db.Column(db.Integer, db.ForeignKey('jurisprudence_cases.id', ondelete='CASCADE'), primary_key=True)
+    rank = db.Column(db.SmallInteger, primary_key=True)
+    related_case_id = db.Column(db.Integer, db.ForeignKey('jurisprudence_cases.id', ondelete='CASCADE'),
+                                nullable=False, index=True)
+    score = db.Column(db.Float, nullable=False)
+    text_score = db.Column(db.Float, default=0, nullable=False)
+    legal_score = db.Column(db.Float, default=0, nullable=False)
+    metadata_score = db.Column(db.Float, default=0, nullable=False)
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f'<CaseRelation {self.case_id} #{self.rank} → {self.related_case_id}>'
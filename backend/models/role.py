@@ -30,14 +30,32 @@ class Role(db.Model):
         """Vérifie si ce rôle a une permission spécifique"""
         return any(p.name == permission_name for p in self.permissions)
     
-    def to_dict(self):
+    def count_users(self):
+        """Nombre d'utilisateurs du rôle, compté en SQL sans charger les utilisateurs"""
+        from backend.models.user import User
+        return db.session.query(db.func.count(User.id)).filter(User.role_id == self.id).scalar()
+    
+    @staticmethod
+    def user_counts():
+        """{role_id: nombre d'utilisateurs} pour tous les rôles, en une seule requête groupée"""
+        from backend.models.user import User
+        rows = db.session.query(User.role_id, db.func.count(User.id)).filter(
+            User.role_id.isnot(None)
+        ).group_by(User.role_id).all()
+        return dict(rows)
+    
+    def to_dict(self, user_count=None):
+        """
+        `user_count` évite une requête de comptage par rôle quand l'appelant
+        l'a déjà (listes : voir user_counts() ou la sous-requête de /roles)
+        """
         return {
             'id': self.id,
             'name': self.name,
             'description': self.description,
             'is_system': self.is_system,
             'permissions': [p.to_dict() for p in self.permissions],
-            'user_count': len(self.users),
+            'user_count': self.count_users() if user_count is None else user_count,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
     
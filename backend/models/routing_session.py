@@ -0,0 +1,39 @@
+"""
+Session SQLAlchemy qui répartit les lectures entre la base principale et un
+réplica en lecture seule (DATABASE_REPLICA_URL, voir backend/utils/database.py).
+
+Une requête SQL part vers le réplica seulement si :
+- la route est marquée @read_only ;
+- aucune écriture n'a encore eu lieu pendant la requête HTTP (flush, INSERT,
+  UPDATE ou DELETE) : après la première, tout reste sur la base principale ;
+- l'utilisateur n'a rien écrit depuis moins de REPLICA_READ_YOUR_WRITES_SECONDS
+  (lecture de ses propres écritures malgré le retard de réplication) ; les
+  écritures faites sous untracked_writes() (historique de recherche,
+  statistiques) ne comptent pas.
+
+Sans réplica configuré, ou hors requête HTTP (commandes, scripts), tout passe
+par la base principale.
+"""
+import time
+from flask import g, has_request_context, session as flask_session
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+REPLICA_BIND = 'replica'
+
+# Clé de la session Flask : horodatage jusqu'auquel l'utilisateur lit la base principale
+PRIMARY_UNTIL_KEY = 'db_primary_until'
+
+class RoutingSession(Session):
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context():
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None:
+                if self._flushing or isinstance(clause, UpdateBase):
+                    # Écriture : base principale jusqu'à la fin de la requête
+                    g.db_wrote = True
+                elif (g.get('db_read_only') and not g.get('db_wrote')
+                        and flask_session.get(PRIMARY_UNTIL_KEY, 0) <= time.time()):
+                    return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
@@ -0,0 +1,44 @@
+from backend.models.user import db
+
+class CaseSearchToken(db.Model):
+    """
+    Index aveugle plein texte : une ligne par (mot, cas, champ), le mot étant
+    remplacé par son empreinte HMAC (voir backend/utils/blind_index.py).
+    La clé primaire commence par token_hash, ce qui sert directement les
+    recherches par mot ; l'index sur case_id sert la réindexation d'un cas.
+    """
+    __tablename__ = 'case_search_tokens'
+    
+    token_hash = db.Column(db.String(32), primary_key=True)
+    case_id = db.Column(db.Integer, db.ForeignKey('jurisprudence_cases.id', ondelete='CASCADE'),
+                        primary_key=True, index=True)
+    field = db.Column(db.String(30), primary_key=True)
+    tf = db.Column(db.SmallInteger, default=1, nullable=False)
+    
+    def __repr__(self):
+        return f'<CaseSearchToken {self.case_id}/{self.field}>'
+
+class CaseMinHash(db.Model):
+    """Signature MinHash d'un cas (voir backend/utils/minhash.py), pour la détection de quasi-doublons"""
+    __tablename__ = 'case_minhash'
+    
+    case_id = db.Column(db.Integer, db.ForeignKey('jurisprudence_cases.id', ondelete='CASCADE'), primary_key=True)
+    signature = db.Column(db.LargeBinary, nullable=False)
+    
+    def __repr__(self):
+        return f'<CaseMinHash {self.case_id}>'
+
+class CaseLSHBucket(db.Model):
+    """
+    Bandes LSH des signatures MinHash : une ligne par (bande, cas). Deux cas
+    partageant un bucket_hash sont candidats quasi-doublons ; le numéro de
+    bande est inclus dans l'empreinte, une seule colonne suffit à la recherche.
+    """
+    __tablename__ = 'case_lsh_buckets'
+    
+    bucket_hash = db.Column(db.String(16), primary_key=True)
+    case_id = db.Column(db.Integer, db.ForeignKey('jurisprudence_cases.id', ondelete='CASCADE'),
+                        primary_key=True, index=True)
+    
+    def __repr__(self):
+        return f'<CaseLSHBucket {self.case_id}>'
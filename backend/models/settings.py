@@ -1,6 +1,71 @@
+import threading
+import time
 from backend.models.user import db
+from backend.utils import metrics
 from datetime import datetime
 
+class SettingsVersion(db.Model):
+    """
+    Compteur unique (ligne id=1) incrémenté à chaque écriture d'un paramètre.
+    Chaque worker compare sa copie en mémoire à ce compteur pour savoir
+    quand recharger les paramètres.
+    """
+    __tablename__ = 'settings_version'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.BigInteger, default=0, nullable=False)
+    
+    @staticmethod
+    def current():
+        return db.session.query(SettingsVersion.version).filter_by(id=1).scalar() or 0
+    
+    @staticmethod
+    def bump():
+        """Incrémente le compteur dans la transaction en cours (sans commit)"""
+        updated = SettingsVersion.query.filter_by(id=1).update(
+            {SettingsVersion.version: SettingsVersion.version + 1}, synchronize_session=False
+        )
+        if not updated:
+            db.session.add(SettingsVersion(id=1, version=1))
+
+class _SettingsCache:
+    """
+    Copie en mémoire de tous les paramètres, par processus. La version en base
+    n'est relue qu'une fois par intervalle (SETTINGS_CACHE_CHECK_INTERVAL) :
+    entre deux vérifications, une lecture ne fait aucune requête.
+    """
+    
+    def __init__(self):
+        self.version = None
+        self.values = {}
+        self.checked_at = 0.0
+        self._lock = threading.Lock()
+    
+    def snapshot(self):
+        """(version, {clé: valeur}) à jour, rechargé seulement si la version a changé"""
+        from backend.config import Config
+        
+        now = time.monotonic()
+        if self.version is not None and now - self.checked_at < Config.SETTINGS_CACHE_CHECK_INTERVAL:
+            metrics.cache_lookup('settings', True)
+            return self.version, self.values
+        
+        with self._lock:
+            version = SettingsVersion.current()
+            # Version inchangée : une requête légère, les valeurs restent celles du cache
+            metrics.cache_lookup('settings', version == self.version)
+            if version != self.version:
+                self.values = {s.key: s.value for s in Settings.query.all()}
+                self.version = version
+            self.checked_at = now
+            return self.version, self.values
+    
+    def invalidate(self):
+        with self._lock:
+            self.version = None
+
+settings_cache = _SettingsCache()
+
 class Settings(db.Model):
     """
     Modèle pour les paramètres configurables de la plateforme
@@ -18,13 +83,25 @@ class Settings(db.Model):
     
     @staticmethod
     def get_value(key, default=None):
-        """Récupère la valeur d'un paramètre"""
-        setting = Settings.query.filter_by(key=key).first()
-        return setting.value if setting else default
+        """Récupère la valeur d'un paramètre (depuis le cache du processus)"""
+        values = Settings.get_values()
+        return values[key] if key in values else default
+    
+    @staticmethod
+    def get_values(keys=None):
+        """Paramètres en cache, tous ou seulement `keys` (dictionnaire à ne pas modifier)"""
+        _, values = settings_cache.snapshot()
+        if keys is None:
+            return values
+        return {k: values[k] for k in keys if k in values}
+    
+    @staticmethod
+    def version():
+        return settings_cache.snapshot()[0]
     
     @staticmethod
     def set_value(key, value, description=None):
-        """Définit la valeur d'un paramètre"""
+        """Définit la valeur d'un paramètre et invalide les caches de tous les workers"""
         setting = Settings.query.filter_by(key=key).first()
         if setting:
             setting.value = value
@@ -33,12 +110,16 @@ class Settings(db.Model):
         else:
             setting = Settings(key=key, value=value, description=description)
             db.session.add(setting)
+        SettingsVersion.bump()
         db.session.commit()
+        settings_cache.invalidate()
         return setting
     
     @staticmethod
     def initialize_defaults():
-        """Initialise les paramètres par défaut"""
+        """Crée les paramètres par défaut manquants, en une seule insertion"""
+        from backend.utils.upsert import insert_ignore
+        
         defaults = {
             'platform_name': {
                 'value': 'LexIA',
@@ -70,6 +151,12 @@ class Settings(db.Model):
             }
         }
         
-        for key, data in defaults.items():
-            if not Settings.query.filter_by(key=key).first():
-                Settings.set_value(key, data['value'], data['description'])
+        created = insert_ignore(Settings, [
+            {'key': key, 'value': data['value'], 'description': data['description']}
+            for key, data in defaults.items()
+        ], ['key'])
+        if created:
+            SettingsVersion.bump()
+        db.session.commit()
+        settings_cache.invalidate()
+        return created
@@ -1,8 +1,10 @@
 from flask_login import UserMixin
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
+from backend.models.routing_session import RoutingSession
 
-db = SQLAlchemy()
+# Lectures éventuellement servies par un réplica (voir routing_session.py)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class User(UserMixin, db.Model):
     __tablename__ = 'users'
@@ -34,7 +36,16 @@ class User(UserMixin, db.Model):
             return self.role.has_permission(permission_name)
         return False
     
-    def to_dict(self):
+    def to_dict(self, role_user_counts=None):
+        """
+        `role_user_counts` ({role_id: effectif}, voir Role.user_counts) évite
+        une requête de comptage par utilisateur dans les listes
+        """
+        role = None
+        if self.role:
+            role = self.role.to_dict(
+                user_count=role_user_counts.get(self.role.id, 0) if role_user_counts is not None else None
+            )
         return {
             'id': self.id,
             'email': self.email,
@@ -42,7 +53,7 @@ class User(UserMixin, db.Model):
             'last_name': self.last_name,
             'is_approved': self.is_approved,
             'is_admin': self.is_admin,
-            'role': self.role.to_dict() if self.role else None,
+            'role': role,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
     
@@ -0,0 +1,68 @@
+from flask import Blueprint, request, jsonify
+from flask_login import login_required, current_user
+from backend.services.analytics_service import analytics_service
+from backend.services.principal_service import permission_required
+from backend.utils.database import pool_status, read_only
+
+analytics_bp = Blueprint('analytics', __name__)
+
+MAX_DAYS = 366
+
+def _days_arg():
+    days = request.args.get('days', 30, type=int)
+    return max(1, min(days, MAX_DAYS))
+
+@analytics_bp.route('/admin/analytics/searches/summary', methods=['GET'])
+@login_required
+@read_only
+def get_search_summary():
+    """Totaux d'utilisation de la recherche sur la période (admin seulement)"""
+    if not current_user.is_admin:
+        return jsonify({'error': 'Accès non autorisé'}), 403
+
+    days = _days_arg()
+    return jsonify({
+        'days': days,
+        'summary': analytics_service.summary(days)
+    }), 200
+
+@analytics_bp.route('/admin/analytics/searches/daily', methods=['GET'])
+@login_required
+@read_only
+def get_search_daily():
+    """Série quotidienne des recherches, filtrable par utilisateur (admin seulement)"""
+    if not current_user.is_admin:
+        return jsonify({'error': 'Accès non autorisé'}), 403
+
+    days = _days_arg()
+    user_id = request.args.get('user_id', type=int)
+    return jsonify({
+        'days': days,
+        'user_id': user_id,
+        'series': analytics_service.daily(days, user_id=user_id)
+    }), 200
+
+@analytics_bp.route('/admin/analytics/searches/users', methods=['GET'])
+@login_required
+@read_only
+def get_search_by_user():
+    """Utilisateurs les plus actifs sur la période (admin seulement)"""
+    if not current_user.is_admin:
+        return jsonify({'error': 'Accès non autorisé'}), 403
+
+    days = _days_arg()
+    limit = max(1, min(request.args.get('limit', 50, type=int), 500))
+    return jsonify({
+        'days': days,
+        'users': analytics_service.by_user(days, limit=limit)
+    }), 200
+
+@analytics_bp.route('/admin/analytics/db/pool', methods=['GET'])
+@login_required
+@permission_required('view_statistics')
+def get_db_pool():
+    """
+    Pool de connexions du worker qui répond : connexions prêtées, débordement,
+    attente cumulée et maximale, délais dépassés (permission view_statistics)
+    """
+    return jsonify(pool_status()), 200
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify, session
 from flask_login import login_user, logout_user, login_required, current_user
 from flask_bcrypt import Bcrypt
+from sqlalchemy.orm import joinedload, selectinload
 from backend.models.user import db, User
 from backend.models.role import Role
 
@@ -88,15 +89,31 @@ def get_all_users():
     
     status_filter = request.args.get('status', 'all')
     
+    # Rôles et permissions chargés avec les utilisateurs, effectifs des rôles
+    # en une requête groupée : nombre de requêtes constant
+    query = User.query.options(joinedload(User.role).selectinload(Role.permissions))
     if status_filter == 'pending':
-        users = User.query.filter_by(is_approved=False).all()
+        query = query.filter_by(is_approved=False)
     elif status_filter == 'approved':
-        users = User.query.filter_by(is_approved=True).all()
+        query = query.filter_by(is_approved=True)
+    query = query.order_by(User.id)
+    
+    # Pagination sur demande (?page=&per_page=) ; sans paramètre, liste complète
+    if 'page' in request.args or 'per_page' in request.args:
+        page = max(1, request.args.get('page', 1, type=int))
+        per_page = max(1, min(request.args.get('per_page', 50, type=int), 200))
+        pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+        users, total, pages = pagination.items, pagination.total, pagination.pages
     else:
-        users = User.query.all()
+        users = query.all()
+        page, total, pages = 1, len(users), 1
     
+    role_user_counts = Role.user_counts()
     return jsonify({
-        'users': [user.to_dict() for user in users]
+        'users': [user.to_dict(role_user_counts=role_user_counts) for user in users],
+        'total': total,
+        'page': page,
+        'pages': pages
     }), 200
 
 @auth_bp.route('/admin/users/<int:user_id>', methods=['GET'])
@@ -1,8 +1,13 @@
 from flask import Blueprint, request, jsonify, session
 from flask_login import login_required, current_user
+from backend.config import Config
 from backend.models.case import db, JurisprudenceCase
 from backend.utils.encryption import encryption_service
 from backend.services.pdf_extractor import pdf_extractor
+from backend.services.search_index_service import search_index_service
+from backend.services.duplicate_service import duplicate_service
+from backend.services.citation_service import citation_service
+from backend.utils import metrics
 from werkzeug.utils import secure_filename
 import os
 import time
@@ -104,9 +109,13 @@ def process_batch():
     batch_id = data.get('batch_id')
     start_index = data.get('start_index', 0)
     batch_size = data.get('batch_size', 10)
+    # Quasi-doublons : 'flag' les importe en les signalant, 'skip' ne les importe pas
+    duplicates_mode = data.get('duplicates', Config.NEAR_DUPLICATE_MODE)
     
     if not batch_id:
         return jsonify({'error': 'batch_id requis'}), 400
+    if duplicates_mode not in ('flag', 'skip'):
+        return jsonify({'error': 'duplicates doit valoir flag ou skip'}), 400
     
     batch_folder = os.path.join(UPLOAD_FOLDER, batch_id)
     
@@ -122,13 +131,16 @@ def process_batch():
         'processed': 0,
         'success': 0,
         'errors': [],
-        'details': []
+        'details': [],
+        'near_duplicates': []
     }
+    batch_started = time.perf_counter()
     
     for filename in files_to_process:
         if not filename:
             continue
         filepath = os.path.join(batch_folder, filename)
+        file_started = time.perf_counter()
         
         try:
             with open(filepath, 'rb') as pdf_file:
@@ -140,6 +152,7 @@ def process_batch():
                     'error': 'Impossible d\'extraire la référence (ref)'
                 })
                 results['processed'] += 1
+                metrics.import_file('missing_ref', time.perf_counter() - file_started)
                 continue
             
             prepared_data = prepare_case_data(extracted_data)
@@ -151,8 +164,28 @@ def process_batch():
                     'error': f'Cas avec ref {prepared_data["ref"]} déjà existant'
                 })
                 results['processed'] += 1
+                metrics.import_file('existing', time.perf_counter() - file_started)
                 continue
             
+            signature = extracted_data.get('minhash_signature')
+            near_duplicates = duplicate_service.find_near_duplicates(signature)
+            if near_duplicates:
+                closest = near_duplicates[0]
+                results['near_duplicates'].append({
+                    'filename': filename,
+                    'ref': prepared_data['ref'],
+                    'matches': near_duplicates,
+                    'skipped': duplicates_mode == 'skip'
+                })
+                if duplicates_mode == 'skip':
+                    results['errors'].append({
+                        'filename': filename,
+                        'error': f'Quasi-doublon du cas {closest["ref"]} (similarité {closest["similarity"]:.0%}), non importé'
+                    })
+                    results['processed'] += 1
+                    metrics.import_file('near_duplicate', time.perf_counter() - file_started)
+                    continue
+            
             new_case = JurisprudenceCase(
                 ref=prepared_data['ref'],
                 titre=prepared_data['titre'],
@@ -169,29 +202,39 @@ def process_batch():
                 source=prepared_data['source'],
                 resume_francais_encrypted=encryption_service.encrypt(prepared_data['resume_francais']) if prepared_data.get('resume_francais') else None,
                 resume_arabe_encrypted=encryption_service.encrypt(prepared_data['resume_arabe']) if prepared_data.get('resume_arabe') else None,
-                texte_integral_encrypted=encryption_service.encrypt(prepared_data['texte_integral']) if prepared_data.get('texte_integral') else None,
                 pdf_file_path=filepath,
                 created_by=current_user.id
             )
+            new_case.set_texte_integral(prepared_data.get('texte_integral'))
             
             db.session.add(new_case)
+            db.session.flush()
+            search_index_service.index_case(new_case, texts=prepared_data)
+            duplicate_service.index_case(new_case.id, signature)
+            citation_service.index_case(new_case, texts=prepared_data)
             db.session.commit()
             
             results['success'] += 1
             results['details'].append({
                 'filename': filename,
                 'ref': extracted_data['ref'],
-                'titre': extracted_data.get('titre', 'Sans titre')
+                'titre': extracted_data.get('titre', 'Sans titre'),
+                'near_duplicates': near_duplicates
             })
+            metrics.import_file('imported', time.perf_counter() - file_started)
             
         except Exception as e:
+            db.session.rollback()
             results['errors'].append({
                 'filename': filename,
                 'error': str(e)
             })
+            metrics.import_file('error', time.perf_counter() - file_started)
         
         results['processed'] += 1
     
+    metrics.observe_import_batch(results['processed'], time.perf_counter() - batch_started)
+    
     return jsonify({
         'batch_id': batch_id,
         'total_files': len(files),
@@ -202,6 +245,7 @@ def process_batch():
         'errors_count': len(results['errors']),
         'errors': results['errors'],
         'details': results['details'],
+        'near_duplicates': results['near_duplicates'],
         'has_more': end_index < len(files),
         'next_index': end_index if end_index < len(files) else None
     }), 200
@@ -264,6 +308,7 @@ def import_single_pdf():
         extracted_data = pdf_extractor.extract_all_fields(file)
         
         if not extracted_data.get('ref'):
+            extracted_data.pop('minhash_signature', None)
             return jsonify({
                 'error': 'Impossible d\'extraire la référence (ref) du PDF',
                 'extracted_data': extracted_data
@@ -301,17 +346,26 @@ def import_single_pdf():
             source=prepared_data['source'],
             resume_francais_encrypted=encryption_service.encrypt(prepared_data['resume_francais']) if prepared_data.get('resume_francais') else None,
             resume_arabe_encrypted=encryption_service.encrypt(prepared_data['resume_arabe']) if prepared_data.get('resume_arabe') else None,
-            texte_integral_encrypted=encryption_service.encrypt(prepared_data['texte_integral']) if prepared_data.get('texte_integral') else None,
             pdf_file_path=filepath,
             created_by=current_user.id
         )
+        new_case.set_texte_integral(prepared_data.get('texte_integral'))
+        
+        # Import unitaire : les quasi-doublons sont signalés, jamais bloqués
+        signature = extracted_data.get('minhash_signature')
+        near_duplicates = duplicate_service.find_near_duplicates(signature)
         
         db.session.add(new_case)
+        db.session.flush()
+        search_index_service.index_case(new_case, texts=prepared_data)
+        duplicate_service.index_case(new_case.id, signature)
+        citation_service.index_case(new_case, texts=prepared_data)
         db.session.commit()
         
         return jsonify({
             'message': 'Cas importé avec succès',
-            'case': new_case.to_dict(decrypt=True)
+            'case': new_case.to_dict(decrypt=True),
+            'near_duplicates': near_duplicates
         }), 201
     
     except Exception as e:
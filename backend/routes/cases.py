@@ -3,17 +3,33 @@ from flask_login import login_required, current_user
 from backend.models.case import db, JurisprudenceCase, SearchHistory
 from backend.utils.encryption import encryption_service
 from backend.services.ai_service import ai_service
+from backend.services.analytics_service import analytics_service
+from backend.services.search_index_service import search_index_service, INDEXED_FIELDS
+from backend.services.duplicate_service import duplicate_service, CONTENT_FIELDS
+from backend.services.related_service import related_service
+from backend.services.citation_service import citation_service, CITATION_FIELDS
+from backend.services.facet_service import facet_service, parse_filters, apply_filters
+from backend.utils.database import statement_timeout, read_only, untracked_writes
+from backend.utils import metrics
+from backend.config import Config
 from datetime import datetime
+import time
 
 cases_bp = Blueprint('cases', __name__)
 
+TEXT_CHUNK_DEFAULT = 20000
+TEXT_CHUNK_MAX = 100000
+
 @cases_bp.route('/cases', methods=['GET'])
 @login_required
+@read_only
+@statement_timeout(Config.DB_LISTING_STATEMENT_TIMEOUT_MS)
 def get_cases():
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 20, type=int)
     
-    cases = JurisprudenceCase.query.order_by(JurisprudenceCase.date_decision.desc()).paginate(
+    query = apply_filters(JurisprudenceCase.query, parse_filters(request.args))
+    cases = query.order_by(JurisprudenceCase.date_decision.desc()).paginate(
         page=page, per_page=per_page, error_out=False
     )
     
@@ -24,11 +40,119 @@ def get_cases():
         'pages': cases.pages
     }), 200
 
+@cases_bp.route('/cases/facets', methods=['GET'])
+@login_required
+@read_only
+@statement_timeout(Config.DB_LISTING_STATEMENT_TIMEOUT_MS)
+def get_case_facets():
+    """
+    Effectifs par juridiction, chambre, type de décision, thème et année,
+    pour les mêmes filtres que la liste des cas (?chambre=…&year=…).
+    """
+    limit = request.args.get('limit', type=int)
+    if limit is not None:
+        limit = max(1, min(limit, 500))
+    filters = parse_filters(request.args)
+    
+    result = facet_service.facets(filters, limit=limit)
+    result['filters'] = filters
+    return jsonify(result), 200
+
 @cases_bp.route('/cases/<int:case_id>', methods=['GET'])
 @login_required
+@read_only
 def get_case(case_id):
+    """
+    Métadonnées et résumés du cas. Le texte intégral n'est inclus qu'avec
+    ?include_text=1 ; sinon il se lit par portions via /cases/<id>/text.
+    """
+    case = JurisprudenceCase.query.get_or_404(case_id)
+    include_text = request.args.get('include_text', '').lower() in ('1', 'true')
+    
+    data = case.to_dict(decrypt=True, include_full_text=include_text)
+    data['has_texte_integral'] = case.has_texte_integral
+    return jsonify(data), 200
+
+@cases_bp.route('/cases/<int:case_id>/text', methods=['GET'])
+@login_required
+@read_only
+def get_case_text(case_id):
+    """Lecture par portions du texte intégral (offset/limit en caractères)"""
     case = JurisprudenceCase.query.get_or_404(case_id)
-    return jsonify(case.to_dict(decrypt=True)), 200
+    offset = request.args.get('offset', 0, type=int)
+    limit = request.args.get('limit', TEXT_CHUNK_DEFAULT, type=int)
+    limit = max(1000, min(limit, TEXT_CHUNK_MAX))
+    
+    try:
+        chunk = case.read_texte_integral(offset=offset, limit=limit)
+    except Exception:
+        return jsonify({'error': 'Erreur de déchiffrement - clé de chiffrement invalide'}), 500
+    
+    chunk['id'] = case.id
+    return jsonify(chunk), 200
+
+@cases_bp.route('/cases/<int:case_id>/related', methods=['GET'])
+@login_required
+@read_only
+def get_related_cases(case_id):
+    """Cas liés précalculés hors ligne (compute_related_cases.py), sans appel à l'IA"""
+    limit = max(1, min(request.args.get('limit', 10, type=int), 50))
+    return jsonify({
+        'id': case_id,
+        'related': related_service.related(case_id, limit=limit)
+    }), 200
+
+@cases_bp.route('/cases/<int:case_id>/citations', methods=['GET'])
+@login_required
+@read_only
+def get_case_citations(case_id):
+    """Références légales citées par le cas (base légale et texte intégral)"""
+    JurisprudenceCase.query.get_or_404(case_id)
+    return jsonify({
+        'id': case_id,
+        'citations': citation_service.citations_for_case(case_id)
+    }), 200
+
+@cases_bp.route('/cases/citing', methods=['GET'])
+@login_required
+@read_only
+def get_cases_citing():
+    """
+    Cas citant un article : ?article=230&code=DOC (code facultatif, forme
+    usuelle acceptée : D.O.C, ق.ل.ع, loi 31-08…). Simple lecture de l'index
+    des citations, sans appel à l'IA.
+    """
+    article = request.args.get('article', '').strip()
+    if not article:
+        return jsonify({'error': 'Le paramètre article est requis'}), 400
+    code = request.args.get('code', '').strip() or None
+    page = max(1, request.args.get('page', 1, type=int))
+    per_page = max(1, min(request.args.get('per_page', 20, type=int), 100))
+    
+    found = citation_service.cases_citing(article, code=code, page=page, per_page=per_page)
+    
+    cases_by_id = {}
+    if found['ids']:
+        cases = JurisprudenceCase.query.filter(JurisprudenceCase.id.in_(found['ids'])).all()
+        cases_by_id = {case.id: case for case in cases}
+    
+    results = []
+    for case_id in found['ids']:
+        case = cases_by_id.get(case_id)
+        if case is None:
+            continue
+        data = case.to_search_dict()
+        data.update(found['citations'][case_id])
+        results.append(data)
+    
+    return jsonify({
+        'cases': results,
+        'total': found['total'],
+        'page': page,
+        'pages': (found['total'] + per_page - 1) // per_page,
+        'article': found['article'],
+        'code': found['code']
+    }), 200
 
 @cases_bp.route('/cases', methods=['POST'])
 @login_required
@@ -68,11 +192,15 @@ def create_case():
             source=data.get('source'),
             resume_francais_encrypted=encryption_service.encrypt(data.get('resume_francais', '')) if data.get('resume_francais') else None,
             resume_arabe_encrypted=encryption_service.encrypt(data.get('resume_arabe', '')) if data.get('resume_arabe') else None,
-            texte_integral_encrypted=encryption_service.encrypt(data.get('texte_integral', '')) if data.get('texte_integral') else None,
             created_by=current_user.id
         )
+        new_case.set_texte_integral(data.get('texte_integral'))
         
         db.session.add(new_case)
+        db.session.flush()
+        search_index_service.index_case(new_case, texts=data)
+        duplicate_service.index_case(new_case.id, duplicate_service.signature_for(data))
+        citation_service.index_case(new_case, texts=data)
         db.session.commit()
         
         return jsonify({
@@ -125,8 +253,14 @@ def update_case(case_id):
         if 'resume_arabe' in data:
             case.resume_arabe_encrypted = encryption_service.encrypt(data['resume_arabe']) if data['resume_arabe'] else None
         if 'texte_integral' in data:
-            case.texte_integral_encrypted = encryption_service.encrypt(data['texte_integral']) if data['texte_integral'] else None
+            case.set_texte_integral(data['texte_integral'])
         
+        if any(field in data for field in INDEXED_FIELDS):
+            search_index_service.index_case(case, texts=data)
+        if any(field in data for field in CONTENT_FIELDS):
+            duplicate_service.index_case(case.id, duplicate_service.signature_for_case(case))
+        if any(field in data for field in CITATION_FIELDS):
+            citation_service.index_case(case, texts=data)
         db.session.commit()
         
         return jsonify({
@@ -147,6 +281,10 @@ def delete_case(case_id):
     case = JurisprudenceCase.query.get_or_404(case_id)
     
     try:
+        search_index_service.remove_cases([case.id])
+        duplicate_service.remove_cases([case.id])
+        related_service.remove_cases([case.id])
+        citation_service.remove_cases([case.id])
         db.session.delete(case)
         db.session.commit()
         return jsonify({'message': 'Cas supprimé avec succès'}), 200
@@ -154,8 +292,93 @@ def delete_case(case_id):
         db.session.rollback()
         return jsonify({'error': f'Erreur lors de la suppression: {str(e)}'}), 500
 
+@cases_bp.route('/cases/fulltext', methods=['GET'])
+@login_required
+@read_only
+@statement_timeout(Config.DB_LISTING_STATEMENT_TIMEOUT_MS)
+def fulltext_search():
+    """
+    Recherche par mots-clés via l'index aveugle : la base compare des empreintes
+    HMAC, seuls les cas de la page retournée sont déchiffrés (extraits des résumés).
+    """
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'Requête vide'}), 400
+    
+    mode = request.args.get('mode', 'all')
+    if mode not in ('all', 'any'):
+        return jsonify({'error': 'mode doit valoir all ou any'}), 400
+    page = max(1, request.args.get('page', 1, type=int))
+    per_page = max(1, min(request.args.get('per_page', 20, type=int), 100))
+    
+    found = search_index_service.search(query, mode=mode, page=page, per_page=per_page)
+    
+    cases_by_id = {}
+    if found['ids']:
+        cases = JurisprudenceCase.query.filter(JurisprudenceCase.id.in_(found['ids'])).all()
+        cases_by_id = {case.id: case for case in cases}
+    
+    results = []
+    for case_id in found['ids']:
+        case = cases_by_id.get(case_id)
+        if case is None:
+            continue
+        data = case.to_search_dict()
+        data.update(found['scores'][case_id])
+        results.append(data)
+    
+    return jsonify({
+        'cases': results,
+        'total': found['total'],
+        'page': page,
+        'pages': (found['total'] + per_page - 1) // per_page,
+        'query_tokens': found['query_tokens']
+    }), 200
+
+def _load_cases_by_ref(refs):
+    """
+    Charge uniquement les cas retenus par l'IA, indexés par référence, au format
+    compact des résultats (le texte intégral se charge ensuite via /api/cases/<id>)
+    """
+    cases = JurisprudenceCase.query.filter(JurisprudenceCase.ref.in_(refs)).all()
+    return {case.ref: case.to_search_dict() for case in cases}
+
+def _record_search(user_id, query, ai_result, started_at):
+    """Enregistre l'historique chiffré et met à jour les agrégats quotidiens"""
+    latency_ms = (time.perf_counter() - started_at) * 1000
+    ai_result = ai_result or {}
+    metrics.observe_search(latency_ms / 1000, ai_result.get('success', False))
+    hits = len(ai_result.get('similar_cases') or [])
+    usage = ai_result.get('usage') or {}
+    
+    # Historique et statistiques : ne renvoient pas l'utilisateur vers la base
+    # principale (recherche et recherche en streaming se comportent pareil)
+    with untracked_writes():
+        search_history = SearchHistory(
+            user_id=user_id,
+            query_encrypted=encryption_service.encrypt(query),
+            results_count=hits
+        )
+        db.session.add(search_history)
+        db.session.commit()
+        
+        try:
+            analytics_service.record_search(
+                user_id=user_id,
+                latency_ms=latency_ms,
+                hits=hits,
+                prompt_tokens=usage.get('prompt_tokens', 0),
+                completion_tokens=usage.get('completion_tokens', 0),
+                error=not ai_result.get('success', False)
+            )
+        except Exception as e:
+            db.session.rollback()
+            print(f"⚠️  Erreur lors de la mise à jour des statistiques de recherche: {e}")
+
 @cases_bp.route('/search', methods=['POST'])
 @login_required
+@read_only
+@statement_timeout(Config.DB_SEARCH_STATEMENT_TIMEOUT_MS)
 def search_similar_cases():
     data = request.get_json()
     query = data.get('query', '')
@@ -163,26 +386,25 @@ def search_similar_cases():
     if not query:
         return jsonify({'error': 'Requête vide'}), 400
     
+    started_at = time.perf_counter()
+    
     # Charger TOUS les cas pour garantir des résultats complets
     # Note: Les tentatives d'optimisation ont été abandonnées car elles causaient
     # des régressions de rappel (cas manquants avec info uniquement dans champs cryptés)
+    # Le texte intégral n'entre pas dans le prompt : seuls les résumés sont déchiffrés ici
     all_cases = JurisprudenceCase.query.all()
-    decrypted_cases = [case.to_dict(decrypt=True) for case in all_cases]
+    decrypted_cases = [case.to_dict(decrypt=True, include_full_text=False) for case in all_cases]
     
-    ai_result = ai_service.find_similar_cases(query, decrypted_cases)
+    ai_result = ai_service.find_similar_cases(query, decrypted_cases, hydrator=_load_cases_by_ref)
     
-    search_history = SearchHistory(
-        user_id=current_user.id,
-        query_encrypted=encryption_service.encrypt(query),
-        results_count=len(decrypted_cases)
-    )
-    db.session.add(search_history)
-    db.session.commit()
+    _record_search(current_user.id, query, ai_result, started_at)
     
     return jsonify(ai_result), 200
 
 @cases_bp.route('/search/stream', methods=['POST'])
 @login_required
+@read_only
+@statement_timeout(Config.DB_SEARCH_STATEMENT_TIMEOUT_MS)
 def search_similar_cases_stream():
     """Version avec streaming pour afficher la réflexion de l'IA en temps réel"""
     data = request.get_json()
@@ -191,25 +413,26 @@ def search_similar_cases_stream():
     if not query:
         return jsonify({'error': 'Requête vide'}), 400
     
+    started_at = time.perf_counter()
+    user_id = current_user.id
+    
     # Charger TOUS les cas pour garantir des résultats complets
     # Note: Les tentatives d'optimisation ont été abandonnées car elles causaient
     # des régressions de rappel (cas manquants avec info uniquement dans champs cryptés)
+    # Le texte intégral n'entre pas dans le prompt : seuls les résumés sont déchiffrés ici
     all_cases = JurisprudenceCase.query.all()
-    decrypted_cases = [case.to_dict(decrypt=True) for case in all_cases]
+    decrypted_cases = [case.to_dict(decrypt=True, include_full_text=False) for case in all_cases]
     
-    # Sauvegarder l'historique de recherche
-    search_history = SearchHistory(
-        user_id=current_user.id,
-        query_encrypted=encryption_service.encrypt(query),
-        results_count=len(decrypted_cases)
-    )
-    db.session.add(search_history)
-    db.session.commit()
+    # L'historique est enregistré à la fin du flux, avec le nombre réel de résultats
+    def on_complete(result):
+        _record_search(user_id, query, result, started_at)
     
     # Retourner un générateur pour le streaming SSE
-    from flask import Response
+    from flask import Response, stream_with_context
     return Response(
-        ai_service.find_similar_cases_streaming(query, decrypted_cases),
+        stream_with_context(ai_service.find_similar_cases_streaming(
+            query, decrypted_cases, on_complete=on_complete, hydrator=_load_cases_by_ref
+        )),
         mimetype='text/event-stream',
         headers={
             'Cache-Control': 'no-cache',
@@ -219,6 +442,7 @@ def search_similar_cases_stream():
 
 @cases_bp.route('/cases/stats', methods=['GET'])
 @login_required
+@read_only
 def get_case_stats():
     from datetime import datetime, timedelta
     from sqlalchemy import func
@@ -245,6 +469,7 @@ def get_case_stats():
 
 @cases_bp.route('/stats', methods=['GET'])
 @login_required
+@read_only
 def get_stats():
     total_cases = JurisprudenceCase.query.count()
     user_searches = SearchHistory.query.filter_by(user_id=current_user.id).count()
@@ -262,6 +487,10 @@ def delete_all_cases():
     
     try:
         count = JurisprudenceCase.query.count()
+        search_index_service.remove_cases()
+        duplicate_service.remove_cases()
+        related_service.remove_cases()
+        citation_service.remove_cases()
         JurisprudenceCase.query.delete()
         db.session.commit()
         return jsonify({
@@ -286,6 +515,10 @@ def delete_selected_cases():
     
     try:
         deleted_count = 0
+        search_index_service.remove_cases(case_ids)
+        duplicate_service.remove_cases(case_ids)
+        related_service.remove_cases(case_ids)
+        citation_service.remove_cases(case_ids)
         for case_id in case_ids:
             case = JurisprudenceCase.query.get(case_id)
             if case:
@@ -4,9 +4,6 @@ from backend.models.case import db, JurisprudenceCase, SearchHistory
 from backend.utils.encryption import encryption_service
 from backend.services.ai_service import ai_service
 from datetime import datetime
-import pandas as pd
-import PyPDF2
-from docx import Document
 import io
 
 cases_bp = Blueprint('cases', __name__)
@@ -171,10 +168,13 @@ def search_by_file():
     
     query = ''
     try:
+        # Imports différés : PyPDF2 et python-docx ne sont chargés qu'à l'usage
         if file.filename.endswith('.pdf'):
+            import PyPDF2
             pdf_reader = PyPDF2.PdfReader(file)
             query = ' '.join([page.extract_text() for page in pdf_reader.pages])
         elif file.filename.endswith('.docx'):
+            from docx import Document
             doc = Document(file)
             query = ' '.join([paragraph.text for paragraph in doc.paragraphs])
         else:
@@ -221,6 +221,8 @@ def import_csv():
     if file.filename == '':
         return jsonify({'error': 'Nom de fichier vide'}), 400
     
+    # Import différé : pandas n'est chargé qu'au premier import de tableur
+    import pandas as pd
     try:
         if file.filename.endswith('.csv'):
             df = pd.read_csv(file)
@@ -286,6 +288,7 @@ def import_pdf():
     if file.filename == '' or not file.filename.endswith('.pdf'):
         return jsonify({'error': 'Fichier PDF requis'}), 400
     
+    import PyPDF2
     try:
         pdf_reader = PyPDF2.PdfReader(file)
         extracted_text = ' '.join([page.extract_text() for page in pdf_reader.pages])
@@ -0,0 +1,24 @@
+import hmac
+from flask import Blueprint, Response, request, jsonify
+from backend.config import Config
+from backend.utils import metrics
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """
+    Métriques au format texte Prometheus (voir backend/utils/metrics.py).
+    Si METRICS_TOKEN est défini, le collecteur doit l'envoyer en
+    `Authorization: Bearer <jeton>`.
+    """
+    if not metrics.enabled():
+        return jsonify({'error': 'Métriques indisponibles : prometheus-client absent (pip install -r requirements.txt)'}), 404
+    
+    if Config.METRICS_TOKEN:
+        expected = f'Bearer {Config.METRICS_TOKEN}'
+        if not hmac.compare_digest(request.headers.get('Authorization', ''), expected):
+            return jsonify({'error': 'Accès non autorisé'}), 401
+    
+    body, content_type = metrics.render()
+    return Response(body, content_type=content_type)
@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 from flask_login import login_required, current_user
+from sqlalchemy.orm import selectinload
 from backend.models.role import db, Role, Permission
 from backend.models.user import User
 
@@ -19,9 +20,31 @@ def admin_required(f):
 @login_required
 @admin_required
 def get_roles():
-    """Récupérer tous les rôles"""
-    roles = Role.query.all()
-    return jsonify([role.to_dict() for role in roles]), 200
+    """Récupérer les rôles, paginés sur demande (nombre de requêtes constant, quel que soit le nombre de rôles)"""
+    counts = db.session.query(
+        User.role_id.label('role_id'), db.func.count(User.id).label('user_count')
+    ).group_by(User.role_id).subquery()
+    
+    query = db.session.query(Role, db.func.coalesce(counts.c.user_count, 0)).outerjoin(
+        counts, counts.c.role_id == Role.id
+    ).options(selectinload(Role.permissions)).order_by(Role.id)
+    
+    # Pagination sur demande (?page=&per_page=) ; sans paramètre, liste complète
+    if 'page' in request.args or 'per_page' in request.args:
+        page = max(1, request.args.get('page', 1, type=int))
+        per_page = max(1, min(request.args.get('per_page', 50, type=int), 200))
+        pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+        rows, total, pages = pagination.items, pagination.total, pagination.pages
+    else:
+        rows = query.all()
+        page, total, pages = 1, len(rows), 1
+    
+    return jsonify({
+        'roles': [role.to_dict(user_count=user_count) for role, user_count in rows],
+        'total': total,
+        'page': page,
+        'pages': pages
+    }), 200
 
 @roles_bp.route('/roles/<int:role_id>', methods=['GET'])
 @login_required
@@ -115,8 +138,9 @@ def delete_role(role_id):
     if role.is_system:
         return jsonify({'error': 'Les rôles système ne peuvent pas être supprimés'}), 403
     
-    if len(role.users) > 0:
-        return jsonify({'error': f'Ce rôle est assigné à {len(role.users)} utilisateur(s). Veuillez d\'abord réassigner ces utilisateurs.'}), 409
+    user_count = role.count_users()
+    if user_count > 0:
+        return jsonify({'error': f'Ce rôle est assigné à {user_count} utilisateur(s). Veuillez d\'abord réassigner ces utilisateurs.'}), 409
     
     try:
         db.session.delete(role)
@@ -1,20 +1,35 @@
-from flask import Blueprint, request, jsonify
+import hashlib
+import json
+from flask import Blueprint, g, request, jsonify, make_response
 from flask_login import login_required, current_user
+from backend.config import Config
 from backend.models.user import db
 from backend.models.settings import Settings
 
 settings_bp = Blueprint('settings', __name__)
 
+PUBLIC_KEYS = ['platform_name', 'platform_tagline', 'platform_description', 'platform_keywords']
+
 @settings_bp.route('/settings', methods=['GET'])
 def get_all_settings():
-    """Récupère tous les paramètres (publics)"""
+    """
+    Récupère tous les paramètres (publics), depuis le cache du processus.
+    ETag et Cache-Control permettent au navigateur de réutiliser la réponse
+    (chargée à chaque page par platform-settings.js) ou de la revalider (304).
+    """
     try:
-        public_keys = ['platform_name', 'platform_tagline', 'platform_description', 'platform_keywords']
-        settings = Settings.query.filter(Settings.key.in_(public_keys)).all()
+        public_settings = Settings.get_values(PUBLIC_KEYS)
+        payload = json.dumps(public_settings, sort_keys=True, ensure_ascii=False)
+        etag = hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
         
-        return jsonify({
-            'settings': {s.key: s.value for s in settings}
-        }), 200
+        if etag in request.if_none_match:
+            response = make_response('', 304)
+        else:
+            response = jsonify({'settings': public_settings})
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = f'public, max-age={Config.SETTINGS_HTTP_MAX_AGE}'
+        g.own_cache_control = True
+        return response
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -22,9 +37,7 @@ def get_all_settings():
 def get_setting(key):
     """Récupère un paramètre spécifique"""
     try:
-        public_keys = ['platform_name', 'platform_tagline', 'platform_description', 'platform_keywords']
-        
-        if key not in public_keys:
+        if key not in PUBLIC_KEYS:
             return jsonify({'error': 'Paramètre non accessible'}), 403
         
         value = Settings.get_value(key, '')
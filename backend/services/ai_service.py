@@ -1,49 +1,16 @@
-import requests
+import json
+import time
 from backend.config import Config
+from backend.utils import json_provider
+from backend.utils.request_metrics import record_llm
+from backend.utils import metrics
+from backend.services.prompt_packer import PromptPacker, PackedPrompt, estimate_tokens
+from backend.services.search_pipeline import (
+    SearchPipeline, SearchContext, PipelineError, CandidateStage, LexicalRankingStage,
+    PackingStage, LLMStage, ParsingStage, HydrationStage
+)
 
-class AIService:
-    def __init__(self):
-        self.api_key = Config.OPENROUTER_API_KEY
-        self.api_url = Config.OPENROUTER_API_URL
-    
-    def find_similar_cases(self, case_description: str, existing_cases: list) -> dict:
-        if not self.api_key:
-            return {
-                'error': 'API OpenRouter non configurée',
-                'similar_cases': [],
-                'analysis': 'Veuillez configurer OPENROUTER_API_KEY'
-            }
-        
-        # Créer un index complet de tous les cas avec leurs informations
-        cases_index = []
-        for i, case in enumerate(existing_cases):
-            # Construire un contexte riche pour chaque cas
-            # Inclure le texte en français ET en arabe pour une meilleure similarité
-            resume_fr = case.get('resume_francais', '')
-            resume_ar = case.get('resume_arabe', '')
-            
-            case_text = f"""Réf: {case.get('ref', 'N/A')}
-Titre: {case.get('titre', 'N/A')}
-Juridiction: {case.get('juridiction', 'N/A')}
-Date: {case.get('date_decision', 'N/A')}
-Thème: {case.get('theme', 'N/A')}
-Mots-clés: {case.get('mots_cles', 'N/A')}
-Résumé FR: {(resume_fr[:300] + '...' if len(resume_fr) > 300 else resume_fr or 'N/A')}
-Résumé AR: {(resume_ar[:300] + '...' if len(resume_ar) > 300 else resume_ar or 'N/A')}"""
-            
-            cases_index.append({
-                'index': i,
-                'ref': case.get('ref'),
-                'titre': case.get('titre'),
-                'context': case_text
-            })
-        
-        # Limiter à 50 cas pour ne pas dépasser la limite de tokens
-        cases_sample = cases_index[:50] if len(cases_index) > 50 else cases_index
-        
-        cases_context = "\n\n---\n\n".join([c['context'] for c in cases_sample])
-        
-        prompt = f"""Tu es un expert juridique spécialisé dans le droit marocain. Analyse la description du cas fournie et trouve les cas similaires dans la jurisprudence.
+PROMPT_TEMPLATE = """Tu es un expert juridique spécialisé dans le droit marocain. Analyse la description du cas fournie et trouve les cas similaires dans la jurisprudence.
 
 **INSTRUCTIONS IMPORTANTES:**
 - Analyse à la fois le texte en français ET en arabe pour trouver les meilleures similarités
@@ -53,7 +20,7 @@ Résumé AR: {(resume_ar[:300] + '...' if len(resume_ar) > 300 else resume_ar or
 CAS À ANALYSER:
 {case_description}
 
-JURISPRUDENCE DISPONIBLE ({len(cases_sample)} cas sur {len(existing_cases)} au total):
+JURISPRUDENCE DISPONIBLE ({sample_count} cas sur {total_count} au total):
 {cases_context}
 
 Analyse les cas et identifie ceux qui sont les plus pertinents. Retourne ta réponse au format JSON strict suivant:
@@ -70,256 +37,192 @@ Analyse les cas et identifie ceux qui sont les plus pertinents. Retourne ta rép
 
 Trouve maximum 5 cas les plus similaires. Si aucun cas similaire n'existe, retourne une liste vide."""
 
+class AIService:
+    def __init__(self):
+        self.api_key = Config.OPENROUTER_API_KEY
+        self.api_url = Config.OPENROUTER_API_URL
+        self.model = 'anthropic/claude-3.5-sonnet'
+        self.packer = PromptPacker(
+            token_budget=Config.AI_PROMPT_TOKEN_BUDGET,
+            max_cases=Config.AI_PROMPT_MAX_CASES
+        )
+    
+    def pack_cases(self, case_description: str, ranked_cases: list) -> PackedPrompt:
+        """Remplit le budget de tokens avec les cas, du plus au moins pertinent"""
+        reserved = estimate_tokens(PROMPT_TEMPLATE) + estimate_tokens(case_description)
+        return self.packer.pack(ranked_cases, reserved_tokens=reserved)
+    
+    def build_prompt(self, case_description: str, packed: PackedPrompt, total_count: int) -> str:
+        return PROMPT_TEMPLATE.format(
+            case_description=case_description,
+            sample_count=len(packed.cases),
+            total_count=total_count,
+            cases_context=packed.context
+        )
+    
+    def build_pipeline(self, candidate_loader=None, hydrator=None) -> SearchPipeline:
+        """Assemble les étapes de la recherche ; chacune peut être remplacée séparément"""
+        return SearchPipeline(self, [
+            CandidateStage(candidate_loader),
+            LexicalRankingStage(),
+            PackingStage(self),
+            LLMStage(self),
+            ParsingStage(),
+            HydrationStage(hydrator),
+        ])
+    
+    def _request(self, prompt: str, stream: bool = False, timeout: int = 60):
+        headers = {
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json',
+            'HTTP-Referer': 'https://jurisprudence-app.replit.app',
+        }
+        
+        data = {
+            'model': self.model,
+            'messages': [
+                {'role': 'user', 'content': prompt}
+            ],
+            'temperature': 0.3,
+            'max_tokens': 3000
+        }
+        if stream:
+            data['stream'] = True
+            data['usage'] = {'include': True}
+        
+        # Import différé : requests n'est chargé qu'au premier appel à l'IA, pas au démarrage du worker
+        import requests
         try:
-            headers = {
-                'Authorization': f'Bearer {self.api_key}',
-                'Content-Type': 'application/json',
-                'HTTP-Referer': 'https://jurisprudence-app.replit.app',
-            }
-            
-            data = {
-                'model': 'anthropic/claude-3.5-sonnet',
-                'messages': [
-                    {'role': 'user', 'content': prompt}
-                ],
-                'temperature': 0.3,
-                'max_tokens': 3000
-            }
-            
-            response = requests.post(self.api_url, json=data, headers=headers, timeout=60)
+            response = requests.post(self.api_url, json=data, headers=headers, timeout=timeout, stream=stream)
             response.raise_for_status()
-            
-            result = response.json()
-            ai_response = result['choices'][0]['message']['content']
-            
-            # Extraire le JSON de la réponse
-            import json
-            import re
-            
-            # Chercher le JSON dans la réponse (entre ```json et ``` si présent, sinon chercher {})
-            json_match = re.search(r'```json\s*(\{.*?\})\s*```', ai_response, re.DOTALL)
-            if not json_match:
-                json_match = re.search(r'\{.*\}', ai_response, re.DOTALL)
-                json_str = json_match.group(0) if json_match else None
-            else:
-                json_str = json_match.group(1)
-            
-            if json_str:
-                # Nettoyer les caractères de contrôle non échappés
-                import unicodedata
-                json_str_cleaned = ''.join(
-                    char if ord(char) >= 32 or char in '\n\r\t' else ' '
-                    for char in json_str
-                )
-                
+        except requests.exceptions.RequestException as e:
+            metrics.llm_error(self.model)
+            raise PipelineError(f'Erreur API: {str(e)}', 'Impossible de contacter le service IA')
+        return response
+    
+    def complete(self, prompt: str):
+        """Appel synchrone : retourne (texte de la réponse, usage)"""
+        started = time.perf_counter()
+        result = self._request(prompt).json()
+        usage = self._extract_usage(result)
+        elapsed = time.perf_counter() - started
+        record_llm(elapsed, usage)
+        metrics.observe_llm(self.model, 'sync', elapsed, usage)
+        return result['choices'][0]['message']['content'], usage
+    
+    def complete_stream(self, prompt: str):
+        """Appel en streaming : produit des couples (fragment de texte, usage ou None)"""
+        import requests
+        started = time.perf_counter()
+        response = self._request(prompt, stream=True, timeout=120)
+        final_usage = None
+        try:
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                line_text = line.decode('utf-8')
+                if not line_text.startswith('data: '):
+                    continue
                 try:
-                    parsed_result = json.loads(json_str_cleaned, strict=False)
-                except json.JSONDecodeError as json_err:
-                    # Si le parsing échoue, essayer de parser sans les newlines
-                    try:
-                        json_str_cleaned = json_str.replace('\n', ' ').replace('\r', ' ').replace('\t', ' ')
-                        parsed_result = json.loads(json_str_cleaned, strict=False)
-                    except:
-                        raise json_err
-                
-                # Récupérer les cas complets correspondants
-                similar_refs = parsed_result.get('similar_cases', [])
-                matched_cases = []
-                for case in existing_cases:
-                    if case.get('ref') in similar_refs:
-                        matched_cases.append(case)
-                
-                return {
-                    'success': True,
-                    'similar_cases': matched_cases,
-                    'analysis': parsed_result.get('analysis', ''),
-                    'recommendations': parsed_result.get('recommendations', ''),
-                    'similarity_reasons': parsed_result.get('similarity_reasons', {}),
-                    'total_cases_analyzed': len(cases_sample),
-                    'total_cases_in_db': len(existing_cases),
-                    'model_used': 'anthropic/claude-3.5-sonnet'
-                }
-            else:
-                # Si pas de JSON trouvé, retourner la réponse brute
-                return {
-                    'success': True,
-                    'similar_cases': [],
-                    'analysis': ai_response,
-                    'recommendations': '',
-                    'total_cases_analyzed': len(cases_sample),
-                    'total_cases_in_db': len(existing_cases)
-                }
-            
+                    chunk_data = json.loads(line_text[6:])
+                except ValueError:
+                    continue
+                usage = self._extract_usage(chunk_data) if chunk_data.get('usage') else None
+                final_usage = usage or final_usage
+                content = ''
+                if chunk_data.get('choices'):
+                    content = chunk_data['choices'][0].get('delta', {}).get('content', '')
+                if content or usage:
+                    yield content, usage
         except requests.exceptions.RequestException as e:
-            return {
-                'error': f'Erreur API: {str(e)}',
-                'similar_cases': [],
-                'analysis': 'Impossible de contacter le service IA'
-            }
-        except Exception as e:
-            return {
-                'error': f'Erreur de traitement: {str(e)}',
+            metrics.llm_error(self.model)
+            raise PipelineError(f'Erreur API: {str(e)}', 'Impossible de contacter le service IA')
+        finally:
+            elapsed = time.perf_counter() - started
+            record_llm(elapsed, final_usage)
+            metrics.observe_llm(self.model, 'stream', elapsed, final_usage)
+    
+    @staticmethod
+    def _extract_usage(payload: dict) -> dict:
+        """Extrait le nombre de tokens consommés d'une réponse OpenRouter"""
+        usage = (payload or {}).get('usage') or {}
+        return {
+            'prompt_tokens': int(usage.get('prompt_tokens') or 0),
+            'completion_tokens': int(usage.get('completion_tokens') or 0)
+        }
+    
+    def _base_result(self, ctx: SearchContext) -> dict:
+        return {
+            'total_cases_analyzed': len(ctx.packed.cases) if ctx.packed else 0,
+            'total_cases_in_db': ctx.total_count,
+            'usage': ctx.usage or self._extract_usage({}),
+            'prompt_stats': ctx.packed.stats() if ctx.packed else {},
+            'timings': ctx.timings
+        }
+    
+    def build_result(self, ctx: SearchContext) -> dict:
+        result = {'success': True}
+        if ctx.parsed is None:
+            # Si pas de JSON trouvé, retourner la réponse brute
+            result.update({
                 'similar_cases': [],
-                'analysis': 'Erreur lors de l\'analyse de la réponse'
-            }
-
-    def find_similar_cases_streaming(self, case_description: str, existing_cases: list):
-        """Version avec streaming pour afficher la réflexion de l'IA en temps réel"""
-        if not self.api_key:
-            yield f"data: {{'error': 'API OpenRouter non configurée'}}\n\n"
-            return
-        
-        yield f"data: {{'type': 'progress', 'message': 'Indexation des cas de jurisprudence...'}}\n\n"
-        
-        # Créer un index complet de tous les cas avec leurs informations
-        cases_index = []
-        for i, case in enumerate(existing_cases):
-            # Inclure le texte en français ET en arabe pour une meilleure similarité
-            resume_fr = case.get('resume_francais', '')
-            resume_ar = case.get('resume_arabe', '')
-            
-            case_text = f"""Réf: {case.get('ref', 'N/A')}
-Titre: {case.get('titre', 'N/A')}
-Juridiction: {case.get('juridiction', 'N/A')}
-Date: {case.get('date_decision', 'N/A')}
-Thème: {case.get('theme', 'N/A')}
-Mots-clés: {case.get('mots_cles', 'N/A')}
-Résumé FR: {(resume_fr[:300] + '...' if len(resume_fr) > 300 else resume_fr or 'N/A')}
-Résumé AR: {(resume_ar[:300] + '...' if len(resume_ar) > 300 else resume_ar or 'N/A')}"""
-            
-            cases_index.append({
-                'index': i,
-                'ref': case.get('ref'),
-                'titre': case.get('titre'),
-                'context': case_text
+                'analysis': ctx.raw_response,
+                'recommendations': ''
             })
+        else:
+            result.update({
+                'similar_cases': ctx.results,
+                'analysis': ctx.parsed.get('analysis', ''),
+                'recommendations': ctx.parsed.get('recommendations', ''),
+                'similarity_reasons': ctx.parsed.get('similarity_reasons', {}),
+                'model_used': self.model
+            })
+        result.update(self._base_result(ctx))
+        return result
+    
+    def error_result(self, error: str, analysis: str, ctx: SearchContext = None) -> dict:
+        result = {
+            'error': error,
+            'similar_cases': [],
+            'analysis': analysis
+        }
+        if ctx is not None:
+            result.update(self._base_result(ctx))
+        return result
+    
+    def find_similar_cases(self, case_description: str, existing_cases: list, hydrator=None) -> dict:
+        if not self.api_key:
+            return self.error_result('API OpenRouter non configurée', 'Veuillez configurer OPENROUTER_API_KEY')
         
-        cases_sample = cases_index[:50] if len(cases_index) > 50 else cases_index
-        
-        yield f"data: {{'type': 'progress', 'message': '{len(cases_sample)} cas indexés sur {len(existing_cases)} au total'}}\n\n"
-        
-        cases_context = "\n\n---\n\n".join([c['context'] for c in cases_sample])
-        
-        prompt = f"""Tu es un expert juridique spécialisé dans le droit marocain. Analyse la description du cas fournie et trouve les cas similaires dans la jurisprudence.
-
-**INSTRUCTIONS IMPORTANTES:**
-- Analyse à la fois le texte en français ET en arabe pour trouver les meilleures similarités
-- Même si la requête est en français, compare-la aussi avec les résumés arabes
-- Une décision avec un résumé arabe pertinent doit être incluse même si le résumé français est moins précis
-
-CAS À ANALYSER:
-{case_description}
-
-JURISPRUDENCE DISPONIBLE ({len(cases_sample)} cas sur {len(existing_cases)} au total):
-{cases_context}
-
-Analyse les cas et identifie ceux qui sont les plus pertinents. Retourne ta réponse au format JSON strict suivant:
-{{
-  "similar_cases": ["réf1", "réf2", "réf3"],
-  "similarity_reasons": {{
-    "réf1": "raison détaillée",
-    "réf2": "raison détaillée",
-    "réf3": "raison détaillée"
-  }},
-  "analysis": "analyse globale des similitudes trouvées",
-  "recommendations": "recommandations juridiques basées sur ces précédents"
-}}
-
-Trouve maximum 5 cas les plus similaires. Si aucun cas similaire n'existe, retourne une liste vide."""
-
-        yield f"data: {{'type': 'progress', 'message': 'Envoi de la requête à l\\'IA...'}}\n\n"
-        
+        ctx = SearchContext(query=case_description, candidates=existing_cases)
+        return self.build_pipeline(hydrator=hydrator).run(ctx)
+    
+    def find_similar_cases_streaming(self, case_description: str, existing_cases: list, on_complete=None, hydrator=None):
+        """
+        Version avec streaming pour afficher la réflexion de l'IA en temps réel.
+        `on_complete` est appelé avec le résultat final (succès ou erreur)
+        une fois le flux terminé.
+        """
+        result = None
         try:
-            headers = {
-                'Authorization': f'Bearer {self.api_key}',
-                'Content-Type': 'application/json',
-                'HTTP-Referer': 'https://jurisprudence-app.replit.app',
-            }
-            
-            data = {
-                'model': 'anthropic/claude-3.5-sonnet',
-                'messages': [
-                    {'role': 'user', 'content': prompt}
-                ],
-                'temperature': 0.3,
-                'max_tokens': 3000,
-                'stream': True
-            }
-            
-            yield f"data: {{'type': 'progress', 'message': 'L\\'IA analyse les cas... (cela peut prendre 15-30 secondes)'}}\n\n"
-            
-            response = requests.post(self.api_url, json=data, headers=headers, timeout=120, stream=True)
-            response.raise_for_status()
-            
-            full_response = ""
-            for line in response.iter_lines():
-                if line:
-                    line_text = line.decode('utf-8')
-                    if line_text.startswith('data: '):
-                        try:
-                            import json
-                            chunk_data = json.loads(line_text[6:])
-                            if 'choices' in chunk_data and len(chunk_data['choices']) > 0:
-                                delta = chunk_data['choices'][0].get('delta', {})
-                                content = delta.get('content', '')
-                                if content:
-                                    full_response += content
-                                    # Envoyer des mises à jour régulières
-                                    if len(full_response) % 100 < 10:  # Tous les ~100 caractères
-                                        yield f"data: {{'type': 'thinking', 'message': 'Réflexion en cours...'}}\n\n"
-                        except:
-                            continue
-            
-            yield f"data: {{'type': 'progress', 'message': 'Traitement de la réponse de l\\'IA...'}}\n\n"
-            
-            # Traiter la réponse complète
-            import json
-            import re
-            
-            json_match = re.search(r'```json\s*(\{.*?\})\s*```', full_response, re.DOTALL)
-            if not json_match:
-                json_match = re.search(r'\{.*\}', full_response, re.DOTALL)
-                json_str = json_match.group(0) if json_match else None
-            else:
-                json_str = json_match.group(1)
-            
-            if json_str:
-                import unicodedata
-                json_str_cleaned = ''.join(
-                    char if ord(char) >= 32 or char in '\n\r\t' else ' '
-                    for char in json_str
-                )
-                
-                try:
-                    parsed_result = json.loads(json_str_cleaned, strict=False)
-                except json.JSONDecodeError:
-                    json_str_cleaned = json_str.replace('\n', ' ').replace('\r', ' ').replace('\t', ' ')
-                    parsed_result = json.loads(json_str_cleaned, strict=False)
-                
-                # Récupérer les cas complets correspondants
-                similar_refs = parsed_result.get('similar_cases', [])
-                matched_cases = []
-                for case in existing_cases:
-                    if case.get('ref') in similar_refs:
-                        matched_cases.append(case)
-                
-                result = {
-                    'success': True,
-                    'similar_cases': matched_cases,
-                    'analysis': parsed_result.get('analysis', ''),
-                    'recommendations': parsed_result.get('recommendations', ''),
-                    'similarity_reasons': parsed_result.get('similarity_reasons', {}),
-                    'total_cases_analyzed': len(cases_sample),
-                    'total_cases_in_db': len(existing_cases),
-                    'model_used': 'anthropic/claude-3.5-sonnet'
-                }
-                
-                import json as json_module
-                yield f"data: {{'type': 'complete', 'result': {json_module.dumps(result, ensure_ascii=False)}}}\n\n"
-            else:
-                yield f"data: {{'type': 'error', 'message': 'Format de réponse invalide'}}\n\n"
-                
-        except Exception as e:
-            yield f"data: {{'type': 'error', 'message': 'Erreur: {str(e)}'}}\n\n"
+            if not self.api_key:
+                result = self.error_result('API OpenRouter non configurée', 'Veuillez configurer OPENROUTER_API_KEY')
+                yield self._sse({'type': 'error', 'message': result['error']})
+                return
+            
+            ctx = SearchContext(query=case_description, candidates=existing_cases)
+            for event in self.build_pipeline(hydrator=hydrator).stream(ctx):
+                if event['type'] in ('complete', 'error'):
+                    result = event.get('result')
+                    if event['type'] == 'error':
+                        event = {'type': 'error', 'message': event['message']}
+                yield self._sse(event)
+        finally:
+            if on_complete:
+                on_complete(result)
+    
+    @staticmethod
+    def _sse(event: dict) -> str:
+        return f"data: {json_provider.dumps(event)}\n\n"
 
 ai_service = AIService()
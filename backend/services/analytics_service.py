@@ -0,0 +1,138 @@
+from datetime import datetime, date, timedelta
+from sqlalchemy import case, func
+from sqlalchemy.exc import IntegrityError
+from backend.models.user import db, User
+from backend.models.analytics import SearchUsageDaily
+
+class AnalyticsService:
+    """Maintient et lit les agrégats quotidiens d'utilisation de la recherche"""
+
+    def record_search(self, user_id: int, latency_ms: float, hits: int,
+                      prompt_tokens: int = 0, completion_tokens: int = 0, error: bool = False):
+        """
+        Incrémente la ligne (utilisateur, jour) en une seule requête UPDATE.
+        La ligne est créée à la première recherche du jour ; en cas de course
+        entre deux workers, l'insertion perdante retombe sur l'UPDATE.
+        """
+        latency_ms = int(latency_ms or 0)
+        increments = {
+            SearchUsageDaily.search_count: SearchUsageDaily.search_count + 1,
+            SearchUsageDaily.error_count: SearchUsageDaily.error_count + (1 if error else 0),
+            SearchUsageDaily.total_latency_ms: SearchUsageDaily.total_latency_ms + latency_ms,
+            SearchUsageDaily.max_latency_ms: case(
+                (SearchUsageDaily.max_latency_ms < latency_ms, latency_ms),
+                else_=SearchUsageDaily.max_latency_ms
+            ),
+            SearchUsageDaily.hits_returned: SearchUsageDaily.hits_returned + int(hits or 0),
+            SearchUsageDaily.prompt_tokens: SearchUsageDaily.prompt_tokens + int(prompt_tokens or 0),
+            SearchUsageDaily.completion_tokens: SearchUsageDaily.completion_tokens + int(completion_tokens or 0),
+            SearchUsageDaily.updated_at: datetime.utcnow(),
+        }
+        today = date.today()
+
+        for _ in range(2):
+            updated = SearchUsageDaily.query.filter_by(user_id=user_id, day=today).update(
+                increments, synchronize_session=False
+            )
+            if updated:
+                db.session.commit()
+                return
+
+            try:
+                db.session.add(SearchUsageDaily(
+                    user_id=user_id,
+                    day=today,
+                    search_count=1,
+                    error_count=1 if error else 0,
+                    total_latency_ms=latency_ms,
+                    max_latency_ms=latency_ms,
+                    hits_returned=int(hits or 0),
+                    prompt_tokens=int(prompt_tokens or 0),
+                    completion_tokens=int(completion_tokens or 0)
+                ))
+                db.session.commit()
+                return
+            except IntegrityError:
+                # Un autre worker a créé la ligne entre-temps : on réessaie l'UPDATE
+                db.session.rollback()
+
+    @staticmethod
+    def _totals_columns():
+        return [
+            func.coalesce(func.sum(SearchUsageDaily.search_count), 0).label('searches'),
+            func.coalesce(func.sum(SearchUsageDaily.error_count), 0).label('errors'),
+            func.coalesce(func.sum(SearchUsageDaily.total_latency_ms), 0).label('total_latency_ms'),
+            func.coalesce(func.max(SearchUsageDaily.max_latency_ms), 0).label('max_latency_ms'),
+            func.coalesce(func.sum(SearchUsageDaily.hits_returned), 0).label('hits_returned'),
+            func.coalesce(func.sum(SearchUsageDaily.prompt_tokens), 0).label('prompt_tokens'),
+            func.coalesce(func.sum(SearchUsageDaily.completion_tokens), 0).label('completion_tokens'),
+        ]
+
+    @staticmethod
+    def _row_to_dict(row) -> dict:
+        searches = int(row.searches or 0)
+        return {
+            'searches': searches,
+            'errors': int(row.errors or 0),
+            'avg_latency_ms': round(int(row.total_latency_ms or 0) / searches, 1) if searches else 0,
+            'max_latency_ms': int(row.max_latency_ms or 0),
+            'hits_returned': int(row.hits_returned or 0),
+            'avg_hits': round(int(row.hits_returned or 0) / searches, 2) if searches else 0,
+            'prompt_tokens': int(row.prompt_tokens or 0),
+            'completion_tokens': int(row.completion_tokens or 0),
+        }
+
+    def summary(self, days: int = 30) -> dict:
+        """Totaux globaux sur la période"""
+        since = date.today() - timedelta(days=days - 1)
+        row = db.session.query(*self._totals_columns()).filter(SearchUsageDaily.day >= since).one()
+        active_users = db.session.query(func.count(func.distinct(SearchUsageDaily.user_id))).filter(
+            SearchUsageDaily.day >= since
+        ).scalar()
+
+        result = self._row_to_dict(row)
+        result['active_users'] = int(active_users or 0)
+        result['since'] = since.isoformat()
+        return result
+
+    def daily(self, days: int = 30, user_id: int = None) -> list:
+        """Série quotidienne, tous utilisateurs confondus ou pour un utilisateur"""
+        since = date.today() - timedelta(days=days - 1)
+        query = db.session.query(SearchUsageDaily.day, *self._totals_columns()).filter(
+            SearchUsageDaily.day >= since
+        )
+        if user_id is not None:
+            query = query.filter(SearchUsageDaily.user_id == user_id)
+        rows = query.group_by(SearchUsageDaily.day).order_by(SearchUsageDaily.day).all()
+
+        series = []
+        for row in rows:
+            entry = self._row_to_dict(row)
+            entry['day'] = row.day.isoformat()
+            series.append(entry)
+        return series
+
+    def by_user(self, days: int = 30, limit: int = 50) -> list:
+        """Classement des utilisateurs par nombre de recherches sur la période"""
+        since = date.today() - timedelta(days=days - 1)
+        searches = func.sum(SearchUsageDaily.search_count)
+        rows = db.session.query(
+            SearchUsageDaily.user_id, User.email, User.first_name, User.last_name, *self._totals_columns()
+        ).join(User, User.id == SearchUsageDaily.user_id).filter(
+            SearchUsageDaily.day >= since
+        ).group_by(
+            SearchUsageDaily.user_id, User.email, User.first_name, User.last_name
+        ).order_by(searches.desc()).limit(limit).all()
+
+        users = []
+        for row in rows:
+            entry = self._row_to_dict(row)
+            entry.update({
+                'user_id': row.user_id,
+                'email': row.email,
+                'name': f'{row.first_name} {row.last_name}'
+            })
+            users.append(entry)
+        return users
+
+analytics_service = AnalyticsService()
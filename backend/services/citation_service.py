@@ -0,0 +1,121 @@
+from sqlalchemy import case as sql_case, func, select
+from sqlalchemy.orm import undefer
+from backend.models.user import db
+from backend.models.case import JurisprudenceCase
+from backend.models.citation import CaseCitation
+from backend.utils.citation_extractor import extract_citations, normalize_article, normalize_code
+
+# Champs analysés ; une citation de la base légale indique que l'article est
+# appliqué par la décision, une citation du texte intégral peut n'être qu'évoquée
+CITATION_FIELDS = ('base_legale', 'texte_integral')
+
+class CitationService:
+    """Maintient l'index des références légales citées et y répond par simple lecture d'index"""
+    
+    def _case_texts(self, case, texts=None):
+        texts = texts or {}
+        values = {}
+        for field in CITATION_FIELDS:
+            if field in texts:
+                values[field] = texts[field] or ''
+            elif field == 'texte_integral':
+                values[field] = case.get_texte_integral() if case.has_texte_integral else ''
+            else:
+                values[field] = getattr(case, field) or ''
+        return values
+    
+    def index_case(self, case, texts=None):
+        """
+        Remplace les citations du cas (sans commit). Le cas doit avoir un id :
+        appeler après db.session.flush() pour un nouveau cas.
+        """
+        rows = []
+        for field, text in self._case_texts(case, texts).items():
+            for (code, article), count in extract_citations(text).items():
+                rows.append({
+                    'code': code,
+                    'article': article,
+                    'case_id': case.id,
+                    'field': field,
+                    'occurrences': min(count, 32767)
+                })
+        CaseCitation.query.filter_by(case_id=case.id).delete(synchronize_session=False)
+        if rows:
+            db.session.execute(CaseCitation.__table__.insert(), rows)
+        return len(rows)
+    
+    def remove_cases(self, case_ids=None):
+        """Supprime les citations des cas donnés, ou de tous les cas (sans commit)"""
+        query = CaseCitation.query
+        if case_ids is not None:
+            query = query.filter(CaseCitation.case_id.in_(case_ids))
+        query.delete(synchronize_session=False)
+    
+    def cases_citing(self, article, code=None, page=1, per_page=20):
+        """
+        Cas citant l'article (d'un code donné, ou de n'importe quel code) :
+        ceux qui le citent en base légale d'abord, puis par nombre d'occurrences.
+        """
+        article = normalize_article(article)
+        in_base_legale = func.max(sql_case((CaseCitation.field == 'base_legale', 1), else_=0)).label('in_base_legale')
+        occurrences = func.sum(CaseCitation.occurrences).label('occurrences')
+        
+        grouped = select(CaseCitation.case_id, in_base_legale, occurrences).where(
+            CaseCitation.article == article
+        ).group_by(CaseCitation.case_id)
+        if code is not None:
+            grouped = grouped.where(CaseCitation.code == normalize_code(code))
+        
+        total = db.session.execute(select(func.count()).select_from(grouped.subquery())).scalar()
+        rows = db.session.execute(
+            grouped.order_by(in_base_legale.desc(), occurrences.desc(), CaseCitation.case_id.desc())
+            .limit(per_page).offset((page - 1) * per_page)
+        ).all()
+        
+        return {
+            'ids': [row.case_id for row in rows],
+            'citations': {
+                row.case_id: {'in_base_legale': bool(row.in_base_legale), 'occurrences': int(row.occurrences or 0)}
+                for row in rows
+            },
+            'total': total,
+            'article': article,
+            'code': normalize_code(code) if code is not None else None
+        }
+    
+    def citations_for_case(self, case_id):
+        """Références citées par un cas, regroupées par (code, article)"""
+        rows = db.session.query(
+            CaseCitation.code, CaseCitation.article, CaseCitation.field, CaseCitation.occurrences
+        ).filter(CaseCitation.case_id == case_id).order_by(CaseCitation.code, CaseCitation.article).all()
+        
+        citations = {}
+        for code, article, field, count in rows:
+            entry = citations.setdefault((code, article), {'code': code, 'article': article, 'fields': [], 'occurrences': 0})
+            entry['fields'].append(field)
+            entry['occurrences'] += count
+        return list(citations.values())
+    
+    def rebuild(self, batch_size=100, progress=None):
+        """Réindexe tous les cas par lots ordonnés par id, un commit par lot"""
+        last_id = 0
+        indexed = 0
+        while True:
+            batch = JurisprudenceCase.query.options(
+                undefer(JurisprudenceCase.texte_integral_blob),
+                undefer(JurisprudenceCase.texte_integral_encrypted)
+            ).filter(JurisprudenceCase.id > last_id).order_by(JurisprudenceCase.id).limit(batch_size).all()
+            if not batch:
+                break
+            for case in batch:
+                self.index_case(case)
+                last_id = case.id
+            db.session.commit()
+            db.session.expunge_all()
+            indexed += len(batch)
+            if progress:
+                progress(indexed, last_id)
+        return indexed
+
+citation_service = CitationService()
+
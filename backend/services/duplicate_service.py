@@ -0,0 +1,85 @@
+from backend.config import Config
+from backend.models.user import db
+from backend.models.case import JurisprudenceCase
+from backend.models.search_index import CaseMinHash, CaseLSHBucket
+from backend.utils.blind_index import derive_index_key
+from backend.utils.minhash import MinHasher, band_hashes, from_bytes, similarity, to_bytes
+
+# Valeurs par défaut de l'extracteur PDF quand un champ est introuvable
+PLACEHOLDERS = {'Non disponible', 'غير متوفر'}
+
+# Champs dont le contenu identifie une décision (les métadonnées, comme la
+# référence, diffèrent justement entre deux publications d'une même décision)
+CONTENT_FIELDS = ('resume_francais', 'resume_arabe', 'texte_integral')
+
+class DuplicateService:
+    """Détection des quasi-doublons par MinHash + LSH, sans comparaison deux à deux"""
+    
+    def __init__(self):
+        if not Config.BLIND_INDEX_KEY:
+            raise ValueError("BLIND_INDEX_KEY doit être définie")
+        self.minhasher = MinHasher(derive_index_key(Config.BLIND_INDEX_KEY, info=b'jurisprudence-minhash-v1'))
+    
+    def content_text(self, data):
+        parts = [data.get(field) for field in CONTENT_FIELDS]
+        return '\n'.join(p for p in parts if p and p not in PLACEHOLDERS)
+    
+    def signature_for(self, data, fallback_text=None):
+        """Signature du contenu d'un cas (dictionnaire de champs en clair), sous forme de liste"""
+        signature = self.minhasher.signature(self.content_text(data) or fallback_text or '')
+        return signature.tolist() if signature is not None else None
+    
+    def signature_for_case(self, case):
+        data = case.to_dict(decrypt=True)
+        return self.signature_for(data)
+    
+    def find_near_duplicates(self, signature, threshold=None, exclude_case_id=None, limit=5):
+        """
+        Cas dont la similarité estimée dépasse `threshold`. Seuls les cas
+        partageant au moins une bande LSH sont chargés et comparés.
+        """
+        if signature is None:
+            return []
+        threshold = Config.NEAR_DUPLICATE_THRESHOLD if threshold is None else threshold
+        
+        candidate_ids = {
+            row.case_id for row in db.session.query(CaseLSHBucket.case_id).filter(
+                CaseLSHBucket.bucket_hash.in_(band_hashes(signature))
+            ).distinct()
+        }
+        candidate_ids.discard(exclude_case_id)
+        if not candidate_ids:
+            return []
+        
+        rows = db.session.query(CaseMinHash.case_id, CaseMinHash.signature, JurisprudenceCase.ref).join(
+            JurisprudenceCase, JurisprudenceCase.id == CaseMinHash.case_id
+        ).filter(CaseMinHash.case_id.in_(candidate_ids)).all()
+        
+        matches = []
+        for case_id, stored, ref in rows:
+            score = similarity(signature, from_bytes(stored))
+            if score >= threshold:
+                matches.append({'case_id': case_id, 'ref': ref, 'similarity': round(score, 3)})
+        matches.sort(key=lambda m: -m['similarity'])
+        return matches[:limit]
+    
+    def index_case(self, case_id, signature):
+        """Enregistre (ou remplace) la signature et les bandes d'un cas, sans commit"""
+        self.remove_cases([case_id])
+        if signature is None:
+            return
+        db.session.add(CaseMinHash(case_id=case_id, signature=to_bytes(signature)))
+        db.session.execute(
+            CaseLSHBucket.__table__.insert(),
+            [{'bucket_hash': bucket, 'case_id': case_id} for bucket in set(band_hashes(signature))]
+        )
+    
+    def remove_cases(self, case_ids=None):
+        """Supprime signatures et bandes des cas donnés, ou de tous les cas (sans commit)"""
+        for model in (CaseLSHBucket, CaseMinHash):
+            query = model.query
+            if case_ids is not None:
+                query = query.filter(model.case_id.in_(case_ids))
+            query.delete(synchronize_session=False)
+
+duplicate_service = DuplicateService()
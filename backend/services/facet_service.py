@@ -0,0 +1,121 @@
+import threading
+from collections import OrderedDict
+from datetime import date
+from sqlalchemy import extract, func, select
+from backend.config import Config
+from backend.utils import metrics
+from backend.models.user import db
+from backend.models.case import JurisprudenceCase
+
+# Facettes exposées : colonne (ou expression) groupée pour chacune
+FACET_COLUMNS = {
+    'juridiction': JurisprudenceCase.juridiction,
+    'chambre': JurisprudenceCase.chambre,
+    'type_decision': JurisprudenceCase.type_decision,
+    'theme': JurisprudenceCase.theme,
+    'year': extract('year', JurisprudenceCase.date_decision),
+}
+
+def parse_filters(args):
+    """
+    Filtres communs à la liste des cas et aux facettes, lus dans la query
+    string ; chaque paramètre peut être répété (?chambre=Civile&chambre=Sociale)
+    """
+    filters = {}
+    for field in FACET_COLUMNS:
+        values = [v.strip() for v in args.getlist(field) if v and v.strip()]
+        if field == 'year':
+            values = [int(v) for v in values if v.isdigit()]
+        if values:
+            filters[field] = sorted(set(values))
+    return filters
+
+def _conditions(filters, exclude=None):
+    conditions = []
+    for field, values in filters.items():
+        if field == exclude:
+            continue
+        if field == 'year':
+            # Intervalles de dates plutôt qu'EXTRACT : l'index sur date_decision reste utilisable
+            conditions.append(db.or_(*[
+                db.and_(JurisprudenceCase.date_decision >= date(year, 1, 1),
+                        JurisprudenceCase.date_decision < date(year + 1, 1, 1))
+                for year in values
+            ]))
+        else:
+            conditions.append(FACET_COLUMNS[field].in_(values))
+    return conditions
+
+def apply_filters(query, filters):
+    """Applique les filtres à une requête sur JurisprudenceCase"""
+    for condition in _conditions(filters):
+        query = query.filter(condition)
+    return query
+
+class FacetService:
+    """
+    Comptages groupés par facette, calculés en SQL. Les résultats sont gardés
+    en mémoire (par processus) et indexés par la version du corpus : tout
+    ajout, modification ou suppression de cas change la version, et les
+    entrées anciennes ne sont simplement plus jamais lues.
+    """
+    
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries or Config.FACETS_CACHE_SIZE
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def corpus_version(self):
+        """(nombre de cas, dernière modification) : une seule requête d'agrégat"""
+        count, last_update = db.session.execute(
+            select(func.count(JurisprudenceCase.id), func.max(JurisprudenceCase.updated_at))
+        ).one()
+        return count, last_update.isoformat() if last_update else None
+    
+    def _compute(self, filters, limit):
+        total = db.session.execute(
+            select(func.count(JurisprudenceCase.id)).where(*_conditions(filters))
+        ).scalar()
+        
+        facets = {}
+        for field, column in FACET_COLUMNS.items():
+            # Une facette ignore son propre filtre : les autres valeurs restent
+            # affichées avec leur effectif, pour élargir la sélection
+            value = column.label('value')
+            count = func.count(JurisprudenceCase.id).label('count')
+            rows = db.session.execute(
+                select(value, count).where(*_conditions(filters, exclude=field))
+                .group_by(column).order_by(count.desc(), column).limit(limit)
+            ).all()
+            facets[field] = [
+                {'value': int(row.value) if field == 'year' and row.value is not None else row.value,
+                 'count': row.count}
+                for row in rows
+            ]
+        return {'total': total, 'facets': facets}
+    
+    def facets(self, filters, limit=None):
+        """Effectifs par facette pour les cas correspondant aux filtres"""
+        limit = limit or Config.FACETS_LIMIT
+        key = (self.corpus_version(), tuple(sorted((f, tuple(v)) for f, v in filters.items())), limit)
+        
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                metrics.cache_lookup('facets', True)
+                return dict(cached, cached=True)
+        
+        metrics.cache_lookup('facets', False)
+        result = self._compute(filters, limit)
+        with self._lock:
+            self._cache[key] = result
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return dict(result, cached=False)
+    
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+facet_service = FacetService()
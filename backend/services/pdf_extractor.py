@@ -1,16 +1,16 @@
 import re
-import PyPDF2
 from datetime import datetime
 from typing import Dict, Optional
 import os
-import requests
+import time
+from backend.utils import metrics
 
 class PDFExtractor:
     """Service pour extraire les informations structurées des PDFs de jurisprudence"""
     
     def __init__(self):
         self.openrouter_api_key = os.environ.get('OPENROUTER_API_KEY')
-        self.openrouter_url = 'https://openrouter.ai/api/v1/chat/completions'
+        self.openrouter_url = os.environ.get('OPENROUTER_API_URL', 'https://openrouter.ai/api/v1/chat/completions')
         
         self.field_patterns = {
             'ref': [
@@ -60,6 +60,8 @@ class PDFExtractor:
     
     def extract_text_from_pdf(self, pdf_file) -> str:
         """Extrait tout le texte d'un fichier PDF et le nettoie"""
+        # Import différé : PyPDF2 n'est chargé qu'au premier import de PDF
+        import PyPDF2
         try:
             pdf_reader = PyPDF2.PdfReader(pdf_file)
             text = ''
@@ -234,6 +236,7 @@ class PDFExtractor:
         if not self.openrouter_api_key:
             return {}
         
+        import requests
         try:
             prompt = f"""Extrait les informations suivantes du texte juridique marocain ci-dessous. Réponds UNIQUEMENT en JSON valide sans texte additionnel:
 
@@ -282,6 +285,7 @@ Texte à analyser:
     
     def extract_all_fields(self, pdf_file) -> Dict[str, any]:
         """Extrait tous les champs d'un PDF de jurisprudence"""
+        started = time.perf_counter()
         try:
             text = self.extract_text_from_pdf(pdf_file)
             
@@ -315,6 +319,11 @@ Texte à analyser:
             parsed_date = self.parse_date(date_str) if date_str else None
             extracted_data['date_decision'] = parsed_date
             
+            # Signature MinHash du contenu, pour repérer les quasi-doublons avant insertion
+            from backend.services.duplicate_service import duplicate_service
+            extracted_data['minhash_signature'] = duplicate_service.signature_for(extracted_data, fallback_text=text)
+            
+            metrics.observe_extraction(time.perf_counter() - started)
             return extracted_data
             
         except Exception as e:
@@ -0,0 +1,138 @@
+"""
+Identité de l'utilisateur connecté, résolue une fois puis gardée en mémoire.
+
+Sans cache, chaque requête authentifiée relit l'utilisateur, son rôle et ses
+permissions. Le chargeur de Flask-Login renvoie ici un Principal : copie
+légère et immuable de l'utilisateur, permissions en frozenset, gardée par
+processus pendant PRINCIPAL_CACHE_TTL secondes.
+
+Invalidation : toute modification d'un utilisateur, d'un rôle ou d'une
+permission validée par ce processus (événements de session SQLAlchemy) retire
+les entrées concernées dès le commit. Les autres workers l'observent au plus
+tard à l'expiration du TTL, qui doit donc rester court.
+"""
+import threading
+import time
+from functools import wraps
+from flask import jsonify
+from flask_login import UserMixin, current_user
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from backend.config import Config
+from backend.utils import metrics
+from backend.models.user import db, User
+from backend.models.role import Role, Permission
+
+class Principal(UserMixin):
+    """Utilisateur authentifié tel que vu par les routes (lecture seule)"""
+    __slots__ = ('id', 'email', 'first_name', 'last_name', 'is_admin', 'is_approved',
+                 'role_id', 'role_name', 'permissions')
+
+    def __init__(self, user):
+        self.id = user.id
+        self.email = user.email
+        self.first_name = user.first_name
+        self.last_name = user.last_name
+        self.is_admin = user.is_admin
+        self.is_approved = user.is_approved
+        self.role_id = user.role_id
+        self.role_name = user.role.name if user.role else None
+        self.permissions = frozenset(p.name for p in user.role.permissions) if user.role else frozenset()
+
+    def has_permission(self, permission_name):
+        return self.is_admin or permission_name in self.permissions
+
+    def __repr__(self):
+        return f'<Principal {self.email}>'
+
+class PrincipalCache:
+    def __init__(self, ttl=None, max_entries=10000):
+        self.ttl = Config.PRINCIPAL_CACHE_TTL if ttl is None else ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        """Principal de l'utilisateur, ou None s'il n'existe plus"""
+        entry = self._entries.get(user_id)
+        now = time.monotonic()
+        if entry is not None and entry[0] > now:
+            metrics.cache_lookup('principal', True)
+            return entry[1]
+
+        metrics.cache_lookup('principal', False)
+        user = User.query.get(user_id)
+        if user is None:
+            self.invalidate(user_id)
+            return None
+        principal = Principal(user)
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries = {k: v for k, v in self._entries.items() if v[0] > now}
+            self._entries[user_id] = (now + self.ttl, principal)
+        return principal
+
+    def invalidate(self, user_id=None):
+        """Retire un utilisateur du cache, ou tous les utilisateurs"""
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+principal_cache = PrincipalCache()
+
+def permission_required(permission_name):
+    """Décorateur de route : 403 si l'utilisateur n'a pas la permission (les admins l'ont toujours)"""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if not current_user.is_authenticated or not current_user.has_permission(permission_name):
+                return jsonify({'error': 'Accès non autorisé'}), 403
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
+
+# --- Invalidation sur modification --------------------------------------
+# Les changements sont relevés à chaque flush et appliqués au commit
+# seulement : un rollback les abandonne.
+
+_ALL = object()
+
+def _pending(session):
+    return session.info.setdefault('principal_invalidations', set())
+
+@event.listens_for(Session, 'after_flush')
+def _collect_invalidations(session, flush_context):
+    pending = None
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User):
+            pending = pending if pending is not None else _pending(session)
+            pending.add(obj.id)
+        elif isinstance(obj, (Role, Permission)):
+            pending = pending if pending is not None else _pending(session)
+            pending.add(_ALL)
+
+def _collect_bulk_invalidation(context):
+    # Query.update() / Query.delete() ne passent pas par le flush : les
+    # lignes touchées ne sont pas connues, tout le cache est invalidé
+    if context.mapper.class_ in (User, Role, Permission):
+        _pending(context.session).add(_ALL)
+
+event.listen(Session, 'after_bulk_update', _collect_bulk_invalidation)
+event.listen(Session, 'after_bulk_delete', _collect_bulk_invalidation)
+
+@event.listens_for(Session, 'after_commit')
+def _apply_invalidations(session):
+    pending = session.info.pop('principal_invalidations', None)
+    if not pending:
+        return
+    if _ALL in pending:
+        principal_cache.invalidate()
+    else:
+        for user_id in pending:
+            principal_cache.invalidate(user_id)
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_invalidations(session, previous_transaction):
+    session.info.pop('principal_invalidations', None)
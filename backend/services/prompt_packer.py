@@ -0,0 +1,115 @@
+import math
+import re
+from dataclasses import dataclass, field
+from typing import List
+from backend.utils.text_cleaner import truncate_text
+
+ARABIC_CHARS = re.compile(r'[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF\uFB50-\uFDFF\uFE70-\uFEFF]')
+
+# Ratios caractères/token observés sur les tokenizers BPE pour nos deux langues :
+# le français tourne autour de 4 caractères par token, l'arabe autour de 2.5
+LATIN_CHARS_PER_TOKEN = 4.0
+ARABIC_CHARS_PER_TOKEN = 2.5
+
+def estimate_tokens(text: str) -> int:
+    """Estime le nombre de tokens d'un texte mixte français/arabe"""
+    if not text:
+        return 0
+    arabic = len(ARABIC_CHARS.findall(text))
+    latin = len(text) - arabic
+    return math.ceil(latin / LATIN_CHARS_PER_TOKEN + arabic / ARABIC_CHARS_PER_TOKEN)
+
+@dataclass
+class PackedPrompt:
+    """Résultat du remplissage : contexte prêt à insérer et comptabilité des tokens"""
+    context: str
+    cases: List[dict] = field(default_factory=list)
+    tokens_used: int = 0
+    token_budget: int = 0
+    candidates_count: int = 0
+
+    @property
+    def skipped_count(self) -> int:
+        return self.candidates_count - len(self.cases)
+
+    def stats(self) -> dict:
+        return {
+            'prompt_tokens_estimated': self.tokens_used,
+            'prompt_token_budget': self.token_budget,
+            'cases_packed': len(self.cases),
+            'cases_skipped': self.skipped_count
+        }
+
+class PromptPacker:
+    """
+    Remplit un budget de tokens avec les cas candidats, dans l'ordre de leur rang.
+    Les cas les mieux classés reçoivent plus de place pour leurs résumés FR/AR ;
+    l'espace décroît avec le rang jusqu'à un plancher, puis le remplissage
+    s'arrête dès qu'un cas ne tient plus dans le budget.
+    """
+
+    SEPARATOR = "\n\n---\n\n"
+
+    def __init__(self, token_budget: int, max_cases: int = 200, max_summary_chars: int = 1200,
+                 min_summary_chars: int = 150, rank_decay: float = 0.15):
+        self.token_budget = token_budget
+        self.max_cases = max_cases
+        self.max_summary_chars = max_summary_chars
+        self.min_summary_chars = min_summary_chars
+        self.rank_decay = rank_decay
+
+    def summary_allowance(self, rank: int) -> int:
+        """Nombre de caractères de résumé (FR + AR) accordé au cas de rang `rank`"""
+        allowance = self.max_summary_chars / (1 + self.rank_decay * rank)
+        return max(self.min_summary_chars, int(allowance))
+
+    @staticmethod
+    def split_allowance(allowance: int, resume_fr: str, resume_ar: str):
+        """Répartit l'espace entre les deux résumés, en reportant l'inutilisé sur l'autre"""
+        half = allowance // 2
+        fr_len, ar_len = len(resume_fr or ''), len(resume_ar or '')
+        fr_chars = min(fr_len, half + max(0, half - ar_len))
+        ar_chars = min(ar_len, allowance - fr_chars)
+        return fr_chars, ar_chars
+
+    def format_case(self, case: dict, rank: int) -> str:
+        resume_fr = case.get('resume_francais') or ''
+        resume_ar = case.get('resume_arabe') or ''
+        fr_chars, ar_chars = self.split_allowance(self.summary_allowance(rank), resume_fr, resume_ar)
+
+        return f"""Réf: {case.get('ref', 'N/A')}
+Titre: {case.get('titre', 'N/A')}
+Juridiction: {case.get('juridiction', 'N/A')}
+Date: {case.get('date_decision', 'N/A')}
+Thème: {case.get('theme', 'N/A')}
+Mots-clés: {case.get('mots_cles', 'N/A')}
+Résumé FR: {truncate_text(resume_fr, fr_chars, '...') or 'N/A'}
+Résumé AR: {truncate_text(resume_ar, ar_chars, '...') or 'N/A'}"""
+
+    def pack(self, ranked_cases: list, reserved_tokens: int = 0) -> PackedPrompt:
+        """
+        Remplit le budget avec `ranked_cases` (déjà triés par pertinence décroissante).
+        `reserved_tokens` couvre les instructions et la requête qui entourent le contexte.
+        """
+        budget = max(0, self.token_budget - reserved_tokens)
+        separator_tokens = estimate_tokens(self.SEPARATOR)
+
+        blocks = []
+        packed = []
+        used = 0
+        for rank, case in enumerate(ranked_cases[:self.max_cases]):
+            block = self.format_case(case, rank)
+            cost = estimate_tokens(block) + (separator_tokens if blocks else 0)
+            if used + cost > budget:
+                break
+            blocks.append(block)
+            packed.append(case)
+            used += cost
+
+        return PackedPrompt(
+            context=self.SEPARATOR.join(blocks),
+            cases=packed,
+            tokens_used=used + reserved_tokens,
+            token_budget=self.token_budget,
+            candidates_count=len(ranked_cases)
+        )
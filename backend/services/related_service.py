@@ -0,0 +1,220 @@
+"""
+Calcul hors ligne des cas liés : pour chaque cas, les N voisins les plus
+proches selon trois signaux combinés.
+
+- texte : cosinus entre vecteurs TF-IDF (titre, thème, mots-clés, résumés
+  et, en option, texte intégral), sur les mots analysés par text_normalizer ;
+- base légale : similarité de Jaccard des références légales (mots et
+  numéros d'articles de base_legale) ;
+- métadonnées : même chambre, même juridiction, même type de décision.
+
+Les candidats d'un cas sont uniquement ceux qui partagent au moins un terme
+discriminant ou une référence légale (index inversé) : aucune comparaison
+deux à deux sur tout le corpus.
+"""
+import heapq
+import math
+from collections import Counter, defaultdict
+from datetime import datetime
+from sqlalchemy.orm import undefer
+from backend.models.user import db
+from backend.models.case import JurisprudenceCase
+from backend.models.relation import CaseRelation
+from backend.utils.text_normalizer import analyze_batch
+
+TEXT_FIELDS = ('titre', 'theme', 'mots_cles', 'resume_francais', 'resume_arabe')
+
+TEXT_WEIGHT = 0.6
+LEGAL_WEIGHT = 0.25
+METADATA_WEIGHTS = {'chambre': 0.06, 'juridiction': 0.05, 'type_decision': 0.04}
+
+# Termes conservés par vecteur, et fréquence documentaire maximale d'un terme
+# utilisé pour générer des candidats : proportion du corpus, bornée pour que
+# le coût par cas reste constant sur un grand corpus
+MAX_TERMS_PER_CASE = 60
+MAX_DOCUMENT_FREQUENCY = 0.05
+POSTINGS_FLOOR = 50
+POSTINGS_CEILING = 1000
+# Candidats rescorés exactement par cas, en multiple du nombre de voisins gardés
+SHORTLIST_FACTOR = 5
+MIN_SCORE = 0.05
+
+class _CaseFeatures:
+    __slots__ = ('id', 'terms', 'legal', 'metadata', 'vector')
+    
+    def __init__(self, case_id, terms, legal, metadata):
+        self.id = case_id
+        self.terms = terms
+        self.legal = legal
+        self.metadata = metadata
+        self.vector = {}
+
+class RelatedCasesService:
+    def load_features(self, batch_size=200, include_full_text=False):
+        """Déchiffre les champs utiles par lots ordonnés par id et les réduit à leurs mots"""
+        features = []
+        last_id = 0
+        while True:
+            query = JurisprudenceCase.query
+            if include_full_text:
+                query = query.options(
+                    undefer(JurisprudenceCase.texte_integral_blob),
+                    undefer(JurisprudenceCase.texte_integral_encrypted)
+                )
+            batch = query.filter(JurisprudenceCase.id > last_id).order_by(JurisprudenceCase.id).limit(batch_size).all()
+            if not batch:
+                break
+            
+            documents = [case.to_dict(decrypt=True, include_full_text=include_full_text) for case in batch]
+            fields = TEXT_FIELDS + (('texte_integral',) if include_full_text else ())
+            texts = ['\n'.join(doc.get(field) or '' for field in fields) for doc in documents]
+            
+            for case, doc, tokens, legal in zip(batch, documents, analyze_batch(texts),
+                                                analyze_batch([doc.get('base_legale') for doc in documents])):
+                features.append(_CaseFeatures(
+                    case.id,
+                    Counter(tokens),
+                    set(legal),
+                    {field: (doc.get(field) or '').strip().lower() for field in METADATA_WEIGHTS}
+                ))
+            last_id = batch[-1].id
+            db.session.expunge_all()
+        return features
+    
+    def build_vectors(self, features):
+        """Vecteurs TF-IDF normalisés, réduits à leurs termes les plus discriminants"""
+        total = len(features)
+        document_frequency = Counter()
+        for item in features:
+            document_frequency.update(item.terms.keys())
+        
+        for item in features:
+            weights = {
+                term: (1 + math.log(count)) * math.log(1 + total / document_frequency[term])
+                for term, count in item.terms.items()
+            }
+            top = heapq.nlargest(MAX_TERMS_PER_CASE, weights.items(), key=lambda kv: kv[1])
+            norm = math.sqrt(sum(w * w for _, w in top)) or 1.0
+            item.vector = {term: w / norm for term, w in top}
+            item.terms = None
+        return document_frequency
+    
+    def compute(self, features, top_n=10):
+        """Retourne {case_id: [(related_id, score, text, legal, metadata), ...]} trié par score"""
+        total = len(features)
+        document_frequency = self.build_vectors(features)
+        max_df = max(POSTINGS_FLOOR, min(int(total * MAX_DOCUMENT_FREQUENCY), POSTINGS_CEILING))
+        
+        legal_frequency = Counter()
+        for item in features:
+            legal_frequency.update(item.legal)
+        
+        # Index inversés limités aux termes et références discriminants
+        # (« article », « code »… rendraient tous les cas candidats)
+        term_postings = defaultdict(list)
+        legal_postings = defaultdict(list)
+        for index, item in enumerate(features):
+            for term, weight in item.vector.items():
+                if document_frequency[term] <= max_df:
+                    term_postings[term].append((index, weight))
+            for reference in item.legal:
+                if legal_frequency[reference] <= max_df:
+                    legal_postings[reference].append(index)
+        
+        shortlist_size = top_n * SHORTLIST_FACTOR
+        relations = {}
+        for index, item in enumerate(features):
+            # Score provisoire accumulé sur les index inversés : seuls les cas
+            # partageant un terme ou une référence discriminante sont touchés
+            partial = defaultdict(float)
+            for term, weight in item.vector.items():
+                weight *= TEXT_WEIGHT
+                for other, other_weight in term_postings.get(term, ()):
+                    partial[other] += weight * other_weight
+            legal_weight = LEGAL_WEIGHT / max(1, len(item.legal))
+            for reference in item.legal:
+                for other in legal_postings.get(reference, ()):
+                    partial[other] += legal_weight
+            partial.pop(index, None)
+            shortlist = heapq.nlargest(shortlist_size, partial, key=partial.get)
+            
+            candidates = []
+            for other in shortlist:
+                other_item = features[other]
+                # Score exact, termes courants compris, pour la liste restreinte
+                vector, other_vector = item.vector, other_item.vector
+                text = min(1.0, sum(vector[term] * other_vector[term] for term in vector.keys() & other_vector.keys()))
+                shared = len(item.legal & other_item.legal)
+                legal = shared / (len(item.legal) + len(other_item.legal) - shared) if shared else 0.0
+                metadata = sum(
+                    weight for field, weight in METADATA_WEIGHTS.items()
+                    if item.metadata[field] and item.metadata[field] == other_item.metadata[field]
+                )
+                score = TEXT_WEIGHT * text + LEGAL_WEIGHT * legal + metadata
+                if score >= MIN_SCORE:
+                    candidates.append((score, other_item.id, text, legal, metadata))
+            
+            best = heapq.nlargest(top_n, candidates)
+            relations[item.id] = [(related_id, score, text, legal, metadata)
+                                  for score, related_id, text, legal, metadata in best]
+        return relations
+    
+    def store(self, relations, batch_size=5000):
+        """Remplace tout le graphe dans une seule transaction : les lecteurs voient l'ancien ou le nouveau"""
+        computed_at = datetime.utcnow()
+        CaseRelation.query.delete(synchronize_session=False)
+        rows = []
+        for case_id, neighbours in relations.items():
+            for rank, (related_id, score, text, legal, metadata) in enumerate(neighbours, start=1):
+                rows.append({
+                    'case_id': case_id,
+                    'rank': rank,
+                    'related_case_id': related_id,
+                    'score': round(score, 4),
+                    'text_score': round(text, 4),
+                    'legal_score': round(legal, 4),
+                    'metadata_score': round(metadata, 4),
+                    'computed_at': computed_at
+                })
+                if len(rows) >= batch_size:
+                    db.session.execute(CaseRelation.__table__.insert(), rows)
+                    rows = []
+        if rows:
+            db.session.execute(CaseRelation.__table__.insert(), rows)
+        db.session.commit()
+    
+    def related(self, case_id, limit=10):
+        """Cas liés précalculés, dans l'ordre, en une seule requête indexée"""
+        rows = db.session.query(CaseRelation, JurisprudenceCase).join(
+            JurisprudenceCase, JurisprudenceCase.id == CaseRelation.related_case_id
+        ).filter(CaseRelation.case_id == case_id).order_by(CaseRelation.rank).limit(limit).all()
+        
+        results = []
+        for relation, case in rows:
+            results.append({
+                'id': case.id,
+                'ref': case.ref,
+                'titre': case.titre,
+                'juridiction': case.juridiction,
+                'date_decision': case.date_decision.isoformat() if case.date_decision else None,
+                'chambre': case.chambre,
+                'theme': case.theme,
+                'score': relation.score,
+                'text_score': relation.text_score,
+                'legal_score': relation.legal_score,
+                'metadata_score': relation.metadata_score,
+                'computed_at': relation.computed_at.isoformat()
+            })
+        return results
+    
+    def remove_cases(self, case_ids=None):
+        """Retire les cas supprimés du graphe, dans les deux sens (sans commit)"""
+        query = CaseRelation.query
+        if case_ids is not None:
+            query = query.filter(db.or_(
+                CaseRelation.case_id.in_(case_ids),
+                CaseRelation.related_case_id.in_(case_ids)
+            ))
+        query.delete(synchronize_session=False)
+
+related_service = RelatedCasesService()
@@ -0,0 +1,135 @@
+from sqlalchemy import case as sql_case, func, select
+from sqlalchemy.orm import undefer
+from backend.config import Config
+from backend.models.user import db
+from backend.models.case import JurisprudenceCase
+from backend.models.search_index import CaseSearchToken
+from backend.utils.blind_index import BlindIndex
+
+# Champs indexés et leur poids dans le score ; les champs chiffrés sont
+# déchiffrés uniquement au moment de l'indexation d'un cas
+INDEXED_FIELDS = {
+    'titre': 3,
+    'mots_cles': 3,
+    'theme': 2,
+    'resume_francais': 2,
+    'resume_arabe': 2,
+    'texte_integral': 1,
+}
+
+# Plafond des occurrences comptées par champ : un long texte intégral qui
+# répète un mot ne doit pas écraser un résumé qui le contient une fois
+MAX_TERM_FREQUENCY = 5
+
+class SearchIndexService:
+    """Maintient l'index aveugle des cas et y exécute les recherches par mots-clés"""
+    
+    def __init__(self):
+        self.blind_index = BlindIndex(Config.BLIND_INDEX_KEY)
+    
+    def _case_texts(self, case, texts=None):
+        """Textes en clair des champs indexés ; `texts` évite de re-déchiffrer ce qui est déjà connu"""
+        from backend.utils.encryption import encryption_service
+        
+        texts = texts or {}
+        values = {}
+        for field in INDEXED_FIELDS:
+            if field in texts:
+                values[field] = texts[field] or ''
+            elif field == 'texte_integral':
+                values[field] = case.get_texte_integral() if case.has_texte_integral else ''
+            elif field.startswith('resume_'):
+                encrypted = getattr(case, f'{field}_encrypted')
+                values[field] = encryption_service.decrypt(encrypted) if encrypted else ''
+            else:
+                values[field] = getattr(case, field) or ''
+        return values
+    
+    def _rows(self, case_id, values):
+        fields = list(values)
+        rows = []
+        for field, counts in zip(fields, self.blind_index.hash_texts([values[f] for f in fields])):
+            for token_hash, count in counts.items():
+                rows.append({
+                    'token_hash': token_hash,
+                    'case_id': case_id,
+                    'field': field,
+                    'tf': min(count, MAX_TERM_FREQUENCY)
+                })
+        return rows
+    
+    def index_case(self, case, texts=None):
+        """
+        Remplace les entrées d'index du cas (sans commit). Le cas doit avoir un
+        id : appeler après db.session.flush() pour un nouveau cas.
+        """
+        rows = self._rows(case.id, self._case_texts(case, texts))
+        CaseSearchToken.query.filter_by(case_id=case.id).delete(synchronize_session=False)
+        if rows:
+            db.session.execute(CaseSearchToken.__table__.insert(), rows)
+        return len(rows)
+    
+    def remove_cases(self, case_ids=None):
+        """Supprime les entrées d'index des cas donnés, ou de tous les cas (sans commit)"""
+        query = CaseSearchToken.query
+        if case_ids is not None:
+            query = query.filter(CaseSearchToken.case_id.in_(case_ids))
+        query.delete(synchronize_session=False)
+    
+    def search(self, query, mode='all', page=1, per_page=20):
+        """
+        Cas contenant les mots de la requête, classés par nombre de mots trouvés
+        puis par score pondéré. mode='all' exige tous les mots, 'any' au moins un.
+        """
+        hashes = self.blind_index.hash_query(query, Config.FULLTEXT_MAX_QUERY_TOKENS)
+        if not hashes:
+            return {'ids': [], 'scores': {}, 'total': 0, 'query_tokens': 0}
+        
+        weight = sql_case(
+            *[(CaseSearchToken.field == field, w) for field, w in INDEXED_FIELDS.items()],
+            else_=1
+        )
+        matched = func.count(func.distinct(CaseSearchToken.token_hash)).label('matched')
+        score = func.sum(CaseSearchToken.tf * weight).label('score')
+        
+        grouped = select(CaseSearchToken.case_id, matched, score).where(
+            CaseSearchToken.token_hash.in_(hashes)
+        ).group_by(CaseSearchToken.case_id)
+        if mode == 'all':
+            grouped = grouped.having(matched == len(hashes))
+        
+        total = db.session.execute(select(func.count()).select_from(grouped.subquery())).scalar()
+        rows = db.session.execute(
+            grouped.order_by(matched.desc(), score.desc(), CaseSearchToken.case_id.desc())
+            .limit(per_page).offset((page - 1) * per_page)
+        ).all()
+        
+        return {
+            'ids': [row.case_id for row in rows],
+            'scores': {row.case_id: {'matched': row.matched, 'score': int(row.score or 0)} for row in rows},
+            'total': total,
+            'query_tokens': len(hashes)
+        }
+    
+    def rebuild(self, batch_size=100, progress=None):
+        """Réindexe tous les cas par lots ordonnés par id, un commit par lot"""
+        last_id = 0
+        indexed = 0
+        while True:
+            batch = JurisprudenceCase.query.options(
+                undefer(JurisprudenceCase.texte_integral_blob),
+                undefer(JurisprudenceCase.texte_integral_encrypted)
+            ).filter(JurisprudenceCase.id > last_id).order_by(JurisprudenceCase.id).limit(batch_size).all()
+            if not batch:
+                break
+            for case in batch:
+                self.index_case(case)
+                last_id = case.id
+            db.session.commit()
+            db.session.expunge_all()
+            indexed += len(batch)
+            if progress:
+                progress(indexed, last_id)
+        return indexed
+
+search_index_service = SearchIndexService()
@@ -0,0 +1,268 @@
+"""
+Pipeline de recherche de cas similaires, découpé en étapes indépendantes :
+génération des candidats → classement → remplissage du prompt → appel LLM
+→ analyse de la réponse → hydratation des résultats.
+
+Chaque étape est chronométrée séparément (`SearchContext.timings`) afin de
+pouvoir être profilée et optimisée seule. Les deux points d'entrée
+(`SearchPipeline.run` et `SearchPipeline.stream`) partagent les mêmes étapes.
+"""
+import json
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+from backend.utils.text_normalizer import analyze, analyze_batch
+from backend.utils import metrics
+
+class PipelineError(Exception):
+    """Erreur d'une étape, porteuse du message destiné à l'utilisateur"""
+
+    def __init__(self, error: str, analysis: str):
+        super().__init__(error)
+        self.error = error
+        self.analysis = analysis
+
+@dataclass
+class SearchContext:
+    """État partagé entre les étapes d'une recherche"""
+    query: str
+    candidates: List[dict] = field(default_factory=list)
+    total_count: int = 0
+    ranked: List[dict] = field(default_factory=list)
+    packed: object = None
+    prompt: str = ''
+    raw_response: str = ''
+    usage: Dict[str, int] = field(default_factory=dict)
+    parsed: Optional[dict] = None
+    results: List[dict] = field(default_factory=list)
+    timings: Dict[str, float] = field(default_factory=dict)
+
+class Stage:
+    """Étape du pipeline. `run` modifie le contexte ; `stream` peut en plus émettre des événements."""
+    name = 'stage'
+    progress_message = None
+
+    def run(self, ctx: SearchContext):
+        raise NotImplementedError
+
+    def stream(self, ctx: SearchContext):
+        self.run(ctx)
+        return
+        yield
+
+class CandidateStage(Stage):
+    """Fournit les cas candidats ; `loader` permet de brancher une autre source"""
+    name = 'candidates'
+    progress_message = 'Indexation des cas de jurisprudence...'
+
+    def __init__(self, loader: Optional[Callable[[SearchContext], List[dict]]] = None):
+        self.loader = loader
+
+    def run(self, ctx: SearchContext):
+        if self.loader:
+            ctx.candidates = self.loader(ctx)
+        ctx.total_count = ctx.total_count or len(ctx.candidates)
+
+class LexicalRankingStage(Stage):
+    """
+    Classe les candidats par recouvrement lexical avec la requête (mots
+    normalisés et racinisés, en français comme en arabe), afin que le budget
+    du prompt soit rempli d'abord par les cas les plus prometteurs.
+    Le tri est stable : à score égal, l'ordre d'origine est conservé.
+    """
+    name = 'ranking'
+
+    FIELD_WEIGHTS = {
+        'titre': 3.0,
+        'theme': 2.0,
+        'mots_cles': 2.0,
+        'base_legale': 1.5,
+        'resume_francais': 1.0,
+        'resume_arabe': 1.0,
+    }
+
+    def tokenize(self, text: str) -> set:
+        return set(analyze(text)) if text else set()
+
+    def run(self, ctx: SearchContext):
+        query_tokens = self.tokenize(ctx.query)
+        if not query_tokens:
+            ctx.ranked = list(ctx.candidates)
+            return
+        # Chaque champ est analysé en un seul lot pour tous les candidats
+        scores = [0.0] * len(ctx.candidates)
+        for field_name, weight in self.FIELD_WEIGHTS.items():
+            field_tokens = analyze_batch([case.get(field_name) for case in ctx.candidates])
+            for i, tokens in enumerate(field_tokens):
+                scores[i] += weight * len(query_tokens.intersection(tokens))
+        order = sorted(range(len(ctx.candidates)), key=lambda i: -scores[i])
+        ctx.ranked = [ctx.candidates[i] for i in order]
+
+class PackingStage(Stage):
+    """Remplit le budget de tokens et construit le prompt"""
+    name = 'packing'
+
+    def __init__(self, service):
+        self.service = service
+
+    def run(self, ctx: SearchContext):
+        ctx.packed = self.service.pack_cases(ctx.query, ctx.ranked)
+        ctx.prompt = self.service.build_prompt(ctx.query, ctx.packed, ctx.total_count)
+
+    def stream(self, ctx: SearchContext):
+        self.run(ctx)
+        yield {'type': 'progress', 'message': f'{len(ctx.packed.cases)} cas indexés sur {ctx.total_count} au total'}
+
+class LLMStage(Stage):
+    """Appelle le modèle, en mode synchrone ou en streaming"""
+    name = 'llm'
+    progress_message = 'Envoi de la requête à l\'IA...'
+
+    def __init__(self, service):
+        self.service = service
+
+    def run(self, ctx: SearchContext):
+        ctx.raw_response, ctx.usage = self.service.complete(ctx.prompt)
+
+    def stream(self, ctx: SearchContext):
+        yield {'type': 'progress', 'message': 'L\'IA analyse les cas... (cela peut prendre 15-30 secondes)'}
+        chunks = []
+        emitted = 0
+        for content, usage in self.service.complete_stream(ctx.prompt):
+            if usage:
+                ctx.usage = usage
+            if content:
+                chunks.append(content)
+                emitted += len(content)
+                # Envoyer des mises à jour régulières, tous les ~100 caractères
+                if emitted >= 100:
+                    emitted = 0
+                    yield {'type': 'thinking', 'message': 'Réflexion en cours...'}
+        ctx.raw_response = ''.join(chunks)
+
+class ParsingStage(Stage):
+    """Extrait l'objet JSON de la réponse du modèle"""
+    name = 'parsing'
+    progress_message = 'Traitement de la réponse de l\'IA...'
+
+    @staticmethod
+    def extract_json(ai_response: str) -> Optional[dict]:
+        # Chercher le JSON dans la réponse (entre ```json et ``` si présent, sinon chercher {})
+        json_match = re.search(r'```json\s*(\{.*?\})\s*```', ai_response, re.DOTALL)
+        if not json_match:
+            json_match = re.search(r'\{.*\}', ai_response, re.DOTALL)
+            json_str = json_match.group(0) if json_match else None
+        else:
+            json_str = json_match.group(1)
+
+        if not json_str:
+            return None
+
+        # Nettoyer les caractères de contrôle non échappés
+        json_str_cleaned = ''.join(
+            char if ord(char) >= 32 or char in '\n\r\t' else ' '
+            for char in json_str
+        )
+
+        try:
+            return json.loads(json_str_cleaned, strict=False)
+        except json.JSONDecodeError as json_err:
+            # Si le parsing échoue, essayer de parser sans les newlines
+            try:
+                json_str_cleaned = json_str.replace('\n', ' ').replace('\r', ' ').replace('\t', ' ')
+                return json.loads(json_str_cleaned, strict=False)
+            except json.JSONDecodeError:
+                raise json_err
+
+    def run(self, ctx: SearchContext):
+        ctx.parsed = self.extract_json(ctx.raw_response or '')
+
+class HydrationStage(Stage):
+    """
+    Associe les références retournées par le modèle aux cas complets, dans
+    l'ordre de classement du modèle. `hydrator(refs)` retourne un dict
+    ref → cas (par exemple une requête `ref IN (...)` en base) ; à défaut,
+    les cas sont pris dans les candidats via un index ref → cas.
+    """
+    name = 'hydration'
+
+    def __init__(self, hydrator: Optional[Callable[[List[str]], Dict[str, dict]]] = None):
+        self.hydrator = hydrator
+
+    @staticmethod
+    def ranked_refs(parsed: dict) -> List[str]:
+        """Références dédoublonnées, dans l'ordre de pertinence donné par le modèle"""
+        refs = []
+        seen = set()
+        for ref in parsed.get('similar_cases') or []:
+            ref = str(ref).strip()
+            if ref and ref not in seen:
+                seen.add(ref)
+                refs.append(ref)
+        return refs
+
+    def run(self, ctx: SearchContext):
+        if ctx.parsed is None:
+            ctx.results = []
+            return
+        refs = self.ranked_refs(ctx.parsed)
+        if not refs:
+            ctx.results = []
+            return
+
+        if self.hydrator:
+            cases_by_ref = self.hydrator(refs)
+        else:
+            cases_by_ref = {str(case.get('ref')): case for case in ctx.candidates}
+        ctx.results = [cases_by_ref[ref] for ref in refs if ref in cases_by_ref]
+
+class SearchPipeline:
+    """Enchaîne les étapes et mesure le temps passé dans chacune"""
+
+    def __init__(self, service, stages: List[Stage]):
+        self.service = service
+        self.stages = stages
+
+    def _timed(self, ctx: SearchContext, stage: Stage, started: float):
+        elapsed = time.perf_counter() - started
+        ctx.timings[stage.name] = round(elapsed * 1000, 2)
+        metrics.observe_search_stage(stage.name, elapsed)
+
+    def run(self, ctx: SearchContext) -> dict:
+        try:
+            for stage in self.stages:
+                started = time.perf_counter()
+                stage.run(ctx)
+                self._timed(ctx, stage, started)
+        except PipelineError as e:
+            return self.service.error_result(e.error, e.analysis, ctx)
+        except Exception as e:
+            return self.service.error_result(
+                f'Erreur de traitement: {str(e)}', 'Erreur lors de l\'analyse de la réponse', ctx
+            )
+        return self.service.build_result(ctx)
+
+    def stream(self, ctx: SearchContext):
+        """Générateur d'événements (dict) ; le dernier est `complete` ou `error`"""
+        try:
+            for stage in self.stages:
+                if stage.progress_message:
+                    yield {'type': 'progress', 'message': stage.progress_message}
+                started = time.perf_counter()
+                yield from stage.stream(ctx)
+                self._timed(ctx, stage, started)
+        except PipelineError as e:
+            yield {'type': 'error', 'message': e.error, 'result': self.service.error_result(e.error, e.analysis, ctx)}
+            return
+        except Exception as e:
+            message = f'Erreur: {str(e)}'
+            yield {'type': 'error', 'message': message, 'result': self.service.error_result(message, '', ctx)}
+            return
+
+        if ctx.parsed is None:
+            message = 'Format de réponse invalide'
+            yield {'type': 'error', 'message': message, 'result': self.service.error_result(message, '', ctx)}
+            return
+
+        yield {'type': 'complete', 'result': self.service.build_result(ctx)}
@@ -0,0 +1,64 @@
+"""
+Index aveugle (blind index) des mots des champs chiffrés.
+
+Chaque mot, normalisé et racinisé (backend/utils/text_normalizer.py), est
+remplacé par un HMAC-SHA256 tronqué, calculé avec une clé secrète : la base peut retrouver les cas contenant un mot donné sans
+jamais stocker le mot en clair. Sans la clé, les empreintes ne permettent pas
+de retrouver les mots ; seules leur fréquence et leur répartition entre les
+cas sont observables.
+"""
+import base64
+import hashlib
+import hmac
+from collections import Counter
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from backend.utils.text_normalizer import analyze, analyze_batch
+
+TOKEN_HASH_BYTES = 16
+
+def derive_index_key(secret, info=b'jurisprudence-blind-index-v1'):
+    """Clé dédiée à un index (selon `info`), dérivée de BLIND_INDEX_KEY"""
+    raw = secret.encode() if isinstance(secret, str) else secret
+    try:
+        raw = base64.urlsafe_b64decode(raw)
+    except Exception:
+        pass
+    return HKDF(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=None,
+        info=info
+    ).derive(raw)
+
+class BlindIndex:
+    def __init__(self, secret):
+        if not secret:
+            raise ValueError("BLIND_INDEX_KEY doit être définie")
+        self.key = derive_index_key(secret)
+    
+    def token_hash(self, token):
+        digest = hmac.new(self.key, token.encode('utf-8'), hashlib.sha256).digest()
+        return digest[:TOKEN_HASH_BYTES].hex()
+    
+    def hash_counts(self, tokens):
+        """Occurrences par empreinte ; chaque mot distinct n'est haché qu'une fois"""
+        return {self.token_hash(token): count for token, count in Counter(tokens).items()}
+    
+    def hash_text(self, text):
+        return self.hash_counts(analyze(text))
+    
+    def hash_texts(self, texts):
+        """Empreintes de plusieurs textes, analysés en un seul lot"""
+        return [self.hash_counts(tokens) for tokens in analyze_batch(texts)]
+    
+    def hash_query(self, query, max_tokens=20):
+        """Empreintes distinctes des mots de la requête, dans leur ordre d'apparition"""
+        hashes = []
+        for token in analyze(query):
+            token_hash = self.token_hash(token)
+            if token_hash not in hashes:
+                hashes.append(token_hash)
+            if len(hashes) >= max_tokens:
+                break
+        return hashes
@@ -0,0 +1,197 @@
+"""
+Format de chiffrement par blocs pour les textes volumineux (texte intégral).
+
+Le texte UTF-8 est découpé en blocs d'environ 64 Ko, chacun chiffré en
+AES-256-GCM avec son propre nonce. Un index en tête du blob donne la position
+(en caractères) de chaque bloc, ce qui permet de lire une portion du texte en
+ne déchiffrant que les blocs concernés. Le résultat est stocké en binaire
+(bytea), sans l'encodage base64 des jetons Fernet.
+
+Structure (entiers big-endian) :
+    en-tête  : magic 'JCT' | version (1) | flags (1, codec de compression) | key_id (4)
+               | chunk_count (4) | total_chars (8)
+    index    : chunk_count × [char_offset (8) | ciphertext_length (4)]
+    blocs    : chunk_count × [nonce (12) | ciphertext + tag]
+
+L'en-tête et l'index sont authentifiés comme données associées de chaque
+bloc, avec le numéro du bloc : un index modifié ou des blocs permutés font
+échouer le déchiffrement.
+"""
+import base64
+import bisect
+import hashlib
+import os
+import struct
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+MAGIC = b'JCT'
+VERSION = 1
+CHUNK_SIZE = 64 * 1024
+NONCE_SIZE = 12
+
+HEADER = struct.Struct('>3sBB4sIQ')
+INDEX_ENTRY = struct.Struct('>QI')
+
+class ChunkedCipherError(Exception):
+    """Blob illisible : format inconnu, clé absente ou données altérées"""
+
+def is_chunked_blob(data) -> bool:
+    return bool(data) and bytes(data[:3]) == MAGIC
+
+def derive_key(fernet_key) -> bytes:
+    """Dérive la clé AES-256 du format par blocs à partir d'une clé Fernet"""
+    raw = base64.urlsafe_b64decode(fernet_key.encode() if isinstance(fernet_key, str) else fernet_key)
+    return HKDF(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=None,
+        info=b'jurisprudence-chunked-text-v1'
+    ).derive(raw)
+
+def key_id(aes_key: bytes) -> bytes:
+    """Empreinte courte de la clé, stockée dans l'en-tête pour choisir la bonne clé"""
+    return hashlib.sha256(aes_key).digest()[:4]
+
+def split_utf8(data: bytes, chunk_size: int = CHUNK_SIZE):
+    """Découpe des octets UTF-8 en blocs sans couper un caractère multi-octets"""
+    chunks = []
+    start = 0
+    while start < len(data):
+        end = min(start + chunk_size, len(data))
+        # Reculer tant que la coupure tombe sur un octet de continuation (10xxxxxx)
+        while end < len(data) and (data[end] & 0xC0) == 0x80:
+            end -= 1
+        chunks.append(data[start:end])
+        start = end
+    return chunks
+
+class ChunkedCipher:
+    """Chiffre et déchiffre le format par blocs avec une ou plusieurs clés Fernet"""
+
+    def __init__(self, fernet_keys, chunk_size: int = CHUNK_SIZE):
+        if isinstance(fernet_keys, (str, bytes)):
+            fernet_keys = [fernet_keys]
+        if not fernet_keys:
+            raise ValueError("ENCRYPTION_KEY must be set in environment variables")
+
+        self.chunk_size = chunk_size
+        # La première clé chiffre ; toutes peuvent déchiffrer
+        self.keys = {}
+        self.primary_key_id = None
+        for fernet_key in fernet_keys:
+            aes_key = derive_key(fernet_key)
+            kid = key_id(aes_key)
+            self.keys[kid] = AESGCM(aes_key)
+            if self.primary_key_id is None:
+                self.primary_key_id = kid
+
+    def encrypt(self, text: str, flags: int = 0, transform=None) -> bytes:
+        """
+        Chiffre `text`. `transform` (optionnel) est appliqué à chaque bloc en
+        clair avant chiffrement, par exemple une compression signalée dans `flags`.
+        """
+        if not text:
+            return b''
+
+        plain_chunks = split_utf8(text.encode('utf-8'), self.chunk_size)
+        char_offsets = []
+        position = 0
+        for chunk in plain_chunks:
+            char_offsets.append(position)
+            position += len(chunk.decode('utf-8'))
+
+        if transform:
+            plain_chunks = [transform(chunk) for chunk in plain_chunks]
+
+        # Longueur chiffrée = longueur claire + tag GCM (16 octets) + nonce
+        lengths = [NONCE_SIZE + len(chunk) + 16 for chunk in plain_chunks]
+        header = HEADER.pack(MAGIC, VERSION, flags, self.primary_key_id, len(plain_chunks), position)
+        index = b''.join(INDEX_ENTRY.pack(offset, length) for offset, length in zip(char_offsets, lengths))
+        associated = header + index
+
+        cipher = self.keys[self.primary_key_id]
+        body = []
+        for number, chunk in enumerate(plain_chunks):
+            nonce = os.urandom(NONCE_SIZE)
+            body.append(nonce + cipher.encrypt(nonce, chunk, associated + struct.pack('>I', number)))
+
+        return associated + b''.join(body)
+
+    def read_header(self, blob) -> dict:
+        blob = bytes(blob)
+        if len(blob) < HEADER.size or not is_chunked_blob(blob):
+            raise ChunkedCipherError('Format de texte chiffré inconnu')
+
+        magic, version, flags, kid, chunk_count, total_chars = HEADER.unpack_from(blob, 0)
+        if version != VERSION:
+            raise ChunkedCipherError(f'Version de format non supportée: {version}')
+
+        index_end = HEADER.size + chunk_count * INDEX_ENTRY.size
+        char_offsets, positions = [], []
+        position = index_end
+        for number in range(chunk_count):
+            char_offset, length = INDEX_ENTRY.unpack_from(blob, HEADER.size + number * INDEX_ENTRY.size)
+            char_offsets.append(char_offset)
+            positions.append((position, position + length))
+            position += length
+
+        return {
+            'flags': flags,
+            'key_id': kid,
+            'chunk_count': chunk_count,
+            'total_chars': total_chars,
+            'char_offsets': char_offsets,
+            'positions': positions,
+            'associated': blob[:index_end],
+            'blob': blob
+        }
+
+    def _decrypt_chunk(self, header: dict, number: int, transform=None) -> str:
+        cipher = self.keys.get(header['key_id'])
+        if cipher is None:
+            raise ChunkedCipherError('Clé de chiffrement inconnue pour ce texte')
+
+        start, end = header['positions'][number]
+        data = header['blob'][start:end]
+        nonce, ciphertext = data[:NONCE_SIZE], data[NONCE_SIZE:]
+        try:
+            plain = cipher.decrypt(nonce, ciphertext, header['associated'] + struct.pack('>I', number))
+        except Exception as e:
+            raise ChunkedCipherError('Texte chiffré altéré ou clé invalide') from e
+
+        if transform:
+            plain = transform(plain, header['flags'])
+        return plain.decode('utf-8')
+
+    def decrypt(self, blob, transform=None) -> str:
+        if not blob:
+            return ''
+        header = self.read_header(blob)
+        return ''.join(self._decrypt_chunk(header, n, transform) for n in range(header['chunk_count']))
+
+    def decrypt_range(self, blob, start: int, end: int, transform=None):
+        """
+        Déchiffre uniquement les blocs couvrant les caractères [start, end).
+        Retourne (texte, nombre total de caractères).
+        """
+        if not blob:
+            return '', 0
+        header = self.read_header(blob)
+        total = header['total_chars']
+        start = min(max(0, start), total)
+        end = min(max(start, end), total)
+        if start == end:
+            return '', total
+
+        offsets = header['char_offsets']
+        first = bisect.bisect_right(offsets, start) - 1
+        last = bisect.bisect_left(offsets, end) - 1
+
+        text = ''.join(self._decrypt_chunk(header, n, transform) for n in range(first, last + 1))
+        base = offsets[first]
+        return text[start - base:end - base], total
+
+    def total_chars(self, blob) -> int:
+        return self.read_header(blob)['total_chars'] if blob else 0
@@ -0,0 +1,153 @@
+"""
+Extraction des références légales citées par une décision (base_legale,
+texte intégral) : « article 230 du DOC », « articles 399 et 400 C.P.C »,
+« الفصل 230 من ق.ل.ع », « المادة 5 من القانون رقم 31.08 »…
+
+Chaque référence est ramenée à un couple (code, article) normalisé :
+code canonique (DOC, CPC, CP…, ou « loi 31-08 ») et numéro d'article sans
+espaces (« 230 », « 230bis », « 77-1 »). Un article dont le code n'est pas
+reconnu est conservé avec un code vide. Les textes sont d'abord normalisés
+par text_normalizer (minuscules, accents, variantes de lettres arabes) : les
+motifs ci-dessous sont écrits sous leur forme usuelle et normalisés de même.
+"""
+import re
+from collections import Counter
+from backend.utils.text_normalizer import normalize
+
+# Chiffres arabes orientaux et persans → chiffres ASCII
+DIGITS_TABLE = {cp: str(i) for base in (0x0660, 0x06F0) for i, cp in enumerate(range(base, base + 10))}
+
+# Codes reconnus et leurs formes d'écriture. L'ordre compte : à position égale,
+# la première forme l'emporte (C.P.C et C.P.P avant C.P)
+CODES = (
+    ('DOC', (
+        r"dahir\s+(?:formant\s+code\s+)?des\s+obligations\s+et\s+(?:des\s+)?contrats",
+        r"code\s+des\s+obligations\s+et\s+(?:des\s+)?contrats",
+        r"d\.?\s?o\.?\s?c\.?", r"c\.?\s?o\.?\s?c\.?",
+        r"قانون\s+الالتزامات\s+و\s?العقود", r"ق\s?\.?\s?ل\s?\.?\s?ع",
+    )),
+    ('CPC', (
+        r"code\s+de\s+procédure\s+civile", r"c\.?\s?p\.?\s?c\.?",
+        r"قانون\s+المسطرة\s+المدنية", r"ق\s?\.?\s?م\s?\.?\s?م",
+    )),
+    ('CPP', (
+        r"code\s+de\s+procédure\s+pénale", r"c\.?\s?p\.?\s?p\.?",
+        r"قانون\s+المسطرة\s+الجنائية", r"ق\s?\.?\s?م\s?\.?\s?ج",
+    )),
+    ('CP', (
+        r"code\s+pénal", r"c\.?\s?p\.?",
+        r"القانون\s+الجنائي", r"ق\s?\.?\s?ج",
+    )),
+    ('CCOM', (r"code\s+de\s+commerce", r"c\.?\s?com\.?", r"مدونة\s+التجارة")),
+    ('CT', (r"code\s+du\s+travail", r"مدونة\s+الشغل")),
+    ('CF', (r"code\s+de\s+la\s+famille", r"moudawana", r"مدونة\s+الأسرة")),
+    ('CDR', (r"code\s+des\s+droits\s+réels", r"مدونة\s+الحقوق\s+العينية")),
+)
+
+CODE_RE = re.compile('|'.join(
+    rf'(?P<{code}>(?<!\w)(?:{"|".join(normalize(alias) for alias in aliases)})(?!\w))'
+    for code, aliases in CODES
+))
+
+# « loi n° 31-08 », « القانون رقم 31.08 »
+LAW_RE = re.compile(normalize(
+    r"(?:\bloi|قانون)\s*(?:n°|no\.?|n\.?|رقم)?\s*(\d{1,3}\s?[-./]\s?\d{2})(?!\d)"
+))
+
+# Renvoi au code cité juste avant : « article 231 du même code »
+SAME_CODE_RE = re.compile(normalize(
+    r"même\s+(?:code|dahir|loi)|précité|نفس\s+(?:القانون|المدونة)|القانون\s+نفسه"
+))
+
+ARTICLE_KEYWORD = normalize(
+    r"(?:\barticles?|\bart\.?|(?<!\w)(?:[وبلف]?ال|لل)?(?:فصول|فصلين|فصل|مواد|مادتين|مادة))"
+)
+ARTICLE_NUMBER = r"\d{1,4}(?:\s?(?:bis|ter|quater|مكرر)|-\d{1,3})?(?!\d)"
+# Séparateurs d'une liste d'articles ; « à » / « إلى » marquent un intervalle
+LIST_SEPARATOR = normalize(r"\s*(?:,|;|\bet\b|\bou\b|\bà\b|\bau\b|(?<!\w)و|إلى)\s*")
+RANGE_WORDS = {normalize(word) for word in ('à', 'au', 'إلى')}
+MAX_RANGE = 20
+
+ARTICLE_RE = re.compile(
+    ARTICLE_KEYWORD + r"\s*(?:n°|no\.?|رقم)?\s*"
+    + rf"(?P<numbers>{ARTICLE_NUMBER}(?:{LIST_SEPARATOR}{ARTICLE_NUMBER})*)"
+)
+NUMBER_RE = re.compile(ARTICLE_NUMBER)
+ARTICLE_KEYWORD_RE = re.compile(ARTICLE_KEYWORD)
+
+# Distance maximale (en caractères) entre la liste d'articles et son code
+CODE_WINDOW = 80
+
+def normalize_article(value):
+    """Numéro d'article comparable : minuscules, sans espaces ni zéros initiaux"""
+    value = normalize(str(value or '')).translate(DIGITS_TABLE)
+    value = re.sub(r'\s+', '', value)
+    value = value.replace(normalize('مكرر'), 'bis')
+    return value.lstrip('0') or value
+
+def normalize_law(number):
+    return 'loi ' + re.sub(r'\s*[-./]\s*', '-', number)
+
+def normalize_code(value):
+    """Code canonique à partir d'une forme usuelle (« D.O.C », « ق.ل.ع », « loi 31.08 »…)"""
+    text = normalize(value or '').translate(DIGITS_TABLE).strip()
+    if not text:
+        return ''
+    law = LAW_RE.search(text) or re.fullmatch(r'(\d{1,3}\s?[-./]\s?\d{2})', text)
+    if law:
+        return normalize_law(law.group(1))
+    match = CODE_RE.fullmatch(text)
+    if match:
+        return match.lastgroup
+    return text.upper()
+
+def _articles(numbers):
+    """Articles d'une liste « 230, 231 et 233 à 235 », intervalles courts développés"""
+    articles = []
+    previous_end = None
+    for match in NUMBER_RE.finditer(numbers):
+        article = normalize_article(match.group())
+        separator = numbers[previous_end:match.start()].strip() if previous_end is not None else ''
+        if separator in RANGE_WORDS and articles and articles[-1].isdigit() and article.isdigit():
+            start, end = int(articles[-1]), int(article)
+            if 0 < end - start <= MAX_RANGE:
+                articles.extend(str(n) for n in range(start + 1, end))
+        articles.append(article)
+        previous_end = match.end()
+    return articles
+
+def _code_after(text, start, last_code):
+    """Code cité dans la fenêtre qui suit la liste, avant la référence suivante"""
+    window = text[start:start + CODE_WINDOW]
+    next_article = ARTICLE_KEYWORD_RE.search(window)
+    if next_article:
+        window = window[:next_article.start()]
+    window = re.split(r'[\n;]|\.\s', window, maxsplit=1)[0]
+
+    found = []
+    law = LAW_RE.search(window)
+    if law:
+        found.append((law.start(), normalize_law(law.group(1))))
+    code = CODE_RE.search(window)
+    if code:
+        found.append((code.start(), code.lastgroup))
+    same = SAME_CODE_RE.search(window)
+    if same and last_code:
+        found.append((same.start(), last_code))
+    return min(found)[1] if found else ''
+
+def extract_citations(text):
+    """Occurrences de chaque (code, article) cité dans le texte"""
+    citations = Counter()
+    if not text:
+        return citations
+    text = normalize(text).translate(DIGITS_TABLE)
+
+    last_code = ''
+    for match in ARTICLE_RE.finditer(text):
+        code = _code_after(text, match.end(), last_code)
+        if code:
+            last_code = code
+        for article in _articles(match.group('numbers')):
+            citations[(code, article)] += 1
+    return citations
@@ -0,0 +1,60 @@
+"""
+Codecs de compression appliqués avant chiffrement.
+
+zlib et lzma font partie de la bibliothèque standard ; zstd est utilisé s'il
+est disponible (module `compression.zstd` de Python 3.14 ou paquet
+`zstandard`). Chaque codec a un identifiant stable, enregistré dans le format
+des données chiffrées pour que les anciennes lignes restent lisibles.
+"""
+import lzma
+import zlib
+
+try:
+    from compression import zstd as _zstd  # Python >= 3.14
+    _zstd_compress = lambda data: _zstd.compress(data, level=10)
+    _zstd_decompress = _zstd.decompress
+except ImportError:
+    try:
+        import zstandard as _zstd
+        _zstd_compress = _zstd.ZstdCompressor(level=10).compress
+        _zstd_decompress = lambda data: _zstd.ZstdDecompressor().decompress(data)
+    except ImportError:  # zstd est optionnel
+        _zstd = None
+
+class Codec:
+    def __init__(self, name, codec_id, compress, decompress):
+        self.name = name
+        self.id = codec_id
+        self.compress = compress
+        self.decompress = decompress
+
+    def __repr__(self):
+        return f'<Codec {self.name}>'
+
+CODECS = {
+    'zlib': Codec('zlib', 1, lambda data: zlib.compress(data, 6), zlib.decompress),
+    'lzma': Codec('lzma', 2, lambda data: lzma.compress(data, preset=6), lzma.decompress),
+}
+if _zstd is not None:
+    CODECS['zstd'] = Codec('zstd', 3, _zstd_compress, _zstd_decompress)
+
+CODECS_BY_ID = {codec.id: codec for codec in CODECS.values()}
+
+# Identifiants connus même si la bibliothèque est absente, pour un message clair
+KNOWN_CODEC_IDS = {1: 'zlib', 2: 'lzma', 3: 'zstd'}
+
+def get_codec(name):
+    """Retourne le codec nommé, ou None pour 'none' / valeur vide"""
+    if not name or name == 'none':
+        return None
+    codec = CODECS.get(name)
+    if codec is None:
+        raise ValueError(f"Codec de compression indisponible: {name} (disponibles: {', '.join(CODECS)})")
+    return codec
+
+def get_codec_by_id(codec_id):
+    codec = CODECS_BY_ID.get(codec_id)
+    if codec is None:
+        name = KNOWN_CODEC_IDS.get(codec_id, f'#{codec_id}')
+        raise ValueError(f"Codec de compression requis pour lire ces données non installé: {name}")
+    return codec
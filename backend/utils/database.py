@@ -0,0 +1,205 @@
+"""
+Pool de connexions et délais d'exécution des requêtes SQL.
+
+Les options du moteur SQLAlchemy (taille du pool, débordement, attente
+maximale, recyclage, pre-ping) viennent de Config (variables DB_*). Avec
+gunicorn, chaque worker a son propre pool : le nombre maximal de connexions
+ouvertes vers PostgreSQL est workers × (DB_POOL_SIZE + DB_MAX_OVERFLOW).
+
+Le pool est instrumenté (InstrumentedQueuePool) : nombre d'emprunts, temps
+d'attente d'une connexion, délais dépassés. Les compteurs sont par processus.
+
+Sous PostgreSQL, DB_STATEMENT_TIMEOUT_MS borne la durée de chaque requête ;
+le décorateur statement_timeout() fixe une autre limite pour une route.
+
+Avec DATABASE_REPLICA_URL, les routes marquées @read_only lisent le réplica
+(routage dans backend/models/routing_session.py) ; les écritures restent sur
+la base principale.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from flask import g, jsonify, session as flask_session
+from sqlalchemy import exc, text
+from sqlalchemy.pool import QueuePool
+from backend.models.user import db
+from backend.models.routing_session import REPLICA_BIND, PRIMARY_UNTIL_KEY
+from backend.utils import metrics
+
+# Code SQLSTATE de PostgreSQL pour une requête annulée (statement_timeout)
+QUERY_CANCELED = '57014'
+
+class PoolMetrics:
+    """Compteurs d'emprunt de connexions, partagés par les pools du processus"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+    
+    def record(self, waited, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += waited
+            if waited > self.wait_max:
+                self.wait_max = waited
+    
+    def snapshot(self):
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'wait_total_ms': round(self.wait_total * 1000, 2),
+                'wait_avg_ms': round(self.wait_total * 1000 / (self.checkouts + self.timeouts), 3) if self.checkouts + self.timeouts else 0.0,
+                'wait_max_ms': round(self.wait_max * 1000, 2),
+            }
+
+pool_metrics = PoolMetrics()
+
+_checkout_state = threading.local()
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool qui mesure le temps d'obtention de chaque connexion"""
+    
+    def _do_get(self):
+        # QueuePool._do_get peut se rappeler lui-même : seul l'appel extérieur est mesuré
+        if getattr(_checkout_state, 'active', False):
+            return super()._do_get()
+        _checkout_state.active = True
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            waited = time.perf_counter() - started
+            pool_metrics.record(waited, timed_out=True)
+            metrics.pool_checkout(waited, timed_out=True)
+            raise
+        finally:
+            _checkout_state.active = False
+        waited = time.perf_counter() - started
+        pool_metrics.record(waited)
+        metrics.pool_checkout(waited)
+        return connection
+    
+    def _do_return_conn(self, record):
+        metrics.pool_checkin()
+        super()._do_return_conn(record)
+
+def engine_options(config, uri=None):
+    """SQLALCHEMY_ENGINE_OPTIONS à partir des variables DB_* de Config"""
+    uri = uri or config.SQLALCHEMY_DATABASE_URI or ''
+    options = {'pool_pre_ping': config.DB_POOL_PRE_PING}
+    
+    # SQLite en mémoire : une seule connexion, pas de QueuePool
+    if uri.startswith('sqlite') and (':memory:' in uri or uri.rstrip('/') == 'sqlite:'):
+        return options
+    
+    options.update(
+        poolclass=InstrumentedQueuePool,
+        pool_size=config.DB_POOL_SIZE,
+        max_overflow=config.DB_MAX_OVERFLOW,
+        pool_timeout=config.DB_POOL_TIMEOUT,
+        pool_recycle=config.DB_POOL_RECYCLE,
+    )
+    if uri.startswith('postgres') and config.DB_STATEMENT_TIMEOUT_MS:
+        options['connect_args'] = {'options': f'-c statement_timeout={int(config.DB_STATEMENT_TIMEOUT_MS)}'}
+    return options
+
+def engine_binds(config):
+    """SQLALCHEMY_BINDS : le réplica en lecture seule, s'il est configuré"""
+    if not config.DATABASE_REPLICA_URL:
+        return {}
+    return {REPLICA_BIND: dict(engine_options(config, config.DATABASE_REPLICA_URL), url=config.DATABASE_REPLICA_URL)}
+
+def _pool_info(pool):
+    info = {'pool': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        info.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+            timeout_s=pool.timeout(),
+        )
+    return info
+
+def pool_status():
+    """État du pool du processus courant (et du réplica) et compteurs d'emprunt"""
+    status = {'pid': os.getpid()}
+    status.update(_pool_info(db.engine.pool))
+    replica = db.engines.get(REPLICA_BIND)
+    if replica is not None:
+        status['replica'] = _pool_info(replica.pool)
+    status.update(pool_metrics.snapshot())
+    return status
+
+def is_statement_timeout(error):
+    return getattr(getattr(error, 'orig', None), 'pgcode', None) == QUERY_CANCELED
+
+def statement_timeout(milliseconds):
+    """
+    Décorateur de route : limite la durée des requêtes SQL de la transaction
+    en cours (SET LOCAL, PostgreSQL uniquement). La limite tombe au commit ou
+    au rollback. Une requête annulée donne une réponse 503.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if milliseconds and db.engine.dialect.name == 'postgresql':
+                db.session.execute(text(f'SET LOCAL statement_timeout = {int(milliseconds)}'))
+            try:
+                return f(*args, **kwargs)
+            except exc.OperationalError as e:
+                if not is_statement_timeout(e):
+                    raise
+                db.session.rollback()
+                return jsonify({'error': 'La requête a dépassé le délai autorisé, affinez les critères'}), 503
+        return decorated_function
+    return decorator
+
+def read_only(f):
+    """
+    Décorateur de route : les lectures peuvent être servies par le réplica.
+    À placer avant statement_timeout() pour que la limite s'applique au réplica.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        g.db_read_only = True
+        return f(*args, **kwargs)
+    return decorated_function
+
+@contextmanager
+def untracked_writes():
+    """
+    Écritures qui ne comptent pas pour la lecture de ses propres écritures
+    (historique de recherche, statistiques) : l'utilisateur n'a pas à relire
+    ces données aussitôt, ses recherches suivantes restent sur le réplica.
+    """
+    wrote = g.get('db_wrote', False)
+    try:
+        yield
+    finally:
+        g.db_wrote = wrote
+
+def register_replica_routing(app, config):
+    """Après une écriture, l'utilisateur lit la base principale pendant quelques secondes"""
+    if not config.DATABASE_REPLICA_URL:
+        return
+    
+    @app.after_request
+    def remember_primary_reads(response):
+        if g.get('db_wrote'):
+            flask_session[PRIMARY_UNTIL_KEY] = time.time() + config.REPLICA_READ_YOUR_WRITES_SECONDS
+        return response
@@ -1,21 +1,87 @@
-from cryptography.fernet import Fernet
+from cryptography.fernet import Fernet, MultiFernet
 from backend.config import Config
+from backend.utils.chunked_encryption import ChunkedCipher
+from backend.utils.compression import get_codec, get_codec_by_id
+from backend.utils.request_metrics import timed_decrypt
+
+# Préfixe des jetons Fernet dont le contenu a été compressé : "c1:<codec>:<jeton>".
+# Les jetons Fernet bruts commencent par "gAAAAA", il n'y a donc pas d'ambiguïté.
+COMPRESSED_PREFIX = 'c1:'
+
+# Masque des bits de `flags` du format par blocs désignant le codec
+CODEC_FLAG_MASK = 0x03
 
 class EncryptionService:
     def __init__(self):
-        key = Config.ENCRYPTION_KEY
-        if key is None:
+        keys = Config.ENCRYPTION_KEYS
+        if not keys:
             raise ValueError("ENCRYPTION_KEY must be set in environment variables")
-        self.cipher = Fernet(key.encode() if isinstance(key, str) else key)
+        # La première clé chiffre ; les anciennes restent valables en lecture
+        self.cipher = MultiFernet([Fernet(k.encode() if isinstance(k, str) else k) for k in keys])
+        self.chunked_cipher = ChunkedCipher(keys)
+        self.codec = get_codec(Config.ENCRYPTION_COMPRESSION)
+        self.compression_min_size = Config.ENCRYPTION_COMPRESSION_MIN_SIZE
     
     def encrypt(self, data: str) -> str:
         if not data:
             return ""
-        return self.cipher.encrypt(data.encode()).decode()
+        raw = data.encode()
+        if self.codec and len(raw) >= self.compression_min_size:
+            compressed = self.codec.compress(raw)
+            if len(compressed) < len(raw):
+                token = self.cipher.encrypt(compressed).decode()
+                return f"{COMPRESSED_PREFIX}{self.codec.name}:{token}"
+        return self.cipher.encrypt(raw).decode()
     
     def decrypt(self, encrypted_data: str) -> str:
         if not encrypted_data:
             return ""
-        return self.cipher.decrypt(encrypted_data.encode()).decode()
+        with timed_decrypt():
+            if encrypted_data.startswith(COMPRESSED_PREFIX):
+                _, codec_name, token = encrypted_data.split(':', 2)
+                return get_codec(codec_name).decompress(self.cipher.decrypt(token.encode())).decode()
+            return self.cipher.decrypt(encrypted_data.encode()).decode()
+    
+    @staticmethod
+    def _decompress_chunk(plain: bytes, flags: int) -> bytes:
+        codec_id = flags & CODEC_FLAG_MASK
+        return get_codec_by_id(codec_id).decompress(plain) if codec_id else plain
+    
+    def encrypt_large(self, data: str) -> bytes:
+        """Chiffre un texte volumineux au format binaire par blocs (voir chunked_encryption)"""
+        if not data:
+            return b""
+        if self.codec:
+            return self.chunked_cipher.encrypt(data, flags=self.codec.id, transform=self.codec.compress)
+        return self.chunked_cipher.encrypt(data)
+    
+    def decrypt_large(self, blob) -> str:
+        if not blob:
+            return ""
+        with timed_decrypt():
+            return self.chunked_cipher.decrypt(blob, transform=self._decompress_chunk)
+    
+    def decrypt_large_range(self, blob, start: int, end: int):
+        """Déchiffre les caractères [start, end) ; retourne (texte, longueur totale)"""
+        with timed_decrypt():
+            return self.chunked_cipher.decrypt_range(blob, start, end, transform=self._decompress_chunk)
+
+    def rotate(self, encrypted_data: str) -> str:
+        """Re-chiffre un jeton Fernet (compressé ou non) avec la clé principale"""
+        if not encrypted_data:
+            return encrypted_data
+        if encrypted_data.startswith(COMPRESSED_PREFIX):
+            prefix, codec_name, token = encrypted_data.split(':', 2)
+            return f"{prefix}:{codec_name}:{self.cipher.rotate(token.encode()).decode()}"
+        return self.cipher.rotate(encrypted_data.encode()).decode()
+    
+    def rotate_large(self, blob) -> bytes:
+        """Re-chiffre un blob par blocs s'il n'utilise pas déjà la clé principale"""
+        if not blob:
+            return blob
+        header = self.chunked_cipher.read_header(blob)
+        if header['key_id'] == self.chunked_cipher.primary_key_id:
+            return blob
+        return self.encrypt_large(self.decrypt_large(blob))
 
 encryption_service = EncryptionService()
@@ -0,0 +1,48 @@
+"""
+Sérialisation JSON rapide avec orjson, utilisée par `jsonify` (via
+FastJSONProvider) et par les événements SSE de la recherche.
+
+orjson est une dépendance du projet (requirements.txt) ; si le paquet manque
+malgré tout, le module json standard prend le relais.
+"""
+import json
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # installation incomplète : module json standard
+    orjson = None
+
+def _default(obj):
+    return DefaultJSONProvider.default(obj)
+
+def dumps(obj, indent: bool = False) -> str:
+    """Sérialise en JSON compact, caractères non ASCII conservés (arabe, accents)"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=_default, option=option).decode('utf-8')
+    if indent:
+        return json.dumps(obj, default=_default, ensure_ascii=False, indent=2)
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(',', ':'))
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Fournisseur JSON de Flask s'appuyant sur orjson lorsque disponible"""
+    ensure_ascii = False
+    sort_keys = False
+    compact = True
+
+    # Options que `response()` transmet et qu'orjson couvre nativement
+    LAYOUT_KWARGS = {'separators', 'indent'}
+
+    def dumps(self, obj, **kwargs) -> str:
+        if orjson is not None and set(kwargs) <= self.LAYOUT_KWARGS:
+            return dumps(obj, indent=bool(kwargs.get('indent')))
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        kwargs.setdefault('default', _default)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
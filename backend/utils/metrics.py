@@ -0,0 +1,143 @@
+"""
+Métriques Prometheus, exposées par /metrics au format texte.
+
+- recherche : durée totale par issue, durée de chaque étape du pipeline
+- IA : latence, tokens et erreurs par modèle
+- import par lots : fichiers traités par issue, temps d'extraction et de
+  traitement par fichier, débit de chaque lot (fichiers par seconde)
+- caches (facettes, identité, paramètres) : lectures servies ou non par le
+  cache, pour le taux de succès
+- pool de connexions : connexions prêtées, attente, délais dépassés
+
+prometheus-client est une dépendance du projet (requirements.txt) ; si le
+paquet manque malgré tout, les fonctions d'enregistrement ne font rien et
+/metrics répond 404 plutôt que d'empêcher le démarrage.
+
+Avec plusieurs workers gunicorn, définir PROMETHEUS_MULTIPROC_DIR (répertoire
+dédié, vidé au démarrage par gunicorn.conf.py) : chaque worker écrit ses
+valeurs dans ce répertoire et /metrics les agrège, quel que soit le worker
+qui répond.
+"""
+import os
+
+try:
+    import prometheus_client
+    from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, multiprocess
+except ImportError:  # installation incomplète : métriques désactivées
+    prometheus_client = None
+
+MULTIPROC_DIR = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+
+# Bornes des histogrammes (secondes)
+FAST_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SLOW_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 15, 20, 30, 45, 60, 90, 120)
+TOKEN_BUCKETS = (100, 500, 1000, 2000, 4000, 8000, 16000, 24000, 32000, 64000)
+RATE_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 50)
+
+if prometheus_client is not None:
+    SEARCH_SECONDS = Histogram(
+        'jurisprudence_search_seconds', "Durée d'une recherche de cas similaires",
+        ['outcome'], buckets=SLOW_BUCKETS)
+    SEARCH_STAGE_SECONDS = Histogram(
+        'jurisprudence_search_stage_seconds', "Durée de chaque étape du pipeline de recherche",
+        ['stage'], buckets=FAST_BUCKETS + SLOW_BUCKETS[7:])
+
+    LLM_REQUEST_SECONDS = Histogram(
+        'jurisprudence_llm_request_seconds', "Latence d'un appel au modèle",
+        ['model', 'mode'], buckets=SLOW_BUCKETS)
+    LLM_TOKENS = Histogram(
+        'jurisprudence_llm_tokens', "Tokens consommés par appel",
+        ['model', 'kind'], buckets=TOKEN_BUCKETS)
+    LLM_ERRORS = Counter(
+        'jurisprudence_llm_errors', "Appels au modèle en échec", ['model'])
+
+    IMPORT_FILES = Counter(
+        'jurisprudence_import_files', "Fichiers PDF traités par l'import", ['outcome'])
+    IMPORT_EXTRACTION_SECONDS = Histogram(
+        'jurisprudence_import_extraction_seconds', "Extraction des champs d'un PDF",
+        buckets=FAST_BUCKETS + SLOW_BUCKETS[7:])
+    IMPORT_FILE_SECONDS = Histogram(
+        'jurisprudence_import_file_seconds', "Traitement complet d'un fichier (extraction et insertion)",
+        buckets=FAST_BUCKETS + SLOW_BUCKETS[7:])
+    IMPORT_BATCH_RATE = Histogram(
+        'jurisprudence_import_batch_files_per_second', "Débit d'un lot d'import",
+        buckets=RATE_BUCKETS)
+
+    CACHE_REQUESTS = Counter(
+        'jurisprudence_cache_requests', "Lectures des caches en mémoire", ['cache', 'result'])
+
+    DB_POOL_CHECKED_OUT = Gauge(
+        'jurisprudence_db_pool_checked_out', "Connexions actuellement prêtées",
+        multiprocess_mode='livesum')
+    DB_POOL_WAIT_SECONDS = Histogram(
+        'jurisprudence_db_pool_wait_seconds', "Attente pour obtenir une connexion du pool",
+        buckets=FAST_BUCKETS)
+    DB_POOL_TIMEOUTS = Counter(
+        'jurisprudence_db_pool_timeouts', "Connexions non obtenues dans le délai du pool")
+
+def enabled():
+    return prometheus_client is not None
+
+def observe_search(seconds, success):
+    if prometheus_client is not None:
+        SEARCH_SECONDS.labels('success' if success else 'error').observe(seconds)
+
+def observe_search_stage(stage, seconds):
+    if prometheus_client is not None:
+        SEARCH_STAGE_SECONDS.labels(stage).observe(seconds)
+
+def observe_llm(model, mode, seconds, usage=None):
+    if prometheus_client is None:
+        return
+    LLM_REQUEST_SECONDS.labels(model, mode).observe(seconds)
+    if usage:
+        LLM_TOKENS.labels(model, 'prompt').observe(usage.get('prompt_tokens', 0))
+        LLM_TOKENS.labels(model, 'completion').observe(usage.get('completion_tokens', 0))
+
+def llm_error(model):
+    if prometheus_client is not None:
+        LLM_ERRORS.labels(model).inc()
+
+def import_file(outcome, seconds):
+    if prometheus_client is not None:
+        IMPORT_FILES.labels(outcome).inc()
+        IMPORT_FILE_SECONDS.observe(seconds)
+
+def observe_extraction(seconds):
+    if prometheus_client is not None:
+        IMPORT_EXTRACTION_SECONDS.observe(seconds)
+
+def observe_import_batch(files, seconds):
+    if prometheus_client is not None and files and seconds > 0:
+        IMPORT_BATCH_RATE.observe(files / seconds)
+
+def cache_lookup(cache, hit):
+    if prometheus_client is not None:
+        CACHE_REQUESTS.labels(cache, 'hit' if hit else 'miss').inc()
+
+def pool_checkout(waited, timed_out=False):
+    if prometheus_client is None:
+        return
+    DB_POOL_WAIT_SECONDS.observe(waited)
+    if timed_out:
+        DB_POOL_TIMEOUTS.inc()
+    else:
+        DB_POOL_CHECKED_OUT.inc()
+
+def pool_checkin():
+    if prometheus_client is not None:
+        DB_POOL_CHECKED_OUT.dec()
+
+def render():
+    """(corps, type de contenu) de l'exposition ; agrège les workers en mode multiprocessus"""
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    return prometheus_client.generate_latest(registry), prometheus_client.CONTENT_TYPE_LATEST
+
+def mark_process_dead(pid):
+    """À appeler par gunicorn à la sortie d'un worker (child_exit)"""
+    if prometheus_client is not None and MULTIPROC_DIR:
+        multiprocess.mark_process_dead(pid)
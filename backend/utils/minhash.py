@@ -0,0 +1,78 @@
+"""
+Signatures MinHash et bandes LSH pour la détection de quasi-doublons.
+
+Le texte est analysé (backend/utils/text_normalizer.py), découpé en
+séquences de SHINGLE_SIZE mots consécutifs, et chaque séquence est hachée
+avec une clé secrète (BLAKE2b à clé) : comme pour l'index aveugle, une
+signature stockée ne permet pas de tester un texte deviné sans la clé.
+
+La proportion de composantes égales entre deux signatures estime la
+similarité de Jaccard des deux textes. La signature est découpée en
+LSH_BANDS bandes : deux textes ne sont comparés que s'ils partagent au
+moins une bande entière, ce qui évite toute comparaison deux à deux.
+Avec 32 bandes de 4 lignes, la probabilité 1 − (1 − s⁴)³² que deux textes
+de similarité s partagent une bande dépasse 0,99999 à 80 %, vaut 0,9998
+à 70 %, 0,87 à 50 % et 0,23 à 30 %. Les candidats sont ensuite filtrés par la
+similarité estimée des signatures : le seuil NEAR_DUPLICATE_THRESHOLD n'en
+dépend pas, seul le nombre de signatures comparées augmente. Changer le
+découpage impose de relancer backfill_near_duplicates.py.
+"""
+import hashlib
+import numpy as np
+from backend.utils.text_normalizer import analyze
+
+NUM_PERM = 128
+LSH_BANDS = 32
+ROWS_PER_BAND = NUM_PERM // LSH_BANDS
+SHINGLE_SIZE = 3
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64(0xFFFFFFFF)
+
+class MinHasher:
+    def __init__(self, key: bytes, num_perm: int = NUM_PERM):
+        self.key = key[:64]
+        self.num_perm = num_perm
+        # Permutations a·x + b mod p tirées de la clé : identiques d'un processus à l'autre.
+        # a < 2^31 et x < 2^32 : le produit tient dans un entier de 64 bits
+        rng = np.random.default_rng(int.from_bytes(hashlib.sha256(key).digest()[:8], 'big'))
+        self.a = rng.integers(1, 1 << 31, size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+    
+    def shingles(self, text):
+        tokens = analyze(text)
+        if len(tokens) < SHINGLE_SIZE:
+            return {' '.join(tokens)} if tokens else set()
+        return {' '.join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+    
+    def signature(self, text):
+        """Signature de `num_perm` entiers 32 bits, ou None si le texte est vide"""
+        shingles = self.shingles(text)
+        if not shingles:
+            return None
+        hashed = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(s.encode('utf-8'), key=self.key, digest_size=4).digest(), 'big')
+             for s in shingles),
+            dtype=np.uint64, count=len(shingles)
+        )
+        permuted = (np.outer(self.a, hashed) + self.b[:, None]) % MERSENNE_PRIME & MAX_HASH
+        return permuted.min(axis=1).astype(np.uint32)
+
+def to_bytes(signature) -> bytes:
+    return np.asarray(signature, dtype='>u4').tobytes()
+
+def from_bytes(data) -> np.ndarray:
+    return np.frombuffer(bytes(data), dtype='>u4').astype(np.uint32)
+
+def similarity(sig_a, sig_b) -> float:
+    """Estimation de la similarité de Jaccard entre deux signatures"""
+    return float(np.mean(np.asarray(sig_a) == np.asarray(sig_b)))
+
+def band_hashes(signature, bands: int = LSH_BANDS):
+    """Empreinte de chaque bande, préfixée par son numéro pour être unique entre bandes"""
+    rows = len(signature) // bands
+    data = np.asarray(signature, dtype='>u4')
+    return [
+        hashlib.blake2b(bytes([band]) + data[band * rows:(band + 1) * rows].tobytes(), digest_size=8).hexdigest()
+        for band in range(bands)
+    ]
@@ -0,0 +1,145 @@
+"""
+Mesures par requête HTTP : durée totale, requêtes SQL (nombre et temps),
+déchiffrements (nombre et temps), appels à l'IA (latence et tokens).
+
+Les compteurs vivent dans `g` le temps de la requête. Ils sont renvoyés dans
+l'en-tête Server-Timing (visible dans l'onglet réseau du navigateur) et
+écrits en une ligne JSON par requête sur le journal `jurisprudence.requests`.
+La ligne est écrite à la fermeture de la réponse : pour une recherche en
+streaming, elle inclut donc l'appel à l'IA, que l'en-tête ne peut pas
+contenir (envoyé avant le flux).
+
+Le chemin est journalisé sans la query string : elle peut contenir le texte
+d'une recherche, qui n'est stocké que chiffré.
+"""
+import logging
+import sys
+import time
+from flask import g, has_request_context, request
+from flask_login import current_user
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from backend.config import Config
+from backend.utils import json_provider
+
+logger = logging.getLogger('jurisprudence.requests')
+
+class RequestStats:
+    __slots__ = ('started', 'db_count', 'db_time', 'decrypt_count', 'decrypt_time',
+                 'llm_count', 'llm_time', 'prompt_tokens', 'completion_tokens')
+    
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_count = self.decrypt_count = self.llm_count = 0
+        self.db_time = self.decrypt_time = self.llm_time = 0.0
+        self.prompt_tokens = self.completion_tokens = 0
+    
+    def elapsed(self):
+        return time.perf_counter() - self.started
+    
+    def server_timing(self):
+        """Valeur de l'en-tête Server-Timing (durées en millisecondes)"""
+        metrics = [
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.db_count} SQL"',
+            f'decrypt;dur={self.decrypt_time * 1000:.1f};desc="{self.decrypt_count} dechiffrements"',
+        ]
+        if self.llm_count:
+            metrics.append(f'llm;dur={self.llm_time * 1000:.1f};desc="{self.prompt_tokens}+{self.completion_tokens} tokens"')
+        metrics.append(f'total;dur={self.elapsed() * 1000:.1f}')
+        return ', '.join(metrics)
+    
+    def to_dict(self):
+        return {
+            'duration_ms': round(self.elapsed() * 1000, 1),
+            'db_queries': self.db_count,
+            'db_ms': round(self.db_time * 1000, 1),
+            'decrypts': self.decrypt_count,
+            'decrypt_ms': round(self.decrypt_time * 1000, 1),
+            'llm_calls': self.llm_count,
+            'llm_ms': round(self.llm_time * 1000, 1),
+            'prompt_tokens': self.prompt_tokens,
+            'completion_tokens': self.completion_tokens,
+        }
+
+def current_stats():
+    """Compteurs de la requête en cours, ou None (commande, script, fichier statique)"""
+    return g.get('request_stats') if has_request_context() else None
+
+class _Timed:
+    __slots__ = ('stats', 'started')
+    
+    def __init__(self, stats):
+        self.stats = stats
+    
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc_info):
+        stats = self.stats
+        if stats is not None:
+            stats.decrypt_count += 1
+            stats.decrypt_time += time.perf_counter() - self.started
+        return False
+
+def timed_decrypt():
+    """Contexte qui compte un déchiffrement et sa durée dans la requête en cours"""
+    return _Timed(current_stats())
+
+def record_llm(seconds, usage=None):
+    """Compte un appel à l'IA (latence et tokens) dans la requête en cours"""
+    stats = current_stats()
+    if stats is None:
+        return
+    stats.llm_count += 1
+    stats.llm_time += seconds
+    usage = usage or {}
+    stats.prompt_tokens += usage.get('prompt_tokens', 0)
+    stats.completion_tokens += usage.get('completion_tokens', 0)
+
+# Requêtes SQL : écoute de tous les moteurs (base principale et réplica)
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_stats()
+    if stats is not None:
+        stats.db_count += 1
+        stats.db_time += time.perf_counter() - context._query_started
+
+def _log_request(stats, method, path, endpoint, status, user_id):
+    if stats.elapsed() * 1000 < Config.REQUEST_LOG_SLOW_MS:
+        return
+    entry = {'method': method, 'path': path, 'endpoint': endpoint, 'status': status, 'user_id': user_id}
+    entry.update(stats.to_dict())
+    logger.info(json_provider.dumps(entry))
+
+def init_request_metrics(app):
+    """Branche la mesure des requêtes sur l'application"""
+    if Config.REQUEST_LOG_ENABLED and not logger.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    
+    @app.before_request
+    def start_request_stats():
+        if request.endpoint != 'static':
+            g.request_stats = RequestStats()
+    
+    @app.after_request
+    def finish_request_stats(response):
+        stats = g.get('request_stats')
+        if stats is None:
+            return response
+        if Config.SERVER_TIMING_ENABLED:
+            response.headers['Server-Timing'] = stats.server_timing()
+        if Config.REQUEST_LOG_ENABLED:
+            user_id = current_user.id if current_user.is_authenticated else None
+            details = (request.method, request.path, request.endpoint, response.status_code, user_id)
+            # À la fermeture : après la fin d'une réponse en streaming
+            response.call_on_close(lambda: _log_request(stats, *details))
+        return response
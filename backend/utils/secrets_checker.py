@@ -15,6 +15,11 @@ class SecretsChecker:
             'critical': True,
             'help': "Générez avec: python -c 'from cryptography.fernet import Fernet; print(Fernet.generate_key().decode())'"
         },
+        'BLIND_INDEX_KEY': {
+            'description': "Clé de l'index de recherche et des signatures de quasi-doublons (ne tourne pas avec ENCRYPTION_KEY)",
+            'critical': True,
+            'help': "Installation existante: reprenez la valeur actuelle de ENCRYPTION_KEY; sinon générez-la comme ENCRYPTION_KEY"
+        },
         'DATABASE_URL': {
             'description': 'URL de connexion à la base de données PostgreSQL',
             'critical': True
@@ -83,9 +88,10 @@ class SecretsChecker:
         
         if not results['all_critical_present']:
             print("⚠️  ATTENTION: Des secrets critiques sont manquants!")
-            print("   L'application utilisera des clés temporaires")
             print("   Veuillez configurer ces secrets dans Replit Secrets pour la production")
-            print("   Les données chiffrées seront perdues au redémarrage!")
+            if 'ENCRYPTION_KEY' in results['missing_critical']:
+                print("   Sans ENCRYPTION_KEY le démarrage échoue, sauf si ALLOW_TEMPORARY_ENCRYPTION_KEY=true")
+                print("   (clé temporaire: les données chiffrées seront perdues au redémarrage!)")
         
         if not results['all_present']:
             print("⚠️  ATTENTION: Certains secrets optionnels sont manquants")
@@ -34,7 +34,8 @@ def clean_case_data(data):
     text_fields = [
         'titre', 'juridiction', 'pays_ville', 'numero_decision', 'numero_dossier',
         'type_decision', 'chambre', 'theme', 'mots_cles', 'base_legale', 'source',
-        'resume_francais', 'resume_arabe', 'texte_integral'
+        'resume_francais', 'resume_arabe', 'texte_integral',
+        'resume_francais_snippet', 'resume_arabe_snippet'
     ]
     
     for field in text_fields:
@@ -42,3 +43,24 @@ def clean_case_data(data):
             data[field] = clean_private_use_characters(data[field])
     
     return data
+
+
+def truncate_text(text, max_length, ellipsis='…'):
+    """Tronque un texte sur une frontière de mot si possible"""
+    if not text or len(text) <= max_length:
+        return text
+    
+    cut = text[:max_length]
+    space = cut.rfind(' ')
+    if space > max_length * 0.8:
+        cut = cut[:space]
+    
+    return cut + ellipsis
+
+
+def make_snippet(text, max_length=300):
+    """Extrait court d'un texte pour l'affichage des résultats"""
+    if not text:
+        return text
+    
+    return truncate_text(clean_private_use_characters(text), max_length)
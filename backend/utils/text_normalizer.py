@@ -0,0 +1,198 @@
+"""
+Analyse de texte français / arabe pour l'indexation et le classement lexical.
+
+Chaîne appliquée à chaque texte :
+  1. normalisation en une seule passe str.translate : minuscules (après
+     lower()), accents latins repliés (é → e, œ → oe), voyelles brèves arabes
+     et tatweel supprimés, variantes d'alif unifiées (أ إ آ ٱ → ا), ى → ي,
+     ة → ه, formes de présentation arabes ramenées aux lettres de base,
+     caractères de la zone d'usage privé (PDF) supprimés ;
+  2. découpage en mots et retrait des mots vides ;
+  3. racinisation légère : préfixes et suffixes arabes courants (approche
+     « light stemming » de Larkey), pluriels et terminaisons flexionnelles
+     françaises (approche « minimal stemmer » de Savoy).
+
+Le résultat de l'analyse de chaque mot est mis en cache : le vocabulaire
+d'un corpus juridique est très répétitif, et la plupart des mots ne sont
+analysés qu'une fois.
+"""
+import re
+import unicodedata
+from functools import lru_cache
+
+MIN_TOKEN_LENGTH = 2
+
+# Plages de code utilisées par la table de normalisation
+ARABIC_DIACRITICS = list(range(0x064B, 0x0653)) + [0x0670]   # tanwin, harakat, shadda, sukun, alif suscrit
+TATWEEL = 0x0640
+ALEF = 0x0627
+ALEF_VARIANTS = (0x0622, 0x0623, 0x0625, 0x0671)              # آ أ إ ٱ
+ALEF_MAKSURA, YEH = 0x0649, 0x064A                            # ى → ي
+TEH_MARBUTA, HEH = 0x0629, 0x0647                             # ة → ه
+ARABIC_PRESENTATION_FORMS = list(range(0xFB50, 0xFE00)) + list(range(0xFE70, 0xFF00))
+LATIN_ACCENTED = range(0x00C0, 0x0250)
+PRIVATE_USE = range(0xE000, 0xF900)
+
+ARABIC_LETTER_RE = re.compile('[' + chr(0x0621) + '-' + chr(0x064A) + ']')
+# Un mot inclut ses voyelles arabes et les caractères d'usage privé, retirés
+# ensuite par la normalisation : ils ne doivent pas couper le mot en deux
+WORD_RE = re.compile(
+    r'[\w' + ''.join(chr(cp) for cp in ARABIC_DIACRITICS)
+    + chr(PRIVATE_USE.start) + '-' + chr(PRIVATE_USE.stop - 1) + ']+'
+)
+
+def _strip_marks(text):
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+def _build_translation_table():
+    table = {}
+    for cp in LATIN_ACCENTED:
+        folded = _strip_marks(chr(cp))
+        if folded != chr(cp):
+            table[cp] = folded
+    table.update({ord('œ'): 'oe', ord('Œ'): 'oe', ord('æ'): 'ae', ord('Æ'): 'ae', ord('ß'): 'ss'})
+
+    arabic = {cp: None for cp in ARABIC_DIACRITICS}
+    arabic[TATWEEL] = None
+    arabic.update({cp: chr(ALEF) for cp in ALEF_VARIANTS})
+    arabic[ALEF_MAKSURA] = chr(YEH)
+    arabic[TEH_MARBUTA] = chr(HEH)
+    table.update(arabic)
+
+    # Les formes de présentation (ligatures, formes contextuelles des PDF)
+    # sont décomposées puis normalisées comme les lettres ordinaires
+    for cp in ARABIC_PRESENTATION_FORMS:
+        base = unicodedata.normalize('NFKC', chr(cp))
+        if base != chr(cp):
+            table[cp] = ''.join(base.translate(arabic).split())
+
+    table.update({cp: None for cp in PRIVATE_USE})
+    return table
+
+TRANSLATION_TABLE = _build_translation_table()
+
+def normalize(text):
+    """Normalise un texte FR/AR sans le découper (voir l'en-tête du module)"""
+    if not text:
+        return ''
+    return text.lower().translate(TRANSLATION_TABLE)
+
+_FRENCH_STOPWORDS = """
+a au aux avec ce ces cet cette dans de des du elle elles en est et etre il ils
+je la le les leur leurs lui ma mais me meme mes moi mon ne nos notre nous on ou
+par pas pour qu que qui sa se ses son sont sur ta te tes toi ton tu un une vos
+votre vous y d l j m n s t c qu ni or car donc dont lors ainsi apres avant
+entre sous sans selon vers chez ayant avait ont etait sera ete fait cela ceci
+celui celle ceux celles tout tous toute toutes autre autres meme aussi plus
+moins tres bien peu si non
+"""
+
+_ARABIC_STOPWORDS = """
+في من على إلى الى عن مع أن ان إن لا ما لم لن قد كان كانت يكون هذا هذه ذلك تلك
+هو هي هم هن نحن أنت انت التي الذي الذين اللذين اللتين كل بعض غير أو او ثم بين
+عند حتى إذا اذا لكن ليس أي اي أيضا ايضا كما حيث منذ لدى عليه عليها فيه فيها به
+بها له لها منه منها وقد وهو وهي ولا وما وان وأن
+"""
+
+STOPWORDS = frozenset(normalize(word) for word in (_FRENCH_STOPWORDS + _ARABIC_STOPWORDS).split())
+
+# Racinisation arabe légère, appliquée après normalisation (ة → ه, ى → ي)
+ARABIC_PREFIXES = ('وال', 'بال', 'كال', 'فال', 'لل', 'ال')
+ARABIC_SUFFIXES = ('ها', 'ان', 'ات', 'ون', 'ين', 'يه', 'ه', 'ي')
+ARABIC_PREFIXES = tuple(normalize(p) for p in ARABIC_PREFIXES)
+ARABIC_SUFFIXES = tuple(normalize(s) for s in ARABIC_SUFFIXES)
+WAW = normalize('و')
+
+def stem_arabic(token):
+    if len(token) > 3 and token.startswith(WAW):
+        token = token[1:]
+    for prefix in ARABIC_PREFIXES:
+        if token.startswith(prefix) and len(token) - len(prefix) >= 2:
+            token = token[len(prefix):]
+            break
+    for suffix in ARABIC_SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 2:
+            token = token[:-len(suffix)]
+    return token
+
+def stem_french(token):
+    """Pluriels et terminaisons flexionnelles ; les mots courts sont laissés intacts"""
+    if len(token) < 6:
+        return token
+    if token.endswith('x'):
+        if token.endswith('aux'):
+            return token[:-2] + 'l'          # chevaux → cheval
+        return token[:-1]
+    if token.endswith('s'):
+        token = token[:-1]
+    if token.endswith('r'):
+        token = token[:-1]
+    if token.endswith('e'):
+        token = token[:-1]
+    if len(token) >= 2 and token[-1] == token[-2]:
+        token = token[:-1]
+    return token
+
+@lru_cache(maxsize=200_000)
+def stem(token):
+    """Racine d'un mot déjà normalisé, selon son écriture"""
+    if token.isdigit():
+        return token
+    if ARABIC_LETTER_RE.search(token):
+        return stem_arabic(token)
+    return stem_french(token)
+
+# Résultat de l'analyse par mot brut ('' = mot écarté), un cache par combinaison d'options
+_ANALYSIS_CACHE_SIZE = 200_000
+_analysis_caches = {}
+
+def _analyze_word(word, use_stemming, remove_stopwords):
+    word = word.translate(TRANSLATION_TABLE)
+    if len(word) < MIN_TOKEN_LENGTH or word.startswith('_'):
+        return ''
+    if remove_stopwords and word in STOPWORDS:
+        return ''
+    return stem(word) if use_stemming else word
+
+def _tokens(lowered, use_stemming, remove_stopwords):
+    """
+    Découpe un texte déjà en minuscules. La normalisation est appliquée mot
+    par mot via le cache : chaque mot distinct n'est traité qu'une fois.
+    """
+    cache = _analysis_caches.setdefault((use_stemming, remove_stopwords), {})
+    words = WORD_RE.findall(lowered)
+    tokens = list(map(cache.get, words))
+    if None in tokens:
+        for i, token in enumerate(tokens):
+            if token is None:
+                token = tokens[i] = _analyze_word(words[i], use_stemming, remove_stopwords)
+                if len(cache) < _ANALYSIS_CACHE_SIZE:
+                    cache[words[i]] = token
+    return [token for token in tokens if token]
+
+def clear_caches():
+    stem.cache_clear()
+    _analysis_caches.clear()
+
+def analyze(text, use_stemming=True, remove_stopwords=True):
+    """Mots normalisés (et racinisés) d'un texte, dans l'ordre d'apparition"""
+    if not text:
+        return []
+    return _tokens(text.lower(), use_stemming, remove_stopwords)
+
+# Séparateur de documents pour le traitement par lots (ni mot, ni modifié par lower())
+_BATCH_SEPARATOR = '\n\x1e\n'
+
+def analyze_batch(texts, use_stemming=True, remove_stopwords=True):
+    """
+    Équivalent de [analyze(t) for t in texts] : le lot est passé en minuscules
+    en une seule opération et partage le cache d'analyse des mots.
+    """
+    if not texts:
+        return []
+    lowered = _BATCH_SEPARATOR.join(text or '' for text in texts).lower().split(_BATCH_SEPARATOR)
+    if len(lowered) != len(texts):
+        # Un texte contenait le séparateur : repli sur le traitement un par un
+        lowered = [(text or '').lower() for text in texts]
+    return [_tokens(text, use_stemming, remove_stopwords) for text in lowered]
@@ -0,0 +1,24 @@
+"""
+Insertions ensemblistes idempotentes : une seule requête INSERT … ON CONFLICT
+DO NOTHING pour toutes les lignes, au lieu d'un SELECT puis d'un INSERT par ligne.
+"""
+from backend.models.user import db
+
+def insert_ignore(table, rows, index_elements):
+    """
+    Insère les lignes absentes (conflit sur `index_elements`), sans commit.
+    Retourne le nombre de lignes réellement insérées.
+    """
+    if not rows:
+        return 0
+    dialect = db.engine.dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise RuntimeError(f"insert_ignore: base {dialect} non prise en charge")
+
+    table = getattr(table, '__table__', table)
+    statement = insert(table).values(rows).on_conflict_do_nothing(index_elements=index_elements)
+    return db.session.execute(statement).rowcount or 0
@@ -0,0 +1,72 @@
+"""
+Script de calcul des signatures MinHash des cas existants
+Construit l'index LSH des quasi-doublons (tables case_minhash et
+case_lsh_buckets) par lots ordonnés par id, et liste au passage les
+quasi-doublons déjà présents en base. À relancer après un changement de
+BLIND_INDEX_KEY ou du découpage en bandes (LSH_BANDS, backend/utils/minhash.py)
+"""
+import argparse
+import time
+from sqlalchemy.orm import undefer
+from backend.app import app
+from backend.models.user import db
+from backend.models.case import JurisprudenceCase
+from backend.services.duplicate_service import duplicate_service
+
+def main():
+    parser = argparse.ArgumentParser(description="Index LSH des quasi-doublons pour les cas existants")
+    parser.add_argument('--batch-size', type=int, default=100, help="Nombre de cas par transaction")
+    parser.add_argument('--threshold', type=float, default=None, help="Similarité minimale signalée (défaut: NEAR_DUPLICATE_THRESHOLD)")
+    args = parser.parse_args()
+
+    print("=== Index des quasi-doublons ===\n")
+
+    with app.app_context():
+        try:
+            db.create_all()
+            duplicate_service.remove_cases()
+            db.session.commit()
+
+            total = JurisprudenceCase.query.count()
+            print(f"   {total} cas à traiter")
+
+            last_id = 0
+            indexed = 0
+            pairs = []
+            started = time.perf_counter()
+            while True:
+                batch = JurisprudenceCase.query.options(
+                    undefer(JurisprudenceCase.texte_integral_blob),
+                    undefer(JurisprudenceCase.texte_integral_encrypted)
+                ).filter(JurisprudenceCase.id > last_id).order_by(JurisprudenceCase.id).limit(args.batch_size).all()
+                if not batch:
+                    break
+
+                for case in batch:
+                    last_id = case.id
+                    signature = duplicate_service.signature_for_case(case)
+                    # Chaque cas est comparé aux cas déjà indexés : chaque paire n'est vue qu'une fois
+                    for match in duplicate_service.find_near_duplicates(signature, threshold=args.threshold):
+                        pairs.append((case.ref, match['ref'], match['similarity']))
+                    duplicate_service.index_case(case.id, signature)
+                    db.session.flush()
+                    indexed += 1
+
+                db.session.commit()
+                db.session.expunge_all()
+                elapsed = time.perf_counter() - started
+                rate = indexed / elapsed if elapsed else 0
+                print(f"   … {indexed}/{total} indexés ({rate:.1f} cas/s, dernier id {last_id})")
+
+            print(f"\n✅ Index construit: {indexed} cas, {len(pairs)} paire(s) de quasi-doublons")
+            for ref, other_ref, score in sorted(pairs, key=lambda p: -p[2]):
+                print(f"   - {ref} ≈ {other_ref} ({score:.0%})")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"\n❌ Erreur lors de l'indexation: {e}")
+            import traceback
+            traceback.print_exc()
+
+if __name__ == '__main__':
+    main()
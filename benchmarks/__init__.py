@@ -0,0 +1,4 @@
+"""
+Mesures de performance reproductibles (exécuter depuis la racine du projet,
+par exemple: python -m benchmarks.bench_compression)
+"""
@@ -0,0 +1,125 @@
+"""
+Benchmark de la compression avant chiffrement sur les textes intégraux réels.
+
+Déchiffre un échantillon de texte_integral en base, puis mesure pour chaque
+codec disponible la taille stockée (jeton Fernet et format par blocs) et le
+temps de déchiffrement + décompression.
+
+    python -m benchmarks.bench_compression --limit 500 --json resultats.json
+"""
+import argparse
+import json
+import statistics
+import time
+from cryptography.fernet import Fernet
+from backend.utils.chunked_encryption import ChunkedCipher
+from backend.utils.compression import CODECS
+
+def load_sample(limit):
+    """Textes intégraux en clair, échantillonnés sur l'ensemble de la table par id"""
+    from backend.app import app
+    from backend.models.case import JurisprudenceCase
+
+    with app.app_context():
+        # Un identifiant sur `step`, pour ne pas mesurer que les cas les plus anciens
+        ids = [row.id for row in JurisprudenceCase.query.with_entities(JurisprudenceCase.id).order_by(JurisprudenceCase.id)]
+        step = max(1, len(ids) // limit) if limit else 1
+        sample_ids = ids[::step][:limit]
+        cases = JurisprudenceCase.query.filter(JurisprudenceCase.id.in_(sample_ids)).order_by(JurisprudenceCase.id).all()
+        texts = []
+        for case in cases:
+            try:
+                text = case.get_texte_integral()
+            except Exception:
+                continue
+            if text:
+                texts.append(text)
+        return texts
+
+def percentile(values, pct):
+    if not values:
+        return 0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+def bench_codec(texts, codec, key):
+    """Taille stockée et temps de lecture pour un codec (None = sans compression)"""
+    fernet = Fernet(key)
+    chunked = ChunkedCipher(key)
+    flags = codec.id if codec else 0
+    compress = codec.compress if codec else None
+    decompress = (lambda plain, _flags: codec.decompress(plain)) if codec else None
+
+    raw_bytes = fernet_bytes = blob_bytes = 0
+    fernet_times, blob_times = [], []
+
+    for text in texts:
+        raw = text.encode('utf-8')
+        raw_bytes += len(raw)
+
+        token = fernet.encrypt(compress(raw) if codec else raw)
+        fernet_bytes += len(token)
+        started = time.perf_counter()
+        plain = fernet.decrypt(token)
+        if codec:
+            plain = codec.decompress(plain)
+        plain.decode('utf-8')
+        fernet_times.append((time.perf_counter() - started) * 1000)
+
+        blob = chunked.encrypt(text, flags=flags, transform=compress)
+        blob_bytes += len(blob)
+        started = time.perf_counter()
+        chunked.decrypt(blob, transform=decompress)
+        blob_times.append((time.perf_counter() - started) * 1000)
+
+    return {
+        'codec': codec.name if codec else 'none',
+        'raw_bytes': raw_bytes,
+        'fernet_bytes': fernet_bytes,
+        'chunked_bytes': blob_bytes,
+        'fernet_ratio': round(fernet_bytes / raw_bytes, 3) if raw_bytes else 0,
+        'chunked_ratio': round(blob_bytes / raw_bytes, 3) if raw_bytes else 0,
+        'fernet_read_ms_p50': round(statistics.median(fernet_times), 3) if fernet_times else 0,
+        'fernet_read_ms_p95': round(percentile(fernet_times, 95), 3),
+        'chunked_read_ms_p50': round(statistics.median(blob_times), 3) if blob_times else 0,
+        'chunked_read_ms_p95': round(percentile(blob_times, 95), 3),
+    }
+
+def run(texts):
+    key = Fernet.generate_key()
+    results = [bench_codec(texts, None, key)]
+    for codec in CODECS.values():
+        results.append(bench_codec(texts, codec, key))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark compression + chiffrement du texte intégral")
+    parser.add_argument('--limit', type=int, default=500, help="Nombre de cas échantillonnés")
+    parser.add_argument('--json', dest='json_path', help="Écrit les résultats dans ce fichier JSON")
+    args = parser.parse_args()
+
+    texts = load_sample(args.limit)
+    if not texts:
+        print("Aucun texte intégral en base à mesurer")
+        return
+
+    sizes = [len(t) for t in texts]
+    print(f"{len(texts)} textes, {sum(sizes) / 1e6:.1f} M caractères "
+          f"(médiane {int(statistics.median(sizes))}, max {max(sizes)})\n")
+
+    results = run(texts)
+
+    print(f"{'codec':<6} {'Fernet':>8} {'blocs':>8} {'lecture Fernet p50/p95 (ms)':>28} {'lecture blocs p50/p95 (ms)':>28}")
+    for r in results:
+        print(f"{r['codec']:<6} {r['fernet_ratio']:>8.3f} {r['chunked_ratio']:>8.3f} "
+              f"{r['fernet_read_ms_p50']:>13.3f} / {r['fernet_read_ms_p95']:<12.3f} "
+              f"{r['chunked_read_ms_p50']:>13.3f} / {r['chunked_read_ms_p95']:<12.3f}")
+    print("\nRatios exprimés par rapport à la taille UTF-8 en clair")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({'samples': len(texts), 'total_chars': sum(sizes), 'results': results}, f, indent=2)
+        print(f"Résultats écrits dans {args.json_path}")
+
+if __name__ == '__main__':
+    main()
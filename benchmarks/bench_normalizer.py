@@ -0,0 +1,107 @@
+"""
+Benchmark de l'analyse de texte FR/AR (normalisation, mots vides, racinisation).
+
+Déchiffre un échantillon de résumés et de textes intégraux, puis mesure le
+débit de l'analyse texte par texte et par lots, ainsi que la réduction du
+vocabulaire distinct apportée par la normalisation et la racinisation.
+
+    python -m benchmarks.bench_normalizer --limit 500 --json resultats.json
+"""
+import argparse
+import json
+import re
+import time
+from backend.utils import text_normalizer
+from backend.utils.text_normalizer import analyze, analyze_batch
+
+def load_sample(limit, full_text):
+    """Résumés (et textes intégraux si demandé) en clair, échantillonnés par id"""
+    from backend.app import app
+    from backend.models.case import JurisprudenceCase
+
+    with app.app_context():
+        cases = JurisprudenceCase.query.order_by(JurisprudenceCase.id).limit(limit).all()
+        texts = []
+        for case in cases:
+            try:
+                data = case.to_dict(decrypt=True, include_full_text=full_text)
+            except Exception:
+                continue
+            for field in ('titre', 'resume_francais', 'resume_arabe', 'texte_integral'):
+                if data.get(field):
+                    texts.append(data[field])
+        return texts
+
+def timed(func, repeat):
+    best = None
+    for _ in range(repeat):
+        text_normalizer.clear_caches()
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def run(texts, repeat):
+    total_chars = sum(len(t) for t in texts)
+    raw_vocabulary = set()
+    for text in texts:
+        raw_vocabulary.update(re.findall(r'\w+', text.lower()))
+
+    baseline_s, _ = timed(lambda: [re.findall(r'\w+', t.lower()) for t in texts], repeat)
+    single_s, single = timed(lambda: [analyze(t) for t in texts], repeat)
+    batch_s, batch = timed(lambda: analyze_batch(texts), repeat)
+    assert single == batch, "analyze_batch doit produire le même résultat que analyze"
+
+    normalized_only = analyze_batch(texts, use_stemming=False)
+    tokens = sum(len(t) for t in batch)
+
+    def rate(seconds):
+        return {
+            'seconds': round(seconds, 4),
+            'mchars_per_s': round(total_chars / seconds / 1e6, 2) if seconds else 0,
+            'ktokens_per_s': round(tokens / seconds / 1e3, 1) if seconds else 0,
+        }
+
+    return {
+        'texts': len(texts),
+        'total_chars': total_chars,
+        'tokens': tokens,
+        'baseline_split': rate(baseline_s),
+        'analyze': rate(single_s),
+        'analyze_batch': rate(batch_s),
+        'vocabulary_raw': len(raw_vocabulary),
+        'vocabulary_normalized': len({t for doc in normalized_only for t in doc}),
+        'vocabulary_stemmed': len({t for doc in batch for t in doc}),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'analyse de texte FR/AR")
+    parser.add_argument('--limit', type=int, default=500, help="Nombre de cas échantillonnés")
+    parser.add_argument('--full-text', action='store_true', help="Inclut les textes intégraux")
+    parser.add_argument('--repeat', type=int, default=3, help="Nombre de répétitions (meilleur temps retenu)")
+    parser.add_argument('--json', dest='json_path', help="Écrit les résultats dans ce fichier JSON")
+    args = parser.parse_args()
+
+    texts = load_sample(args.limit, args.full_text)
+    if not texts:
+        print("Aucun texte en base à mesurer")
+        return
+
+    results = run(texts, args.repeat)
+
+    print(f"{results['texts']} textes, {results['total_chars'] / 1e6:.2f} M caractères, {results['tokens']} mots indexables\n")
+    print(f"{'méthode':<16} {'secondes':>10} {'M car./s':>10} {'k mots/s':>10}")
+    for name in ('baseline_split', 'analyze', 'analyze_batch'):
+        r = results[name]
+        print(f"{name:<16} {r['seconds']:>10.4f} {r['mchars_per_s']:>10.2f} {r['ktokens_per_s']:>10.1f}")
+    print(f"\nVocabulaire distinct : {results['vocabulary_raw']} (brut) → "
+          f"{results['vocabulary_normalized']} (normalisé) → {results['vocabulary_stemmed']} (racinisé)")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Résultats écrits dans {args.json_path}")
+
+if __name__ == '__main__':
+    main()
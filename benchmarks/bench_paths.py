@@ -0,0 +1,272 @@
+"""
+Benchmarks des chemins critiques, sur la base configurée (DATABASE_URL) :
+
+- decrypt : to_dict(decrypt=True) par cas, avec et sans texte intégral
+- search  : POST /api/search de bout en bout (client de test Flask, faux
+            OpenRouter de benchmarks/openrouter_stub.py), détail par
+            l'en-tête Server-Timing
+- extract : pdf_extractor.extract_all_fields sur des PDF synthétiques
+            (ou ceux de --pdf-dir), sans appel à l'IA
+- insert  : insertion par lots avec indexation, comme l'import ; les cas
+            BENCH-* créés sont supprimés à la fin
+
+Peupler d'abord la base avec benchmarks/corpus.py. Les résultats JSON
+(--json) portent le commit, la version de Python et le dialecte SQL, pour
+comparer les exécutions dans le temps.
+
+    python -m benchmarks.corpus --cases 10000
+    python -m benchmarks.bench_paths --json bench-$(git rev-parse --short HEAD).json
+    python -m benchmarks.bench_paths --only search --search-runs 20 --latency-ms 0
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+from benchmarks.corpus import CorpusGenerator, build_pdf, insert_cases
+
+BENCHMARKS = ('decrypt', 'search', 'extract', 'insert')
+
+SEARCH_QUERIES = [
+    "Licenciement d'un salarié pour faute grave sans respect du préavis, demande d'indemnité",
+    "Résiliation d'un bail commercial pour défaut de paiement et expulsion du locataire",
+    "Chèque sans provision émis par le gérant d'une société, responsabilité pénale",
+    "Expropriation pour utilité publique et montant de l'indemnité fixée par l'administration",
+    "حضانة الأطفال بعد الطلاق ومبلغ النفقة",
+]
+
+def percentile(values, pct):
+    if not values:
+        return 0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+def summarize(values_ms):
+    """p50/p95/max/moyenne d'une série de durées en millisecondes"""
+    if not values_ms:
+        return {'count': 0}
+    return {
+        'count': len(values_ms),
+        'p50_ms': round(statistics.median(values_ms), 3),
+        'p95_ms': round(percentile(values_ms, 95), 3),
+        'max_ms': round(max(values_ms), 3),
+        'mean_ms': round(statistics.fmean(values_ms), 3),
+    }
+
+def parse_server_timing(header):
+    """{'db': 12.3, 'decrypt': 45.6, ...} à partir de l'en-tête Server-Timing"""
+    timings = {}
+    for metric in (header or '').split(','):
+        parts = [p.strip() for p in metric.split(';')]
+        for part in parts[1:]:
+            if part.startswith('dur='):
+                timings[parts[0]] = float(part[4:])
+    return timings
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def bench_decrypt(args):
+    from backend.models.case import JurisprudenceCase
+
+    cases = JurisprudenceCase.query.order_by(JurisprudenceCase.id).limit(args.limit).all()
+    results = {'cases': len(cases)}
+    for label, full_text in (('without_full_text', False), ('with_full_text', True)):
+        durations = []
+        for _ in range(args.repeat):
+            for case in cases:
+                started = time.perf_counter()
+                case.to_dict(decrypt=True, include_full_text=full_text)
+                durations.append((time.perf_counter() - started) * 1000)
+        results[label] = summarize(durations)
+    return results
+
+def bench_search(args, app):
+    from backend.services.ai_service import ai_service
+    from backend.models.case import JurisprudenceCase
+    from benchmarks.openrouter_stub import start_stub
+
+    stub = start_stub(latency_ms=args.latency_ms)
+    previous = ai_service.api_url, ai_service.api_key
+    ai_service.api_url, ai_service.api_key = stub.url, ai_service.api_key or 'stub'
+    try:
+        client = app.test_client()
+        response = client.post('/api/auth/login', json={'email': args.email, 'password': args.password})
+        if response.status_code != 200:
+            return {'error': f"Connexion impossible ({response.status_code}) : vérifier --email / --password"}
+
+        durations, hits, stages = [], [], {}
+        prompt_cases = []
+        for run in range(args.search_runs):
+            query = SEARCH_QUERIES[run % len(SEARCH_QUERIES)]
+            started = time.perf_counter()
+            response = client.post('/api/search', json={'query': query})
+            durations.append((time.perf_counter() - started) * 1000)
+            payload = response.get_json() or {}
+            if response.status_code != 200 or not payload.get('success'):
+                return {'error': payload.get('error') or f'HTTP {response.status_code}'}
+            hits.append(len(payload.get('similar_cases') or []))
+            prompt_cases.append(payload.get('total_cases_analyzed', 0))
+            for name, value in parse_server_timing(response.headers.get('Server-Timing')).items():
+                stages.setdefault(name, []).append(value)
+            for name, value in (payload.get('timings') or {}).items():
+                if isinstance(value, (int, float)):
+                    stages.setdefault(f'pipeline.{name}', []).append(value)
+
+        return {
+            'cases_in_db': JurisprudenceCase.query.count(),
+            'stub_latency_ms': args.latency_ms,
+            'end_to_end': summarize(durations),
+            'server_timing': {name: summarize(values) for name, values in sorted(stages.items())},
+            'hits_mean': round(statistics.fmean(hits), 2),
+            'prompt_cases_mean': round(statistics.fmean(prompt_cases), 1),
+        }
+    finally:
+        ai_service.api_url, ai_service.api_key = previous
+        stub.shutdown()
+
+def load_pdfs(args):
+    """(nom, contenu) des PDF de --pdf-dir, ou PDF synthétiques"""
+    if args.pdf_dir:
+        names = sorted(n for n in os.listdir(args.pdf_dir) if n.lower().endswith('.pdf'))[:args.pdf_count]
+        pdfs = []
+        for name in names:
+            with open(os.path.join(args.pdf_dir, name), 'rb') as f:
+                pdfs.append((name, f.read()))
+        return pdfs
+    generator = CorpusGenerator(seed=args.seed, text_chars=args.text_chars, ref_prefix='PDF')
+    return [(case['ref'], build_pdf(case)) for case in generator.cases(args.pdf_count)]
+
+def bench_extract(args):
+    from backend.services.pdf_extractor import pdf_extractor
+
+    pdfs = load_pdfs(args)
+    # Mesure de l'extraction locale : l'appel à l'IA dépend du réseau
+    api_key, pdf_extractor.openrouter_api_key = pdf_extractor.openrouter_api_key, None
+    durations, complete = [], 0
+    try:
+        for _ in range(args.repeat):
+            for name, content in pdfs:
+                started = time.perf_counter()
+                data = pdf_extractor.extract_all_fields(io.BytesIO(content))
+                durations.append((time.perf_counter() - started) * 1000)
+                if data.get('ref') and data.get('date_decision') and data.get('resume_arabe') != 'غير متوفر':
+                    complete += 1
+    finally:
+        pdf_extractor.openrouter_api_key = api_key
+    return {
+        'pdfs': len(pdfs),
+        'source': args.pdf_dir or 'synthetic',
+        'mean_pdf_kb': round(statistics.fmean(len(c) for _, c in pdfs) / 1024, 1) if pdfs else 0,
+        'extraction': summarize(durations),
+        'complete_ratio': round(complete / len(durations), 3) if durations else 0,
+    }
+
+def bench_insert(args):
+    from backend.models.user import db, User
+    from backend.models.case import JurisprudenceCase
+    from backend.services.search_index_service import search_index_service
+    from backend.services.duplicate_service import duplicate_service
+    from backend.services.related_service import related_service
+    from backend.services.citation_service import citation_service
+
+    admin = User.query.filter_by(is_admin=True).order_by(User.id).first()
+    if admin is None:
+        return {'error': "Aucun administrateur en base"}
+
+    generator = CorpusGenerator(seed=args.seed, text_chars=args.text_chars, ref_prefix='BENCH')
+    cases = list(generator.cases(args.insert_cases))
+    batch_times = []
+    last = [time.perf_counter()]
+
+    def on_batch(done):
+        now = time.perf_counter()
+        batch_times.append((now - last[0]) * 1000)
+        last[0] = now
+
+    started = time.perf_counter()
+    ids = insert_cases(cases, admin.id, batch_size=args.batch_size, index=True, on_batch=on_batch)
+    elapsed = time.perf_counter() - started
+
+    # Nettoyage : mêmes étapes que la suppression d'une sélection de cas
+    search_index_service.remove_cases(ids)
+    duplicate_service.remove_cases(ids)
+    related_service.remove_cases(ids)
+    citation_service.remove_cases(ids)
+    JurisprudenceCase.query.filter(JurisprudenceCase.id.in_(ids)).delete(synchronize_session=False)
+    db.session.commit()
+
+    return {
+        'cases': len(ids),
+        'batch_size': args.batch_size,
+        'seconds': round(elapsed, 3),
+        'cases_per_second': round(len(ids) / elapsed, 1) if elapsed else 0,
+        'batch': summarize(batch_times),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks déchiffrement, recherche, extraction et insertion")
+    parser.add_argument('--only', action='append', choices=BENCHMARKS, help="Benchmark à exécuter (répétable)")
+    parser.add_argument('--json', dest='json_path', help="Écrit les résultats dans ce fichier JSON")
+    parser.add_argument('--repeat', type=int, default=3, help="Répétitions (decrypt, extract)")
+    parser.add_argument('--seed', type=int, default=42, help="Graine des données générées")
+    parser.add_argument('--text-chars', type=int, default=20000, help="Taille médiane des textes générés")
+    parser.add_argument('--limit', type=int, default=500, help="Cas lus pour decrypt")
+    parser.add_argument('--search-runs', type=int, default=10, help="Recherches exécutées")
+    parser.add_argument('--latency-ms', type=int, default=0, help="Latence simulée du modèle")
+    parser.add_argument('--email', default='admin@jurisprudence.com', help="Compte utilisé pour la recherche")
+    parser.add_argument('--password', default=os.environ.get('BENCH_PASSWORD', 'Admin123!'))
+    parser.add_argument('--pdf-dir', help="Répertoire de PDF réels pour extract")
+    parser.add_argument('--pdf-count', type=int, default=20, help="PDF mesurés par extract")
+    parser.add_argument('--insert-cases', type=int, default=500, help="Cas insérés par insert")
+    parser.add_argument('--batch-size', type=int, default=100, help="Cas par transaction pour insert")
+    args = parser.parse_args()
+
+    from backend.app import app
+    from backend.models.user import db
+
+    selected = args.only or list(BENCHMARKS)
+    report = {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'parameters': {k: v for k, v in vars(args).items() if k not in ('json_path', 'password')},
+        'results': {},
+    }
+
+    print("=== Benchmarks des chemins critiques ===\n")
+    with app.app_context():
+        report['dialect'] = db.engine.dialect.name
+        for name in selected:
+            print(f"▶ {name}...", flush=True)
+            started = time.perf_counter()
+            if name == 'decrypt':
+                result = bench_decrypt(args)
+            elif name == 'search':
+                result = bench_search(args, app)
+            elif name == 'extract':
+                result = bench_extract(args)
+            else:
+                result = bench_insert(args)
+            result['wall_seconds'] = round(time.perf_counter() - started, 3)
+            report['results'][name] = result
+            if 'error' in result:
+                print(f"❌ {name}: {result['error']}")
+            else:
+                print(json.dumps(result, indent=2, ensure_ascii=False))
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\nRésultats écrits dans {args.json_path}")
+
+if __name__ == '__main__':
+    main()
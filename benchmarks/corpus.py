@@ -0,0 +1,389 @@
+"""
+Générateur de corpus synthétique de jurisprudence marocaine.
+
+Produit des cas au format de l'import (champs de prepare_case_data) :
+métadonnées, résumés français et arabe, texte intégral volumineux avec des
+références légales (« article 230 du DOC », « الفصل 399 من قانون المسطرة
+المدنية ») et une part de quasi-doublons. Tout est déterministe pour une
+graine donnée : deux exécutions produisent le même corpus.
+
+    python -m benchmarks.corpus --cases 10000 --text-chars 20000 --seed 42
+    python -m benchmarks.corpus --cases 200000 --no-index --batch-size 1000
+
+L'insertion suit le chemin de l'import par lots : chiffrement des résumés
+et du texte intégral, puis (sauf --no-index) index plein texte, signatures
+MinHash et index des citations. À exécuter sur une base dédiée aux mesures.
+"""
+import argparse
+import random
+import re
+import time
+from datetime import date, timedelta
+
+JURIDICTIONS = [
+    ('Cour de cassation', 'Maroc/Rabat'),
+    ("Cour d'appel de Rabat", 'Maroc/Rabat'),
+    ("Cour d'appel de Casablanca", 'Maroc/Casablanca'),
+    ("Cour d'appel de commerce de Casablanca", 'Maroc/Casablanca'),
+    ("Cour d'appel de Fès", 'Maroc/Fès'),
+    ("Cour d'appel de Marrakech", 'Maroc/Marrakech'),
+    ('Tribunal de première instance de Tanger', 'Maroc/Tanger'),
+    ('Tribunal de commerce de Casablanca', 'Maroc/Casablanca'),
+    ('Tribunal administratif de Rabat', 'Maroc/Rabat'),
+    ('Tribunal de première instance d\'Agadir', 'Maroc/Agadir'),
+]
+
+TYPES_DECISION = ['Arrêt', 'Jugement', 'Ordonnance']
+
+# Chambre → (thèmes, mots clés français, mots clés arabes, codes cités)
+CHAMBRES = {
+    'Civile': (
+        ['Responsabilité contractuelle', 'Vente immobilière', 'Prescription', 'Bail d\'habitation', 'Servitudes'],
+        ['contrat', 'inexécution', 'dommages-intérêts', 'vente', 'bail', 'prescription', 'preuve', 'expertise'],
+        ['العقد', 'التعويض', 'البيع', 'الكراء', 'التقادم', 'الإثبات', 'الخبرة', 'الالتزام'],
+        ['DOC', 'CPC', 'CDR'],
+    ),
+    'Commerciale': (
+        ['Fonds de commerce', 'Effets de commerce', 'Difficultés de l\'entreprise', 'Sociétés', 'Concurrence déloyale'],
+        ['chèque', 'lettre de change', 'redressement', 'liquidation', 'société', 'gérant', 'créancier', 'fonds de commerce'],
+        ['الشيك', 'الكمبيالة', 'التسوية القضائية', 'التصفية', 'الشركة', 'المسير', 'الدائن', 'الأصل التجاري'],
+        ['CCOM', 'DOC', 'CPC'],
+    ),
+    'Sociale': (
+        ['Licenciement abusif', 'Accident du travail', 'Salaire', 'Démission', 'Représentation du personnel'],
+        ['licenciement', 'salarié', 'employeur', 'indemnité', 'préavis', 'faute grave', 'ancienneté', 'salaire'],
+        ['الفصل من العمل', 'الأجير', 'المشغل', 'التعويض', 'الإخطار', 'الخطأ الجسيم', 'الأقدمية', 'الأجر'],
+        ['CT', 'DOC', 'CPC'],
+    ),
+    'Pénale': (
+        ['Escroquerie', 'Abus de confiance', 'Faux en écriture', 'Vol qualifié', 'Coups et blessures'],
+        ['prévenu', 'infraction', 'peine', 'récidive', 'partie civile', 'escroquerie', 'faux', 'sursis'],
+        ['المتهم', 'الجريمة', 'العقوبة', 'العود', 'المطالب بالحق المدني', 'النصب', 'التزوير', 'موقوف التنفيذ'],
+        ['CP', 'CPP'],
+    ),
+    'Administrative': (
+        ['Expropriation', 'Fonction publique', 'Marchés publics', 'Fiscalité locale', 'Responsabilité de l\'État'],
+        ['administration', 'excès de pouvoir', 'expropriation', 'fonctionnaire', 'marché public', 'impôt', 'annulation'],
+        ['الإدارة', 'الشطط في استعمال السلطة', 'نزع الملكية', 'الموظف', 'الصفقة العمومية', 'الضريبة', 'الإلغاء'],
+        ['CF', 'CPC', 'DOC'],
+    ),
+    'Statut personnel': (
+        ['Divorce', 'Pension alimentaire', 'Garde des enfants', 'Succession', 'Filiation'],
+        ['divorce', 'pension', 'garde', 'succession', 'héritier', 'épouse', 'filiation', 'mariage'],
+        ['الطلاق', 'النفقة', 'الحضانة', 'الإرث', 'الوارث', 'الزوجة', 'النسب', 'الزواج'],
+        ['CF', 'CPC'],
+    ),
+}
+
+CODE_NAMES = {
+    'DOC': ('du DOC', 'من قانون الالتزامات والعقود'),
+    'CPC': ('du Code de procédure civile', 'من قانون المسطرة المدنية'),
+    'CPP': ('du Code de procédure pénale', 'من قانون المسطرة الجنائية'),
+    'CP': ('du Code pénal', 'من القانون الجنائي'),
+    'CCOM': ('du Code de commerce', 'من مدونة التجارة'),
+    'CT': ('du Code du travail', 'من مدونة الشغل'),
+    'CF': ('du Code de la famille', 'من مدونة الأسرة'),
+    'CDR': ('du Code des droits réels', 'من مدونة الحقوق العينية'),
+}
+
+FR_OPENINGS = [
+    'Attendu que', 'Considérant que', 'Mais attendu que', 'Attendu en outre que',
+    'Et attendu que', 'Qu\'il ressort du dossier que', 'Attendu cependant que',
+]
+FR_SUBJECTS = [
+    'la cour d\'appel', 'le demandeur au pourvoi', 'la partie défenderesse', 'le tribunal de première instance',
+    'l\'expert désigné', 'le jugement entrepris', 'la requérante', 'le ministère public',
+]
+FR_VERBS = [
+    'a souverainement apprécié', 'n\'a pas justifié', 'a fait une exacte application de', 'a méconnu',
+    'a légalement fondé sa décision sur', 'a dénaturé', 'soutient à tort', 'a retenu à bon droit',
+]
+FR_OBJECTS = [
+    'les éléments de preuve produits', 'la portée du contrat liant les parties', 'le délai de prescription',
+    'les conclusions de l\'expertise', 'la demande de dommages-intérêts', 'le moyen soulevé d\'office',
+    'la qualité pour agir', 'les dispositions impératives applicables',
+]
+AR_OPENINGS = ['حيث إن', 'لكن حيث إن', 'وحيث إن', 'حيث يتبين من وثائق الملف أن', 'وحيث ثبت للمحكمة أن']
+AR_SUBJECTS = ['محكمة الاستئناف', 'الطاعن', 'المطلوب في النقض', 'المحكمة الابتدائية', 'الخبير المعين', 'الحكم المطعون فيه']
+AR_VERBS = ['استندت إلى', 'لم تعلل', 'طبقت تطبيقا سليما', 'خرقت', 'أغفلت', 'قضت برفض', 'أيدت']
+AR_OBJECTS = ['وسائل الإثبات المدلى بها', 'مقتضيات العقد الرابط بين الطرفين', 'أجل التقادم', 'نتائج الخبرة',
+              'طلب التعويض', 'الدفع المثار', 'الصفة في التقاضي', 'المقتضيات القانونية الآمرة']
+
+class CorpusGenerator:
+    """Cas synthétiques reproductibles (même graine, même corpus)"""
+
+    def __init__(self, seed=42, text_chars=20000, duplicate_rate=0.02, ref_prefix='SYN'):
+        self.rng = random.Random(seed)
+        self.text_chars = text_chars
+        self.duplicate_rate = duplicate_rate
+        self.ref_prefix = ref_prefix
+        self._recent = []
+
+    def _citation(self, codes, arabic=False):
+        code = self.rng.choice(codes)
+        article = self.rng.randint(1, 600)
+        if arabic:
+            return f"الفصل {article} {CODE_NAMES[code][1]}"
+        if self.rng.random() < 0.3:
+            return f"articles {article} et {article + 1} {CODE_NAMES[code][0]}"
+        return f"article {article} {CODE_NAMES[code][0]}"
+
+    def _fr_sentence(self, keywords, codes):
+        rng = self.rng
+        sentence = (f"{rng.choice(FR_OPENINGS)} {rng.choice(FR_SUBJECTS)} {rng.choice(FR_VERBS)} "
+                    f"{rng.choice(FR_OBJECTS)} relatifs au {rng.choice(keywords)}")
+        if rng.random() < 0.35:
+            sentence += f", en application de l'{self._citation(codes)}"
+        return sentence + '.'
+
+    def _ar_sentence(self, keywords, codes):
+        rng = self.rng
+        sentence = (f"{rng.choice(AR_OPENINGS)} {rng.choice(AR_SUBJECTS)} {rng.choice(AR_VERBS)} "
+                    f"{rng.choice(AR_OBJECTS)} المتعلقة ب{rng.choice(keywords)}")
+        if rng.random() < 0.35:
+            sentence += f" طبقا لمقتضيات {self._citation(codes, arabic=True)}"
+        return sentence + '.'
+
+    def _paragraphs(self, sentence, target_chars, sentences_per_paragraph=5):
+        paragraphs, size = [], 0
+        while size < target_chars:
+            paragraph = ' '.join(sentence() for _ in range(sentences_per_paragraph))
+            paragraphs.append(paragraph)
+            size += len(paragraph) + 2
+        return '\n\n'.join(paragraphs)
+
+    def case(self, index):
+        """Champs d'un cas, en clair (clés de prepare_case_data)"""
+        rng = self.rng
+        if self._recent and rng.random() < self.duplicate_rate:
+            return self._near_duplicate(index, rng.choice(self._recent))
+
+        chambre = rng.choice(list(CHAMBRES))
+        themes, fr_keywords, ar_keywords, codes = CHAMBRES[chambre]
+        juridiction, pays_ville = rng.choice(JURIDICTIONS)
+        theme = rng.choice(themes)
+        decided = date(2005, 1, 1) + timedelta(days=rng.randint(0, 365 * 20))
+        # Longueur du texte intégral : log-normale autour de text_chars
+        text_target = int(self.text_chars * rng.lognormvariate(0, 0.5))
+
+        fr_sentence = lambda: self._fr_sentence(fr_keywords, codes)
+        ar_sentence = lambda: self._ar_sentence(ar_keywords, codes)
+        texte_integral = (
+            self._paragraphs(ar_sentence, text_target * 0.6)
+            + '\n\n' + self._paragraphs(fr_sentence, text_target * 0.4)
+        )
+        data = {
+            'ref': f'{self.ref_prefix}-{index:07d}',
+            'titre': f"{theme} - {rng.choice(fr_keywords)}",
+            'juridiction': juridiction,
+            'pays_ville': pays_ville,
+            'numero_decision': f"{rng.randint(1, 2000)}/{decided.year}",
+            'date_decision': decided,
+            'numero_dossier': f"{rng.randint(100, 9999)}/{rng.randint(1, 9)}/{rng.randint(1, 9)}/{decided.year - 1}",
+            'type_decision': rng.choice(TYPES_DECISION),
+            'chambre': chambre,
+            'theme': theme,
+            'mots_cles': ', '.join(rng.sample(fr_keywords, 4)),
+            'base_legale': '; '.join(self._citation(codes) for _ in range(rng.randint(1, 3))),
+            'source': rng.choice(['Revue de la Cour de cassation', 'Bulletin des arrêts', 'Site officiel', 'Recueil annuel']),
+            'resume_francais': ' '.join(fr_sentence() for _ in range(rng.randint(4, 10))),
+            'resume_arabe': ' '.join(ar_sentence() for _ in range(rng.randint(3, 8))),
+            'texte_integral': texte_integral,
+        }
+        self._recent.append(data)
+        if len(self._recent) > 200:
+            self._recent.pop(0)
+        return data
+
+    def _near_duplicate(self, index, original):
+        """Copie d'un cas récent avec quelques phrases modifiées (republication, erratum)"""
+        data = dict(original, ref=f'{self.ref_prefix}-{index:07d}')
+        sentences = data['texte_integral'].split('. ')
+        for _ in range(max(1, len(sentences) // 50)):
+            position = self.rng.randrange(len(sentences))
+            sentences[position] = sentences[position][::-1]
+        data['texte_integral'] = '. '.join(sentences)
+        return data
+
+    def cases(self, count, start=0):
+        for index in range(start, start + count):
+            yield self.case(index)
+
+ARABIC = re.compile(r'[\u0600-\u06FF]')
+
+def _pdf_hex(text):
+    # Lignes arabes en ordre visuel, comme dans les PDF réels (PyPDF2 les remet en ordre logique)
+    if ARABIC.search(text):
+        text = text[::-1]
+    return ''.join(f'{ord(ch):04X}' for ch in text if ord(ch) <= 0xFFFF)
+
+def build_pdf(data, max_text_chars=12000):
+    """
+    PDF d'un cas dans la mise en page attendue par pdf_extractor (libellés
+    « Ref : », « Juridiction : », « Résumé en arabe »...). Police Type0 sans
+    fichier de police : CID = point de code Unicode, table ToUnicode
+    identité, ce qui suffit à l'extraction de texte (français et arabe).
+    """
+    lines = [data['titre'], '', f"Ref : {data['ref'].split('-')[-1]}"]
+    lines += [
+        f"Juridiction : {data['juridiction']}",
+        f"Pays/Ville : {data['pays_ville']}",
+        f"N° de décision : {data['numero_decision']}",
+        f"Date de décision : {data['date_decision'].strftime('%d/%m/%Y')}",
+        f"N° de dossier : {data['numero_dossier']}",
+        f"Type de décision : {data['type_decision']}",
+        f"Chambre : {data['chambre']}",
+        f"Thème : {data['theme']}", '',
+        f"Mots clés : {data['mots_cles']}", '',
+        f"Base légale : {data['base_legale']}", '',
+        f"Source : {data['source']}", '',
+        'Résumé en français',
+    ]
+    wrap = lambda text: [text[i:i + 90] for i in range(0, len(text), 90)]
+    lines += wrap(data['resume_francais']) + ['', '', 'Résumé en arabe']
+    lines += wrap(data['resume_arabe']) + ['', 'Texte intégral']
+    for paragraph in data['texte_integral'][:max_text_chars].split('\n\n'):
+        lines += wrap(paragraph) + ['']
+
+    pages = [lines[i:i + 50] for i in range(0, len(lines), 50)]
+    objects = []  # corps des objets, numérotés à partir de 1
+
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    cmap = '\n'.join(
+        ['/CIDInit /ProcSet findresource begin 12 dict begin begincmap',
+         '/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def',
+         '/CMapName /Adobe-Identity-UCS def /CMapType 2 def',
+         '1 begincodespacerange <0000> <FFFF> endcodespacerange',
+         '100 beginbfrange']
+        + [f'<{high:02X}00> <{high:02X}FF> <{high:02X}00>' for high in range(100)]
+        + ['endbfrange', '100 beginbfrange']
+        + [f'<{high:02X}00> <{high:02X}FF> <{high:02X}00>' for high in range(100, 200)]
+        + ['endbfrange', '56 beginbfrange']
+        + [f'<{high:02X}00> <{high:02X}FF> <{high:02X}00>' for high in range(200, 256)]
+        + ['endbfrange', 'endcmap CMapName currentdict /CMap defineresource pop end end']
+    ).encode('ascii')
+    to_unicode = add(b'<< /Length %d >>\nstream\n' % len(cmap) + cmap + b'\nendstream')
+    descendant = add(b'<< /Type /Font /Subtype /CIDFontType2 /BaseFont /ArialUnicodeMS '
+                     b'/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> /DW 500 >>')
+    font = add(b'<< /Type /Font /Subtype /Type0 /BaseFont /ArialUnicodeMS /Encoding /Identity-H '
+               b'/DescendantFonts [%d 0 R] /ToUnicode %d 0 R >>' % (descendant, to_unicode))
+    pages_id = len(objects) + 2 * len(pages) + 1  # objet qui suit les pages
+    page_ids = []
+    for page_lines in pages:
+        content = ['BT /F1 9 Tf 40 800 Td 12 TL']
+        content += [f'<{_pdf_hex(line)}> Tj T*' for line in page_lines]
+        content.append('ET')
+        stream = '\n'.join(content).encode('ascii')
+        content_id = add(b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream')
+        page_ids.append(add(b'<< /Type /Page /Parent %d 0 R /MediaBox [0 0 595 842] '
+                            b'/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>'
+                            % (pages_id, font, content_id)))
+    kids = ' '.join(f'{page_id} 0 R' for page_id in page_ids).encode('ascii')
+    assert add(b'<< /Type /Pages /Kids [%s] /Count %d >>' % (kids, len(page_ids))) == pages_id
+    catalog = add(b'<< /Type /Catalog /Pages %d 0 R >>' % pages_id)
+
+    output = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+    xref = len(output)
+    output += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    output += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    output += b'trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, catalog, xref)
+    return bytes(output)
+
+def insert_cases(cases, created_by, batch_size=500, index=True, on_batch=None):
+    """
+    Insère des cas (dictionnaires en clair) comme l'import par lots : un
+    commit par lot. Retourne les identifiants créés. À appeler dans un
+    contexte d'application.
+    """
+    from backend.models.user import db
+    from backend.models.case import JurisprudenceCase
+    from backend.utils.encryption import encryption_service
+    from backend.services.search_index_service import search_index_service
+    from backend.services.duplicate_service import duplicate_service
+    from backend.services.citation_service import citation_service
+
+    ids, pending = [], []
+
+    def flush():
+        db.session.flush()
+        if index:
+            for case, data in pending:
+                search_index_service.index_case(case, texts=data)
+                duplicate_service.index_case(case.id, duplicate_service.signature_for(data))
+                citation_service.index_case(case, texts=data)
+        db.session.commit()
+        ids.extend(case.id for case, _ in pending)
+        if on_batch:
+            on_batch(len(ids))
+        pending.clear()
+
+    for data in cases:
+        case = JurisprudenceCase(
+            **{field: data[field] for field in (
+                'ref', 'titre', 'juridiction', 'pays_ville', 'numero_decision', 'date_decision',
+                'numero_dossier', 'type_decision', 'chambre', 'theme', 'mots_cles', 'base_legale', 'source')},
+            resume_francais_encrypted=encryption_service.encrypt(data['resume_francais']),
+            resume_arabe_encrypted=encryption_service.encrypt(data['resume_arabe']),
+            created_by=created_by
+        )
+        case.set_texte_integral(data['texte_integral'])
+        db.session.add(case)
+        pending.append((case, data))
+        if len(pending) >= batch_size:
+            flush()
+    if pending:
+        flush()
+    return ids
+
+def main():
+    parser = argparse.ArgumentParser(description="Génère et insère un corpus synthétique de jurisprudence")
+    parser.add_argument('--cases', type=int, default=10000, help="Nombre de cas à générer")
+    parser.add_argument('--text-chars', type=int, default=20000, help="Taille médiane du texte intégral (caractères)")
+    parser.add_argument('--seed', type=int, default=42, help="Graine du générateur")
+    parser.add_argument('--duplicate-rate', type=float, default=0.02, help="Part de quasi-doublons")
+    parser.add_argument('--batch-size', type=int, default=500, help="Cas par transaction")
+    parser.add_argument('--prefix', default='SYN', help="Préfixe des références générées")
+    parser.add_argument('--no-index', action='store_true', help="N'alimente pas les index (plein texte, MinHash, citations)")
+    args = parser.parse_args()
+
+    from backend.app import app
+    from backend.models.user import db, User
+    from backend.models.case import JurisprudenceCase
+
+    print("=== Génération d'un corpus synthétique ===\n")
+
+    with app.app_context():
+        admin = User.query.filter_by(is_admin=True).order_by(User.id).first()
+        if admin is None:
+            print("❌ Aucun administrateur : lancez d'abord `flask --app main init`")
+            return
+
+        start = JurisprudenceCase.query.filter(JurisprudenceCase.ref.like(f'{args.prefix}-%')).count()
+        generator = CorpusGenerator(seed=args.seed + start, text_chars=args.text_chars,
+                                    duplicate_rate=args.duplicate_rate, ref_prefix=args.prefix)
+        started = time.perf_counter()
+
+        def progress(done):
+            elapsed = time.perf_counter() - started
+            print(f"   {done}/{args.cases} cas ({done / elapsed:.0f} cas/s)", end='\r', flush=True)
+
+        try:
+            ids = insert_cases(generator.cases(args.cases, start=start), admin.id,
+                               batch_size=args.batch_size, index=not args.no_index, on_batch=progress)
+        except Exception as e:
+            db.session.rollback()
+            print(f"\n❌ Erreur lors de l'insertion: {e}")
+            raise
+
+        elapsed = time.perf_counter() - started
+        print(f"\n✅ {len(ids)} cas insérés en {elapsed:.1f}s ({len(ids) / elapsed:.0f} cas/s)")
+
+if __name__ == '__main__':
+    main()
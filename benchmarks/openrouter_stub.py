@@ -0,0 +1,115 @@
+"""
+Faux serveur OpenRouter pour les mesures : répond à /chat/completions sans
+appeler de modèle, avec une latence fixe, en JSON ou en flux SSE.
+
+La réponse reprend les premières références du prompt (lignes « Réf: … »)
+au format attendu par le pipeline de recherche, et déclare un usage en
+tokens proportionnel à la taille du prompt : le pipeline (emballage du
+prompt, analyse du JSON, hydratation des cas) travaille comme en production.
+
+    python -m benchmarks.openrouter_stub --port 8099 --latency-ms 800
+    OPENROUTER_API_URL=http://127.0.0.1:8099/chat/completions OPENROUTER_API_KEY=x python main.py
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REF_PATTERN = re.compile(r'^Réf: (.+)$', re.MULTILINE)
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _answer(self, prompt):
+        refs = [ref.strip() for ref in REF_PATTERN.findall(prompt) if ref.strip() != 'N/A']
+        selected = refs[:self.server.hits]
+        answer = json.dumps({
+            'similar_cases': selected,
+            'analysis': "Analyse synthétique : les cas retenus partagent la qualification juridique et les textes appliqués.",
+            'recommendations': "Vérifier la jurisprudence récente de la Cour de cassation.",
+            'similarity_reasons': {ref: 'Même fondement légal' for ref in selected},
+        }, ensure_ascii=False)
+        usage = {
+            'prompt_tokens': len(prompt) // 4,
+            'completion_tokens': len(answer) // 4,
+        }
+        usage['total_tokens'] = usage['prompt_tokens'] + usage['completion_tokens']
+        return f"```json\n{answer}\n```", usage
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        prompt = ''.join(m.get('content', '') for m in body.get('messages', []))
+        content, usage = self._answer(prompt)
+        self.server.calls += 1
+
+        if not body.get('stream'):
+            time.sleep(self.server.latency)
+            payload = json.dumps({
+                'choices': [{'message': {'role': 'assistant', 'content': content}}],
+                'usage': usage,
+            }).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+
+        # Flux SSE : latence répartie entre le premier fragment et les suivants
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        chunks = [content[i:i + 64] for i in range(0, len(content), 64)]
+        time.sleep(self.server.latency / 2)
+        for chunk in chunks:
+            event = {'choices': [{'delta': {'content': chunk}}]}
+            self.wfile.write(f"data: {json.dumps(event)}\n\n".encode('utf-8'))
+            time.sleep(self.server.latency / 2 / len(chunks))
+        self.wfile.write(f"data: {json.dumps({'choices': [], 'usage': usage})}\n\n".encode('utf-8'))
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency_ms=0, hits=5):
+        super().__init__(address, StubHandler)
+        self.latency = latency_ms / 1000
+        self.hits = hits
+        self.calls = 0
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}/chat/completions'
+
+def start_stub(latency_ms=0, hits=5, port=0):
+    """Démarre le serveur dans un thread ; retourne le serveur (server.url, server.shutdown())"""
+    server = StubServer(('127.0.0.1', port), latency_ms=latency_ms, hits=hits)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Faux serveur OpenRouter pour les mesures")
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--latency-ms', type=int, default=0, help="Latence simulée du modèle")
+    parser.add_argument('--hits', type=int, default=5, help="Nombre de cas retenus par réponse")
+    args = parser.parse_args()
+
+    server = StubServer(('127.0.0.1', args.port), latency_ms=args.latency_ms, hits=args.hits)
+    print(f"Faux OpenRouter sur {server.url} (latence {args.latency_ms} ms)")
+    print(f"   OPENROUTER_API_URL={server.url} OPENROUTER_API_KEY=stub")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""
+Script de calcul du graphe des cas liés (table case_relations)
+Recalcule les N voisins de chaque cas et remplace le graphe en une seule
+transaction. À planifier hors des heures de pointe, par exemple chaque nuit :
+    30 3 * * * cd /var/www/jurisprudence-platform && venv/bin/python compute_related_cases.py
+"""
+import argparse
+import time
+from backend.app import app
+from backend.models.user import db
+from backend.services.related_service import related_service
+
+def main():
+    parser = argparse.ArgumentParser(description="Calcul hors ligne des cas liés")
+    parser.add_argument('--top', type=int, default=10, help="Nombre de voisins par cas")
+    parser.add_argument('--batch-size', type=int, default=200, help="Cas déchiffrés par lot")
+    parser.add_argument('--full-text', action='store_true', help="Inclut le texte intégral dans les vecteurs")
+    args = parser.parse_args()
+
+    print("=== Calcul des cas liés ===\n")
+
+    with app.app_context():
+        try:
+            db.create_all()
+
+            started = time.perf_counter()
+            features = related_service.load_features(batch_size=args.batch_size, include_full_text=args.full_text)
+            loaded = time.perf_counter()
+            print(f"1. {len(features)} cas chargés et analysés ({loaded - started:.1f}s)")
+
+            relations = related_service.compute(features, top_n=args.top)
+            computed = time.perf_counter()
+            links = sum(len(v) for v in relations.values())
+            print(f"2. {links} liens calculés ({computed - loaded:.1f}s)")
+
+            related_service.store(relations)
+            print(f"3. Graphe enregistré ({time.perf_counter() - computed:.1f}s)")
+
+            without = sum(1 for v in relations.values() if not v)
+            print(f"\n✅ Terminé: {len(relations) - without} cas avec voisins, {without} sans voisin")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"\n❌ Erreur lors du calcul: {e}")
+            import traceback
+            traceback.print_exc()
+
+if __name__ == '__main__':
+    main()
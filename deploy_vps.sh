@@ -292,8 +292,8 @@ initialize_database() {
     # Source environment
     export $(cat .env | xargs)
     
-    # Initialize database
-    python3 -c "from backend.app import app, db; app.app_context().push(); db.create_all(); print('Database initialized')"
+    # Initialize database (tables, roles, permissions, settings, admin account)
+    flask --app main init
     
     print_success "Database initialized"
 }
@@ -480,7 +480,11 @@ async function processFilesOneByOne(batchId, totalFiles) {
             
             if (data.success > 0) {
                 successCount++;
-                updateFileStatus(i, 'success', data.details[0]?.ref);
+                const duplicates = data.details[0]?.near_duplicates || [];
+                const label = duplicates.length
+                    ? `${data.details[0]?.ref} — quasi-doublon de ${duplicates[0].ref} (${Math.round(duplicates[0].similarity * 100)}%)`
+                    : data.details[0]?.ref;
+                updateFileStatus(i, 'success', label);
             } else if (data.errors && data.errors.length > 0) {
                 errorCount++;
                 updateFileStatus(i, 'error', data.errors[0]?.error);
@@ -842,7 +846,7 @@ async function viewCaseDetails(caseId) {
     modalBody.innerHTML = '<p style="text-align: center; color: #6b7280;"><i class="fas fa-spinner fa-spin"></i> Chargement des détails...</p>';
     
     try {
-        const response = await fetch(`/api/cases/${caseId}`, { credentials: 'include' });
+        const response = await fetch(`/api/cases/${caseId}?include_text=1`, { credentials: 'include' });
         const caseData = await response.json();
         
         if (!response.ok) {
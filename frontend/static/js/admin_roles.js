@@ -68,7 +68,8 @@ async function loadRoles() {
         
         if (!response.ok) throw new Error('Erreur de chargement');
         
-        allRoles = await response.json();
+        const data = await response.json();
+        allRoles = data.roles || [];
         displayRoles();
     } catch (error) {
         showAlert('Erreur lors du chargement des rôles', 'error');
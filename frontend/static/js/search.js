@@ -213,6 +213,12 @@ function displayResults(data) {
                             <strong>Juridiction:</strong> ${caseItem.juridiction || 'N/A'} | 
                             <strong>Date:</strong> ${caseItem.date_decision || 'N/A'}
                         </div>
+                        ${caseItem.resume_francais_snippet ? `
+                            <p style="font-size: 0.9rem; margin: 0.5rem 0;">${caseItem.resume_francais_snippet}</p>
+                        ` : ''}
+                        ${caseItem.resume_arabe_snippet ? `
+                            <p dir="rtl" style="font-size: 0.9rem; margin: 0.5rem 0;">${caseItem.resume_arabe_snippet}</p>
+                        ` : ''}
                         <div style="margin-top: 0.75rem;">
                             <a href="/case/${caseItem.id}" class="btn btn-sm btn-primary">
                                 Voir le cas complet
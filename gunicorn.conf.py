@@ -0,0 +1,21 @@
+"""
+Configuration gunicorn, chargée automatiquement depuis le répertoire du projet
+(les options de la ligne de commande restent prioritaires).
+
+Métriques Prometheus avec plusieurs workers : si PROMETHEUS_MULTIPROC_DIR est
+défini, le répertoire est vidé au démarrage du maître et les fichiers d'un
+worker arrêté sont marqués (jauges "live" retirées de l'agrégat).
+"""
+import glob
+import os
+
+def on_starting(server):
+    directory = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        for path in glob.glob(os.path.join(directory, '*.db')):
+            os.remove(path)
+
+def child_exit(server, worker):
+    from backend.utils.metrics import mark_process_dead
+    mark_process_dead(worker.pid)
@@ -0,0 +1,107 @@
+"""
+Script de migration du texte intégral vers le format chiffré par blocs
+Ajoute la colonne texte_integral_blob si nécessaire, puis convertit les
+jetons Fernet existants par lots ordonnés par id (une transaction par lot)
+"""
+import argparse
+import time
+from sqlalchemy import inspect, text
+from backend.app import app
+from backend.models.user import db
+from backend.models.case import JurisprudenceCase
+from backend.utils.encryption import encryption_service
+
+def ensure_blob_column():
+    """Ajoute la colonne binaire si la table a été créée avant ce format"""
+    columns = [col['name'] for col in inspect(db.engine).get_columns('jurisprudence_cases')]
+    if 'texte_integral_blob' in columns:
+        print("   ✓ Colonne texte_integral_blob déjà présente")
+        return
+
+    column_type = 'BYTEA' if db.engine.dialect.name == 'postgresql' else 'BLOB'
+    db.session.execute(text(f"ALTER TABLE jurisprudence_cases ADD COLUMN texte_integral_blob {column_type}"))
+    db.session.commit()
+    print(f"   ✓ Colonne texte_integral_blob ({column_type}) ajoutée")
+
+def convert_rows(batch_size):
+    """Convertit les lignes encore au format Fernet, par lots ordonnés par id"""
+    remaining = JurisprudenceCase.query.filter(
+        JurisprudenceCase.texte_integral_encrypted.isnot(None),
+        JurisprudenceCase.texte_integral_blob.is_(None)
+    ).count()
+    print(f"   {remaining} cas à convertir")
+
+    last_id = 0
+    converted = 0
+    errors = 0
+    legacy_bytes = 0
+    blob_bytes = 0
+    started = time.perf_counter()
+
+    while True:
+        batch = JurisprudenceCase.query.filter(
+            JurisprudenceCase.id > last_id,
+            JurisprudenceCase.texte_integral_encrypted.isnot(None),
+            JurisprudenceCase.texte_integral_blob.is_(None)
+        ).order_by(JurisprudenceCase.id).limit(batch_size).all()
+
+        if not batch:
+            break
+
+        for case in batch:
+            last_id = case.id
+            try:
+                plain = encryption_service.decrypt(case.texte_integral_encrypted)
+            except Exception as e:
+                errors += 1
+                print(f"   ❌ Cas {case.id} ({case.ref}): déchiffrement impossible: {e}")
+                continue
+            legacy_bytes += len(case.texte_integral_encrypted)
+            case.texte_integral_blob = encryption_service.encrypt_large(plain)
+            case.texte_integral_encrypted = None
+            blob_bytes += len(case.texte_integral_blob)
+            converted += 1
+
+        db.session.commit()
+        # Libère les lignes converties de la session entre deux lots
+        db.session.expunge_all()
+
+        elapsed = time.perf_counter() - started
+        rate = converted / elapsed if elapsed else 0
+        print(f"   … {converted}/{remaining} convertis ({rate:.1f} cas/s, dernier id {last_id})")
+
+    return converted, errors, legacy_bytes, blob_bytes
+
+def main():
+    parser = argparse.ArgumentParser(description="Migration du texte intégral vers le format chiffré par blocs")
+    parser.add_argument('--batch-size', type=int, default=100, help="Nombre de cas par transaction")
+    args = parser.parse_args()
+
+    print("=== Migration du texte intégral vers le format par blocs ===\n")
+
+    with app.app_context():
+        try:
+            print("1. Vérification de la structure de la table...")
+            ensure_blob_column()
+
+            print("\n2. Conversion des textes intégraux...")
+            converted, errors, legacy_bytes, blob_bytes = convert_rows(args.batch_size)
+
+            print("\n3. Résultat:")
+            print(f"   - {converted} cas convertis, {errors} erreur(s)")
+            if legacy_bytes:
+                saved = 100 * (1 - blob_bytes / legacy_bytes)
+                print(f"   - Stockage: {legacy_bytes / 1e6:.1f} Mo → {blob_bytes / 1e6:.1f} Mo ({saved:.0f}% économisés)")
+            if db.engine.dialect.name == 'postgresql':
+                print("   - Exécutez VACUUM ANALYZE jurisprudence_cases pour récupérer l'espace")
+
+            print("\n✅ Migration terminée avec succès!")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"\n❌ Erreur lors de la migration: {e}")
+            import traceback
+            traceback.print_exc()
+
+if __name__ == '__main__':
+    main()
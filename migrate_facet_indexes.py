@@ -0,0 +1,59 @@
+"""
+Script d'ajout des index de jurisprudence_cases utilisés par les filtres et
+les facettes (juridiction, chambre, type_decision, date_decision, updated_at)
+db.create_all() ne crée pas les index d'une table existante : à exécuter une
+fois sur les bases créées avant leur ajout
+
+Sous PostgreSQL, les index sont créés avec CREATE INDEX CONCURRENTLY, hors
+transaction : la table reste accessible en écriture pendant la construction.
+Un index laissé invalide par une construction interrompue est supprimé puis
+recréé.
+"""
+import time
+from sqlalchemy import inspect, text
+from backend.app import app
+from backend.models.user import db
+from backend.models.case import JurisprudenceCase
+
+def invalid_indexes(connection):
+    """Index de jurisprudence_cases marqués invalides (CONCURRENTLY interrompu)"""
+    return {row[0] for row in connection.execute(text("""
+        SELECT c.relname FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE i.indrelid = 'jurisprudence_cases'::regclass AND NOT i.indisvalid
+    """))}
+
+def main():
+    print("=== Index des filtres et facettes ===\n")
+
+    with app.app_context():
+        try:
+            postgresql = db.engine.dialect.name == 'postgresql'
+            # CONCURRENTLY est refusé dans une transaction : connexion en autocommit
+            with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+                existing = {index['name'] for index in inspect(connection).get_indexes('jurisprudence_cases')}
+                if postgresql:
+                    for name in invalid_indexes(connection):
+                        print(f"   ⚠️  {name} invalide (construction interrompue) : suppression")
+                        connection.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"'))
+                        existing.discard(name)
+
+                for index in sorted(JurisprudenceCase.__table__.indexes, key=lambda i: i.name):
+                    if index.name in existing:
+                        print(f"   ✓ {index.name} déjà présent")
+                        continue
+                    if postgresql:
+                        index.dialect_options['postgresql']['concurrently'] = True
+                    started = time.perf_counter()
+                    index.create(connection)
+                    print(f"   ✓ {index.name} créé ({time.perf_counter() - started:.1f}s)")
+
+            print("\n✅ Index à jour")
+
+        except Exception as e:
+            print(f"\n❌ Erreur lors de la création des index: {e}")
+            import traceback
+            traceback.print_exc()
+
+if __name__ == '__main__':
+    main()
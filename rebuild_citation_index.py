@@ -0,0 +1,54 @@
+"""
+Script de (re)construction de l'index des références légales (table case_citations)
+À exécuter après le déploiement de l'index, ou après une évolution de
+l'extracteur (backend/utils/citation_extractor.py) pour réanalyser les cas existants
+
+db.create_all() ne crée pas les index d'une table existante : ceux qui
+manquent à case_citations (ix_case_citations_article_case, ajouté après la
+table) sont créés avant la reconstruction
+"""
+import argparse
+import time
+from sqlalchemy import inspect
+from backend.app import app
+from backend.models.user import db
+from backend.models.case import JurisprudenceCase
+from backend.models.citation import CaseCitation
+from backend.services.citation_service import citation_service
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconstruction de l'index des références légales")
+    parser.add_argument('--batch-size', type=int, default=100, help="Nombre de cas par transaction")
+    args = parser.parse_args()
+
+    print("=== Reconstruction de l'index des références légales ===\n")
+
+    with app.app_context():
+        try:
+            db.create_all()
+            existing = {index['name'] for index in inspect(db.engine).get_indexes('case_citations')}
+            for index in CaseCitation.__table__.indexes:
+                if index.name not in existing:
+                    index.create(db.engine)
+                    print(f"   ✓ index {index.name} créé")
+            total = JurisprudenceCase.query.count()
+            print(f"   {total} cas à analyser")
+            started = time.perf_counter()
+
+            def progress(indexed, last_id):
+                elapsed = time.perf_counter() - started
+                rate = indexed / elapsed if elapsed else 0
+                print(f"   … {indexed}/{total} analysés ({rate:.1f} cas/s, dernier id {last_id})")
+
+            indexed = citation_service.rebuild(batch_size=args.batch_size, progress=progress)
+            citations = CaseCitation.query.count()
+            print(f"\n✅ Index reconstruit: {indexed} cas, {citations} citations")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"\n❌ Erreur lors de la reconstruction: {e}")
+            import traceback
+            traceback.print_exc()
+
+if __name__ == '__main__':
+    main()
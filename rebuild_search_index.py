@@ -0,0 +1,42 @@
+"""
+Script de (re)construction de l'index aveugle de recherche plein texte
+À exécuter après le déploiement de l'index ou après un changement de
+BLIND_INDEX_KEY (une rotation de ENCRYPTION_KEY ne touche pas l'index)
+"""
+import argparse
+import time
+from backend.app import app
+from backend.models.user import db
+from backend.models.case import JurisprudenceCase
+from backend.services.search_index_service import search_index_service
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconstruction de l'index de recherche plein texte")
+    parser.add_argument('--batch-size', type=int, default=100, help="Nombre de cas par transaction")
+    args = parser.parse_args()
+
+    print("=== Reconstruction de l'index de recherche plein texte ===\n")
+
+    with app.app_context():
+        try:
+            db.create_all()
+            total = JurisprudenceCase.query.count()
+            print(f"   {total} cas à indexer")
+            started = time.perf_counter()
+
+            def progress(indexed, last_id):
+                elapsed = time.perf_counter() - started
+                rate = indexed / elapsed if elapsed else 0
+                print(f"   … {indexed}/{total} indexés ({rate:.1f} cas/s, dernier id {last_id})")
+
+            indexed = search_index_service.rebuild(batch_size=args.batch_size, progress=progress)
+            print(f"\n✅ Index reconstruit: {indexed} cas")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"\n❌ Erreur lors de la reconstruction: {e}")
+            import traceback
+            traceback.print_exc()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""
+Script de rotation de la clé de chiffrement
+
+Procédure:
+  1. Générer une nouvelle clé Fernet
+  2. Redémarrer l'application avec ENCRYPTION_KEY=<nouvelle clé> et
+     ENCRYPTION_KEYS_PREVIOUS=<ancienne clé> (les deux clés sont lisibles)
+  3. Exécuter ce script : chaque valeur chiffrée est re-chiffrée avec la
+     nouvelle clé, par lots ordonnés par id, une courte transaction par lot
+     (les lignes du lot sont verrouillées jusqu'à son commit)
+  4. Une fois terminé, retirer l'ancienne clé de ENCRYPTION_KEYS_PREVIOUS
+
+BLIND_INDEX_KEY (index plein texte, quasi-doublons) ne change pas pendant la
+rotation : avant la première rotation d'une installation qui ne la définissait
+pas, lui donner la valeur de l'ancienne ENCRYPTION_KEY. Changer BLIND_INDEX_KEY
+impose de relancer rebuild_search_index.py et backfill_near_duplicates.py.
+
+L'avancement est enregistré dans key_rotation_checkpoints : relancer le
+script avec le même --run-id reprend après le dernier lot validé.
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from sqlalchemy import bindparam, inspect, select
+from backend.app import app
+from backend.models.user import db
+from backend.models.case import JurisprudenceCase, SearchHistory
+from backend.models.maintenance import KeyRotationCheckpoint
+from backend.utils.encryption import encryption_service
+
+# Colonnes chiffrées par table : (colonne, format)
+ROTATION_TARGETS = [
+    (JurisprudenceCase.__table__, [
+        ('resume_francais_encrypted', 'fernet'),
+        ('resume_arabe_encrypted', 'fernet'),
+        ('texte_integral_encrypted', 'fernet'),
+        ('texte_integral_blob', 'chunked'),
+    ]),
+    (SearchHistory.__table__, [
+        ('query_encrypted', 'fernet'),
+    ]),
+]
+
+def rotate_value(value, value_format):
+    if not value:
+        return value
+    if value_format == 'chunked':
+        return encryption_service.rotate_large(value)
+    return encryption_service.rotate(value)
+
+def rotate_row(row, columns):
+    """Paramètres de l'UPDATE d'une ligne : toutes ses colonnes chiffrées re-chiffrées"""
+    params = {f'new_{name}': rotate_value(row._mapping[name], fmt) for name, fmt in columns}
+    params['row_id'] = row.id
+    return params
+
+def get_checkpoint(run_id, table_name):
+    checkpoint = KeyRotationCheckpoint.query.filter_by(run_id=run_id, table_name=table_name).first()
+    if not checkpoint:
+        checkpoint = KeyRotationCheckpoint(run_id=run_id, table_name=table_name, last_id=0, rows_done=0)
+        db.session.add(checkpoint)
+        db.session.commit()
+    return checkpoint
+
+def rotate_table(table, columns, run_id, batch_size, executor):
+    existing = {col['name'] for col in inspect(db.engine).get_columns(table.name)}
+    columns = [(name, fmt) for name, fmt in columns if name in existing]
+    checkpoint = get_checkpoint(run_id, table.name)
+
+    if checkpoint.completed_at:
+        print(f"   ✓ {table.name}: déjà terminée ({checkpoint.rows_done} lignes)")
+        return
+
+    total = db.session.execute(
+        select(db.func.count()).select_from(table).where(table.c.id > checkpoint.last_id)
+    ).scalar()
+    print(f"   {table.name}: {total} lignes à traiter (reprise après l'id {checkpoint.last_id})")
+
+    selected = [table.c.id] + [table.c[name] for name, _ in columns]
+    update = table.update().where(table.c.id == bindparam('row_id')).values(
+        {name: bindparam(f'new_{name}') for name, _ in columns}
+    )
+
+    processed = 0
+    started = time.perf_counter()
+    while True:
+        # FOR UPDATE : une modification concurrente (édition, réindexation) attend la
+        # fin du lot au lieu d'être écrasée par l'ancienne valeur re-chiffrée
+        rows = db.session.execute(
+            select(*selected).where(table.c.id > checkpoint.last_id).order_by(table.c.id)
+            .limit(batch_size).with_for_update()
+        ).all()
+        if not rows:
+            break
+
+        # Le chiffrement (OpenSSL) libère le GIL : les lignes d'un lot sont traitées en parallèle
+        params = list(executor.map(lambda row: rotate_row(row, columns), rows))
+        db.session.execute(update, params)
+        checkpoint.last_id = rows[-1].id
+        checkpoint.rows_done += len(rows)
+        db.session.commit()
+
+        processed += len(rows)
+        elapsed = time.perf_counter() - started
+        rate = processed / elapsed if elapsed else 0
+        eta = (total - processed) / rate if rate else 0
+        print(f"   … {table.name}: {processed}/{total} ({rate:.0f} lignes/s, reste ~{eta:.0f}s, dernier id {checkpoint.last_id})")
+
+    checkpoint.completed_at = datetime.utcnow()
+    db.session.commit()
+    print(f"   ✓ {table.name}: terminée")
+
+def main():
+    parser = argparse.ArgumentParser(description="Rotation de la clé de chiffrement (reprise possible)")
+    parser.add_argument('--run-id', default='rotation', help="Identifiant de la rotation, pour la reprise")
+    parser.add_argument('--batch-size', type=int, default=200, help="Lignes par transaction")
+    parser.add_argument('--workers', type=int, default=4, help="Threads de chiffrement")
+    parser.add_argument('--restart', action='store_true', help="Ignore l'avancement enregistré pour ce run-id")
+    args = parser.parse_args()
+
+    print("=== Rotation de la clé de chiffrement ===\n")
+
+    with app.app_context():
+        try:
+            db.create_all()
+
+            if args.restart:
+                KeyRotationCheckpoint.query.filter_by(run_id=args.run_id).delete()
+                db.session.commit()
+
+            if len(encryption_service.chunked_cipher.keys) < 2:
+                print("⚠️  Aucune ancienne clé dans ENCRYPTION_KEYS_PREVIOUS : les données")
+                print("   chiffrées avec une autre clé ne pourront pas être lues.\n")
+
+            with ThreadPoolExecutor(max_workers=args.workers) as executor:
+                for table, columns in ROTATION_TARGETS:
+                    rotate_table(table, columns, args.run_id, args.batch_size, executor)
+
+            print("\n✅ Rotation terminée avec succès!")
+            print("   Vous pouvez retirer l'ancienne clé de ENCRYPTION_KEYS_PREVIOUS")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"\n❌ Erreur lors de la rotation: {e}")
+            print(f"   Relancez avec --run-id {args.run_id} pour reprendre")
+            import traceback
+            traceback.print_exc()
+
+if __name__ == '__main__':
+    main()
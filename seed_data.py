@@ -1,127 +1,136 @@
+"""
+Script d'ajout de cas de démonstration (base vide uniquement)
+Avec --synthetic N, ajoute à la place N cas générés par benchmarks/corpus.py
+(pour les mesures, voir benchmarks/bench_paths.py)
+"""
+import argparse
+from datetime import date
 from backend.app import app
 from backend.models.user import db, User
 from backend.models.case import JurisprudenceCase
-from backend.utils.encryption import encryption_service
-from datetime import date
+from benchmarks.corpus import CorpusGenerator, insert_cases
 
 sample_cases = [
     {
-        "case_number": "CA-2024-001",
-        "title": "Responsabilité contractuelle - Défaut de livraison",
-        "description": "Litige concernant la non-livraison de marchandises dans les délais convenus. Le vendeur invoque la force majeure due aux conditions météorologiques exceptionnelles.",
-        "facts": "Le 15 janvier 2024, la société ABC a commandé 500 unités de matériel informatique auprès de la société XYZ. Le contrat stipulait une livraison au plus tard le 1er février 2024. Les marchandises n'ont été livrées que le 20 février 2024.",
-        "decision": "La Cour rejette l'argument de la force majeure et condamne le vendeur à verser des dommages-intérêts pour le préjudice causé par le retard de livraison.",
-        "court": "Cour d'appel de Paris",
-        "date_decision": date(2024, 3, 15),
-        "category": "Droit commercial",
-        "keywords": "contrat, livraison, force majeure, dommages-intérêts"
-    },
-    {
-        "case_number": "TGI-2024-045",
-        "title": "Droit du travail - Licenciement abusif",
-        "description": "Contestation d'un licenciement pour faute grave. L'employé soutient que les motifs invoqués sont insuffisants et que la procédure n'a pas été respectée.",
-        "facts": "M. Dupont a été licencié pour faute grave le 10 février 2024 après avoir prétendument divulgué des informations confidentielles. L'employeur n'a pas convoqué l'employé à un entretien préalable dans les délais légaux.",
-        "decision": "Le tribunal requalifie le licenciement en licenciement sans cause réelle et sérieuse et condamne l'employeur à verser une indemnité de 15 000 euros.",
-        "court": "Tribunal de grande instance de Lyon",
-        "date_decision": date(2024, 5, 20),
-        "category": "Droit du travail",
-        "keywords": "licenciement, faute grave, procédure, indemnités"
+        "ref": "DEMO-0001",
+        "titre": "Responsabilité contractuelle - Défaut de livraison",
+        "juridiction": "Cour d'appel de commerce de Casablanca",
+        "pays_ville": "Maroc/Casablanca",
+        "numero_decision": "1254/2023",
+        "date_decision": date(2023, 3, 15),
+        "numero_dossier": "4512/8202/2022",
+        "type_decision": "Arrêt",
+        "chambre": "Commerciale",
+        "theme": "Responsabilité contractuelle",
+        "mots_cles": "contrat, livraison, force majeure, dommages-intérêts",
+        "base_legale": "article 263 du DOC; article 268 du DOC",
+        "source": "Revue de la Cour de cassation",
+        "resume_francais": "Le vendeur qui livre les marchandises après le délai convenu ne peut invoquer la force majeure lorsque l'événement allégué était prévisible. Il est tenu de réparer le préjudice causé par le retard.",
+        "resume_arabe": "لا يمكن للبائع الذي سلم البضاعة بعد الأجل المتفق عليه أن يتمسك بالقوة القاهرة متى كان الحادث متوقعا، ويلزم بتعويض الضرر الناتج عن التأخير.",
+        "texte_integral": "Attendu que la société demanderesse a commandé du matériel informatique livrable au plus tard le 1er février 2022 ; que la livraison n'est intervenue que le 20 février 2022 ; que la défenderesse invoque des conditions météorologiques exceptionnelles. Mais attendu que l'article 269 du DOC exige un événement imprévisible et irrésistible ; que tel n'est pas le cas en l'espèce. Par ces motifs, la cour confirme le jugement entrepris.",
     },
     {
-        "case_number": "CA-2024-067",
-        "title": "Responsabilité civile - Accident de la circulation",
-        "description": "Action en réparation suite à un accident de la route impliquant deux véhicules. Détermination des responsabilités et évaluation du préjudice corporel.",
-        "facts": "Le 5 mars 2024, une collision s'est produite au carrefour de la rue Victor Hugo et de l'avenue de la République. Le conducteur du véhicule A n'a pas respecté le feu rouge, percutant le véhicule B.",
-        "decision": "La Cour retient la responsabilité exclusive du conducteur du véhicule A et fixe l'indemnisation du préjudice corporel à 50 000 euros.",
-        "court": "Cour d'appel de Bordeaux",
-        "date_decision": date(2024, 6, 10),
-        "category": "Responsabilité civile",
-        "keywords": "accident, circulation, préjudice corporel, indemnisation"
+        "ref": "DEMO-0002",
+        "titre": "Licenciement abusif - Faute grave non établie",
+        "juridiction": "Cour de cassation",
+        "pays_ville": "Maroc/Rabat",
+        "numero_decision": "877/2022",
+        "date_decision": date(2022, 5, 20),
+        "numero_dossier": "1033/5/1/2021",
+        "type_decision": "Arrêt",
+        "chambre": "Sociale",
+        "theme": "Licenciement abusif",
+        "mots_cles": "licenciement, faute grave, procédure, indemnités",
+        "base_legale": "article 39 du Code du travail; article 62 du Code du travail",
+        "source": "Bulletin des arrêts",
+        "resume_francais": "Le licenciement pour faute grave prononcé sans audition préalable du salarié dans le délai légal est abusif et ouvre droit aux indemnités de préavis, de licenciement et de dommages-intérêts.",
+        "resume_arabe": "يعتبر الفصل من أجل خطأ جسيم تعسفيا إذا تم دون الاستماع إلى الأجير داخل الأجل القانوني، ويستحق الأجير تعويضات الإخطار والفصل والضرر.",
+        "texte_integral": "حيث إن الطاعنة تعيب على القرار خرق الفصل 62 من مدونة الشغل. لكن حيث إن المحكمة ثبت لها أن المشغل لم يستمع إلى الأجير داخل أجل ثمانية أيام من تاريخ ارتكاب الخطأ المنسوب إليه، مما يجعل الفصل تعسفيا. لهذه الأسباب قضت محكمة النقض برفض الطلب.",
     },
     {
-        "case_number": "TJ-2024-123",
-        "title": "Droit de la famille - Garde d'enfants",
-        "description": "Litige concernant la garde des enfants suite à un divorce. Les deux parents demandent la garde exclusive.",
-        "facts": "Mme Martin et M. Martin se sont séparés en janvier 2024. Ils ont deux enfants âgés de 8 et 10 ans. Chaque parent demande la garde exclusive en invoquant l'intérêt supérieur des enfants.",
-        "decision": "Le tribunal prononce une garde alternée avec résidence principale chez la mère et un droit de visite élargi pour le père, incluant la moitié des vacances scolaires.",
-        "court": "Tribunal judiciaire de Marseille",
-        "date_decision": date(2024, 4, 25),
-        "category": "Droit de la famille",
-        "keywords": "divorce, garde d'enfants, résidence alternée, intérêt de l'enfant"
+        "ref": "DEMO-0003",
+        "titre": "Bail d'habitation - Résiliation pour défaut de paiement",
+        "juridiction": "Tribunal de première instance de Tanger",
+        "pays_ville": "Maroc/Tanger",
+        "numero_decision": "312/2024",
+        "date_decision": date(2024, 2, 8),
+        "numero_dossier": "2201/1302/2023",
+        "type_decision": "Jugement",
+        "chambre": "Civile",
+        "theme": "Bail d'habitation",
+        "mots_cles": "bail, loyer, mise en demeure, expulsion",
+        "base_legale": "article 56 de la loi 67-12; article 254 du DOC",
+        "source": "Site officiel",
+        "resume_francais": "Le défaut de paiement de trois mois de loyer après mise en demeure restée sans effet justifie la résiliation du bail et l'expulsion du locataire.",
+        "resume_arabe": "يبرر عدم أداء واجبات الكراء لمدة ثلاثة أشهر بعد توصل المكتري بإنذار ظل بدون جدوى فسخ عقد الكراء وإفراغ المكتري.",
+        "texte_integral": "Attendu que le bailleur a adressé au locataire une mise en demeure de payer les loyers échus ; qu'elle est restée sans effet dans le délai de quinze jours ; que l'article 56 de la loi 67-12 autorise alors la résiliation. Par ces motifs, le tribunal prononce la résiliation du bail et ordonne l'expulsion.",
     },
     {
-        "case_number": "CA-2024-089",
-        "title": "Droit immobilier - Vice caché",
-        "description": "Action en garantie des vices cachés suite à l'acquisition d'un bien immobilier présentant des défauts de construction non apparents lors de la vente.",
-        "facts": "En juin 2023, Mme Leblanc a acquis une maison. Six mois après l'achat, d'importants problèmes d'humidité et d'infiltration d'eau sont apparus, causés par des défauts dans l'isolation.",
-        "decision": "La Cour reconnaît l'existence de vices cachés et condamne le vendeur à prendre en charge les travaux de réparation estimés à 35 000 euros.",
-        "court": "Cour d'appel de Toulouse",
-        "date_decision": date(2024, 7, 5),
-        "category": "Droit immobilier",
-        "keywords": "vice caché, vente immobilière, garantie, réparation"
+        "ref": "DEMO-0004",
+        "titre": "Garde des enfants - Intérêt de l'enfant",
+        "juridiction": "Cour d'appel de Fès",
+        "pays_ville": "Maroc/Fès",
+        "numero_decision": "145/2023",
+        "date_decision": date(2023, 4, 25),
+        "numero_dossier": "88/1629/2022",
+        "type_decision": "Arrêt",
+        "chambre": "Statut personnel",
+        "theme": "Garde des enfants",
+        "mots_cles": "divorce, garde, droit de visite, intérêt de l'enfant",
+        "base_legale": "article 166 du Code de la famille; article 186 du Code de la famille",
+        "source": "Recueil annuel",
+        "resume_francais": "Le juge attribue la garde en considération de l'intérêt de l'enfant ; le remariage de la mère n'emporte pas déchéance automatique lorsque l'enfant n'a pas atteint sept ans.",
+        "resume_arabe": "تراعي المحكمة مصلحة المحضون عند البت في الحضانة، ولا يسقط زواج الأم حضانتها تلقائيا إذا كان المحضون لم يتجاوز سبع سنوات.",
+        "texte_integral": "حيث إن المستأنف يطلب إسقاط الحضانة عن الأم بسبب زواجها. وحيث إن المادة 175 من مدونة الأسرة تستثني حالة المحضون الذي لم يتجاوز سبع سنوات. وحيث إن مصلحة المحضون تقتضي بقاءه مع أمه. لهذه الأسباب قضت المحكمة بتأييد الحكم المستأنف.",
     },
     {
-        "case_number": "TGI-2024-156",
-        "title": "Droit pénal - Escroquerie",
-        "description": "Poursuite pour escroquerie dans le cadre d'une opération d'investissement frauduleuse. Le prévenu a collecté des fonds auprès de plusieurs victimes en promettant des rendements irréalistes.",
-        "facts": "Entre 2022 et 2023, M. Bernard a collecté plus de 200 000 euros auprès de 15 investisseurs en leur promettant un rendement de 20% par an sur un projet immobilier fictif.",
-        "decision": "Le tribunal condamne le prévenu à 3 ans de prison ferme et au remboursement intégral des sommes perçues aux victimes.",
-        "court": "Tribunal de grande instance de Nantes",
-        "date_decision": date(2024, 8, 12),
-        "category": "Droit pénal",
-        "keywords": "escroquerie, fraude, investissement, restitution"
+        "ref": "DEMO-0005",
+        "titre": "Expropriation - Évaluation de l'indemnité",
+        "juridiction": "Tribunal administratif de Rabat",
+        "pays_ville": "Maroc/Rabat",
+        "numero_decision": "2210/2023",
+        "date_decision": date(2023, 7, 5),
+        "numero_dossier": "640/7112/2022",
+        "type_decision": "Jugement",
+        "chambre": "Administrative",
+        "theme": "Expropriation",
+        "mots_cles": "expropriation, utilité publique, indemnité, expertise",
+        "base_legale": "article 20 de la loi 7-81",
+        "source": "Site officiel",
+        "resume_francais": "L'indemnité d'expropriation est fixée d'après la valeur du bien au jour de la décision d'expropriation, sur la base d'une expertise tenant compte des ventes de terrains comparables.",
+        "resume_arabe": "يحدد التعويض عن نزع الملكية حسب قيمة العقار يوم صدور مقرر نزع الملكية، بناء على خبرة تراعي أثمنة بيع العقارات المماثلة.",
+        "texte_integral": "Attendu que l'administration a offert une indemnité de 200 dirhams le mètre carré ; que l'expert désigné a retenu 450 dirhams au vu des ventes comparables dans le secteur ; que ses conclusions sont motivées. Par ces motifs, le tribunal fixe l'indemnité sur la base du rapport d'expertise.",
     },
-    {
-        "case_number": "CA-2024-201",
-        "title": "Propriété intellectuelle - Contrefaçon de marque",
-        "description": "Action en contrefaçon de marque déposée. La société plaignante reproche à la société défenderesse l'utilisation d'une marque similaire créant un risque de confusion.",
-        "facts": "La société Alpha, titulaire de la marque 'TechPro' déposée en 2020, constate que la société Beta commercialise des produits sous la marque 'TekPro' dans le même secteur d'activité.",
-        "decision": "La Cour constate la contrefaçon et ordonne à la société Beta de cesser l'utilisation de la marque 'TekPro' et de verser 80 000 euros de dommages-intérêts.",
-        "court": "Cour d'appel de Paris",
-        "date_decision": date(2024, 9, 1),
-        "category": "Propriété intellectuelle",
-        "keywords": "contrefaçon, marque, confusion, dommages-intérêts"
-    },
-    {
-        "case_number": "TJ-2024-234",
-        "title": "Droit de la consommation - Clause abusive",
-        "description": "Contestation d'une clause contractuelle jugée abusive dans un contrat de service de télécommunication.",
-        "facts": "Un opérateur de télécommunication a inclus dans ses contrats une clause permettant une augmentation unilatérale des tarifs sans limitation. L'association de consommateurs a saisi le tribunal.",
-        "decision": "Le tribunal déclare la clause abusive et nulle, et condamne l'opérateur à rembourser les augmentations indues aux abonnés concernés.",
-        "court": "Tribunal judiciaire de Lille",
-        "date_decision": date(2024, 10, 5),
-        "category": "Droit de la consommation",
-        "keywords": "clause abusive, télécommunication, remboursement, protection du consommateur"
-    }
 ]
 
-with app.app_context():
-    admin = User.query.filter_by(email='admin@jurisprudence.com').first()
-    
-    if admin:
+def main():
+    parser = argparse.ArgumentParser(description="Ajout de cas de démonstration")
+    parser.add_argument('--synthetic', type=int, metavar='N', help="Ajoute N cas synthétiques au lieu des cas de démonstration")
+    parser.add_argument('--seed', type=int, default=42, help="Graine du générateur (--synthetic)")
+    args = parser.parse_args()
+
+    with app.app_context():
+        admin = User.query.filter_by(email='admin@jurisprudence.com').first()
+        if not admin:
+            print("❌ Administrateur non trouvé : lancez d'abord `flask --app main init`")
+            return
+
         existing_cases = JurisprudenceCase.query.count()
-        
-        if existing_cases == 0:
-            print("Ajout de cas de jurisprudence de démonstration...")
-            
-            for case_data in sample_cases:
-                case = JurisprudenceCase(
-                    case_number=case_data['case_number'],
-                    title=case_data['title'],
-                    description_encrypted=encryption_service.encrypt(case_data['description']),
-                    facts_encrypted=encryption_service.encrypt(case_data['facts']),
-                    decision_encrypted=encryption_service.encrypt(case_data['decision']),
-                    court=case_data['court'],
-                    date_decision=case_data['date_decision'],
-                    category=case_data['category'],
-                    keywords=case_data['keywords'],
-                    created_by=admin.id
-                )
-                db.session.add(case)
-            
-            db.session.commit()
-            print(f"✓ {len(sample_cases)} cas de jurisprudence ajoutés avec succès!")
-        else:
+        if args.synthetic:
+            start = JurisprudenceCase.query.filter(JurisprudenceCase.ref.like('SYN-%')).count()
+            cases = CorpusGenerator(seed=args.seed + start).cases(args.synthetic, start=start)
+        elif existing_cases:
             print(f"La base de données contient déjà {existing_cases} cas.")
-    else:
-        print("Erreur: Administrateur non trouvé")
+            return
+        else:
+            cases = sample_cases
+
+        try:
+            ids = insert_cases(cases, admin.id)
+            print(f"✅ {len(ids)} cas de jurisprudence ajoutés avec succès")
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Erreur lors de l'ajout des cas: {e}")
+
+if __name__ == '__main__':
+    main()